@@ -1,6 +1,3 @@
-import os
-import redis.asyncio as redis
-
 from fastapi_limiter import FastAPILimiter
 
 from fastapi import FastAPI
@@ -10,41 +7,107 @@ from contextlib import asynccontextmanager
 from models.users import Patient, Doctor, Nurse, Admin, Pharmacist
 from models.appointment import Appointment
 from models.treatment import Treatment
-from models.medical_facilities import Hospital, Clinic
+from models.medical_facilities import Hospital, Clinic, Pharmacy
 from models.pharmacy import Drug, DrugInventory, DrugManufacturer
 from models.diagnosis import Diagnosis
+from models.analytics import DiagnosisRollup
+from models.review import Review
+from models.archive import ArchivedAppointment, ArchivedDiagnosis
 
+from middleware.admission import AdmissionMiddleware
+from middleware.consistency import ConsistencyTokenMiddleware
+from middleware.deadline import DeadlineMiddleware
 from middleware.idempotency import IdempotencyMiddleware
+from middleware.profiling import ProfilingMiddleware
+from middleware.tracing import TracingMiddleware
 
-from routers import doctor, patient, auth, appointment, diagnosis
+from routers import doctor, patient, auth, appointment, diagnosis, health, analytics, inventory, medical_facilities, treatment, feed, review, typeahead
 
 from motor.motor_asyncio import AsyncIOMotorClient
 
 from beanie import init_beanie
 
-from dotenv import load_dotenv
+from utils.api_logger import logger
+from utils.appointment_feed import appointment_feed
+from utils.cache import cache_bus
+from utils.jobs import job_queue
+from utils.reminders import reminder_queue, start_reminder_scheduler
+from utils.replica_reads import CausalTokenListener
+from utils.settings import get_settings
+from utils.startup import StartupProfile, warm_up_mongo, warm_up_redis
+from utils.tracing import MongoCommandTracer, TracedRedis, configure_tracing, tracer
 
-load_dotenv()
+DOCUMENT_MODELS = [Patient, Doctor, Nurse, Appointment, Treatment, Hospital, Clinic, Pharmacy, Drug, DrugInventory, DrugManufacturer, Diagnosis, Admin, Pharmacist, DiagnosisRollup, Review, ArchivedAppointment, ArchivedDiagnosis]
 
 # noinspection PyUnusedLocal,PyShadowingNames
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    client = AsyncIOMotorClient(os.getenv("DATABASE_CONNECTION_STRING"))  # * Connect to MongoDB
-
-    await init_beanie(
-        database=client[os.getenv("DATABASE_NAME")],
-        document_models=[Patient, Doctor, Nurse, Appointment, Treatment, Hospital, Clinic, Drug, DrugInventory, DrugManufacturer, Diagnosis, Admin, Pharmacist],
-    )
-    
-    redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-    redis_connection = redis.from_url(
-        redis_url, encoding="utf-8", decode_responses=True
-    )
-    await FastAPILimiter.init(redis_connection)
-    
+    settings = get_settings()
+    profile = StartupProfile()
+    app.state.ready = False
+
+    with profile.step("tracing"):
+        configure_tracing()
+
+    with profile.step("mongo_client"):
+        listeners = [MongoCommandTracer()] if tracer.enabled else []
+        if settings.secondary_reads_enabled:
+            listeners.append(CausalTokenListener())
+        client = AsyncIOMotorClient(
+            settings.database_connection_string,
+            minPoolSize=settings.mongo_min_pool_size,
+            event_listeners=listeners,
+        )  # * Connect to MongoDB
+
+    with profile.step("init_beanie"):
+        await init_beanie(
+            database=client[settings.database_name],
+            document_models=DOCUMENT_MODELS,
+        )
+
+    with profile.step("redis_client"):
+        redis_connection = TracedRedis.from_url(
+            settings.redis_url, encoding="utf-8", decode_responses=True
+        )
+
+    with profile.step("rate_limiter"):
+        await FastAPILimiter.init(redis_connection)
+
+    with profile.step("cache_bus"):
+        cache_bus.init(redis_connection)
+
+    if settings.feed_enabled:
+        with profile.step("appointment_feed"):
+            appointment_feed.start()
+
+    with profile.step("job_queue"):
+        job_queue.init(redis_connection)
+
+    with profile.step("reminder_scheduler"):
+        reminder_queue.init(redis_connection)
+        reminder_scheduler = start_reminder_scheduler()
+
+    # * Pre-establish the connection pools so the first requests do not pay for handshakes
+    with profile.step("mongo_warm_up"):
+        await warm_up_mongo(client, settings.mongo_min_pool_size)
+
+    with profile.step("redis_warm_up"):
+        await warm_up_redis(redis_connection, settings.redis_min_connections)
+
+    app.state.mongo_client = client
+    app.state.redis = redis_connection
+    app.state.startup_profile = profile
+    app.state.ready = True
+    logger.info(profile.report())
+
     yield
+    app.state.ready = False
+    reminder_scheduler.shutdown(wait=False)
+    await cache_bus.close()
+    await appointment_feed.close()
     client.close()
     await redis_connection.close()
+    tracer.shutdown()
 
 app = FastAPI(
     title="HealthCare API",
@@ -52,6 +115,12 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# * Innermost, so it runs in the same task as the route handler; not registered at all unless enabled
+if get_settings().profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+# * Inside the idempotency middleware, so a replayed response carries the original token
+if get_settings().secondary_reads_enabled:
+    app.add_middleware(ConsistencyTokenMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -64,9 +133,23 @@ app.add_middleware(
     ttl_seconds=3600,
     lock_ttl=10,
 )
+app.add_middleware(DeadlineMiddleware)
+# * Added last so it runs first and sheds load before any other work is done
+app.add_middleware(AdmissionMiddleware)
+# * Outside admission control, so the server span includes the time spent queued
+app.add_middleware(TracingMiddleware)
 
+app.include_router(health.router)
 app.include_router(auth.router)
+# * Before the patient router, so /api/v1/patients/typeahead is not read as a patient ID
+app.include_router(typeahead.router)
 app.include_router(patient.router)
 app.include_router(doctor.router)
 app.include_router(appointment.router)
-app.include_router(diagnosis.router)
\ No newline at end of file
+app.include_router(diagnosis.router)
+app.include_router(analytics.router)
+app.include_router(inventory.router)
+app.include_router(medical_facilities.router)
+app.include_router(treatment.router)
+app.include_router(feed.router)
+app.include_router(review.router)
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""
+Admission control: per-route concurrency limits with adaptive load shedding.
+
+Every request is assigned to an admission class (login, booking, reads,
+writes). Each class admits at most `limit` requests at a time; the others wait
+in a bounded queue ordered by priority (clinician reads first, bulk exports
+last) until a slot frees up or their deadline passes. Requests that cannot be
+queued, or whose deadline passes, get an immediate 503 with `Retry-After`, so a
+surge on one route does not exhaust the Motor pool for the others.
+
+Limits adapt to observed latency (AIMD): every request answered within the
+class's target latency raises the limit by `1 / limit`, and a slow or
+overloaded answer multiplies it by `backoff`, at most once per target latency.
+"""
+
+import bisect
+import base64
+import itertools
+import json
+import re
+from asyncio import get_running_loop, wait
+from dataclasses import dataclass
+from math import ceil
+from time import monotonic
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+
+from utils.settings import get_settings
+
+
+PRIORITY_CLINICAL = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+
+# * Token scopes held by clinicians and admins (see the permissions granted on account creation)
+CLINICAL_SCOPES = {"get-patients", "admin"}
+
+EXEMPT_PATHS = re.compile(r"^/(healthz|readyz|metrics/|docs|redoc|openapi\.json)|^/api/v1/feed/")
+BULK_PATHS = re.compile(r"/export$")
+BULK_PAGE_SIZE = 50
+
+
+class AdaptiveLimiter:
+    """Concurrency limit with a priority wait queue and AIMD adaptation"""
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: float,
+        min_limit: float,
+        max_limit: float,
+        max_queue: int,
+        queue_timeout: float,
+        target_latency: float,
+        backoff: float = 0.9,
+    ):
+        self.name = name
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waiters: list[tuple[int, int, object]] = []
+        self._sequence = itertools.count()
+        self._last_decrease = 0.0
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, ceil(self.queue_timeout))
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < max(1, int(self.limit))
+
+    async def acquire(self, priority: int) -> bool:
+        """Wait for a slot. Returns False if the request should be shed."""
+        if self._has_capacity() and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+        if len(self._waiters) >= self.max_queue:
+            # * A full queue sheds its lowest-priority, newest waiter if the new request outranks it
+            worst = self._waiters[-1]
+            if worst[0] <= priority:
+                self.rejected += 1
+                return False
+            self._waiters.pop()
+            worst[2].set_result(False)
+
+        future = get_running_loop().create_future()
+        entry = (priority, next(self._sequence), future)
+        bisect.insort(self._waiters, entry, key=lambda waiter: waiter[:2])
+
+        await wait([future], timeout=self.queue_timeout)
+        if not future.done():
+            future.cancel()
+            self._waiters.remove(entry)
+
+        if future.cancelled() or not future.result():
+            self.rejected += 1
+            return False
+        self.admitted += 1
+        return True
+
+    def release(self, latency: float, overloaded: bool):
+        """Free a slot and adapt the limit to the request's latency"""
+        self.in_flight -= 1
+
+        now = monotonic()
+        if overloaded or latency > self.target_latency:
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        while self._waiters and self._has_capacity():
+            _, _, future = self._waiters.pop(0)
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(True)
+
+    def metrics(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "inFlight": self.in_flight,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+@dataclass
+class AdmissionClass:
+    """Settings of one admission class"""
+    initial_limit: float
+    min_limit: float
+    max_limit: float
+    max_queue: int
+    queue_timeout: float
+    target_latency: float
+
+
+DEFAULT_CLASSES = {
+    # bcrypt verification dominates, so only a few logins run at once
+    "login": AdmissionClass(initial_limit=4, min_limit=1, max_limit=16, max_queue=50, queue_timeout=2.0, target_latency=1.0),
+    "booking": AdmissionClass(initial_limit=16, min_limit=2, max_limit=64, max_queue=100, queue_timeout=2.0, target_latency=0.5),
+    "reads": AdmissionClass(initial_limit=64, min_limit=8, max_limit=256, max_queue=200, queue_timeout=1.0, target_latency=0.25),
+    "writes": AdmissionClass(initial_limit=32, min_limit=4, max_limit=128, max_queue=100, queue_timeout=2.0, target_latency=0.5),
+}
+
+DEFAULT_ROUTES = [
+    ("POST", re.compile(r"^/login$"), "login"),
+    ("POST", re.compile(r"^/api/v1/appointments$"), "booking"),
+]
+
+
+class AdmissionController:
+    """Maps requests to admission classes and holds one limiter per class"""
+
+    def __init__(self, classes: dict[str, AdmissionClass] = None, routes: list = None):
+        classes = classes or DEFAULT_CLASSES
+        self.routes = routes if routes is not None else DEFAULT_ROUTES
+        self.limiters = {
+            name: AdaptiveLimiter(name, **vars(admission_class))
+            for name, admission_class in classes.items()
+        }
+
+    def classify(self, scope: dict) -> tuple[AdaptiveLimiter, int] | None:
+        """Return the limiter and priority of a request, or None if it bypasses admission control"""
+        path, method = scope["path"], scope["method"]
+        if EXEMPT_PATHS.search(path):
+            return None
+
+        name = "reads" if method in ("GET", "HEAD") else "writes"
+        for route_method, pattern, route_class in self.routes:
+            if method == route_method and pattern.search(path):
+                name = route_class
+                break
+        return self.limiters[name], self._priority(scope, path)
+
+    @staticmethod
+    def _priority(scope: dict, path: str) -> int:
+        if BULK_PATHS.search(path):
+            return PRIORITY_BULK
+
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        try:
+            if int(query.get("limit", ["0"])[0]) >= BULK_PAGE_SIZE:
+                return PRIORITY_BULK
+        except ValueError:
+            pass
+
+        # * The token is only peeked at for ordering; it is verified by the route as usual
+        authorization = dict(scope.get("headers", [])).get(b"authorization", b"").decode("latin-1")
+        if authorization.lower().startswith("bearer "):
+            try:
+                payload = authorization[7:].split(".")[1]
+                claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+                if CLINICAL_SCOPES & set(claims.get("scopes", [])):
+                    return PRIORITY_CLINICAL
+            except (IndexError, ValueError, AttributeError, TypeError):
+                pass
+        return PRIORITY_NORMAL
+
+    def metrics(self) -> dict:
+        return {name: limiter.metrics() for name, limiter in self.limiters.items()}
+
+
+admission_controller = AdmissionController()
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that admits, queues or sheds requests per admission class"""
+
+    def __init__(self, app, controller: AdmissionController = None):
+        self.app = app
+        self.controller = controller or admission_controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not get_settings().admission_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        admission = self.controller.classify(scope)
+        if admission is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter, priority = admission
+        if not await limiter.acquire(priority):
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "The server is overloaded, please retry later"},
+                headers={"Retry-After": str(limiter.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = monotonic()
+        responded_at = None
+        status_code = None
+
+        async def send_and_time(message):
+            nonlocal responded_at, status_code
+            if message["type"] == "http.response.start":
+                # * Latency is measured to the response headers, so long streams do not look slow
+                responded_at = monotonic()
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_time)
+        finally:
+            latency = (responded_at or monotonic()) - started
+            limiter.release(latency, overloaded=status_code in (503, 504))
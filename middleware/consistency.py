@@ -0,0 +1,46 @@
+"""
+Consistency tokens for read-your-writes on secondaries.
+
+Registered only when `SECONDARY_READS_ENABLED` is set. After a write request
+that changed something, the response carries a token naming the point in the
+oplog the client's next reads must wait for. See `utils.replica_reads`.
+"""
+
+from http.cookies import SimpleCookie
+
+from utils.replica_reads import TOKEN_COOKIE, TOKEN_HEADER, encode_token, track_writes
+from utils.settings import get_settings
+
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class ConsistencyTokenMiddleware:
+    """ASGI middleware that returns a consistency token after write requests"""
+
+    def __init__(self, app):
+        self.app = app
+        self.token_ttl = get_settings().secondary_max_staleness_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        times = track_writes()
+
+        async def send_with_token(message):
+            if message["type"] == "http.response.start" and times:
+                token = encode_token(times)
+                cookie = SimpleCookie()
+                cookie[TOKEN_COOKIE] = token
+                # * Past the staleness bound every secondary has the write anyway
+                cookie[TOKEN_COOKIE].update({"max-age": self.token_ttl, "path": "/", "httponly": True, "samesite": "lax"})
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (TOKEN_HEADER.lower().encode(), token.encode()),
+                    (b"set-cookie", cookie.output(header="").strip().encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_token)
@@ -0,0 +1,143 @@
+"""
+Request deadlines and cancellation on client disconnect.
+
+The budget of a request comes from the `X-Request-Timeout` header (seconds,
+capped at `REQUEST_TIMEOUT_MAX_SECONDS`) or, without one, from the route's
+default. The handler runs inside `request_deadline`, so its MongoDB queries and
+Redis commands stop when the budget is spent. A handler still running at the
+deadline is cancelled and answered with 504.
+
+The handler is also cancelled as soon as the client disconnects, so a request
+nobody is waiting for any more stops holding pool connections.
+
+Only reads are cancelled. A write cancelled halfway through would leave its
+side effects incomplete (an appointment saved without its counters, reminder or
+idempotent response), so POST, PUT, PATCH and DELETE requests run to completion
+with no deadline, unless their route is listed in `DEFAULT_BUDGETS`.
+"""
+
+import asyncio
+import re
+
+from starlette.responses import JSONResponse
+
+from utils.api_logger import logger
+from utils.deadline import request_deadline
+from utils.settings import get_settings
+
+
+TIMEOUT_HEADER = b"x-request-timeout"
+MIN_BUDGET_SECONDS = 0.05
+
+# * Streams, metrics and docs have no deadline; the streams end when the client disconnects
+EXEMPT_PATHS = re.compile(r"^/(healthz|readyz|metrics/|docs|redoc|openapi\.json)|^/api/v1/feed/|/export$")
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# * (method, path pattern, budget in seconds); any other read gets REQUEST_TIMEOUT_SECONDS.
+# * Writes are only listed when they change nothing and are safe to cancel.
+DEFAULT_BUDGETS = [
+    # login only reads the user; bcrypt verification is slow on purpose
+    ("POST", re.compile(r"^/login$"), 5.0),
+    ("GET", re.compile(r"^/api/v1/analytics/"), 30.0),
+]
+
+
+def request_budget(scope: dict, routes: list = None) -> float | None:
+    """Return the time budget of a request in seconds, or None if it has no deadline"""
+    path, method = scope["path"], scope["method"]
+    if EXEMPT_PATHS.search(path):
+        return None
+
+    route_budget = next(
+        (
+            budget for route_method, pattern, budget in (routes if routes is not None else DEFAULT_BUDGETS)
+            if method == route_method and pattern.search(path)
+        ),
+        None,
+    )
+    if method not in SAFE_METHODS and route_budget is None:
+        return None
+
+    settings = get_settings()
+    header = dict(scope.get("headers", [])).get(TIMEOUT_HEADER)
+    if header is not None:
+        try:
+            return min(max(float(header), MIN_BUDGET_SECONDS), settings.request_timeout_max_seconds)
+        except ValueError:
+            pass
+
+    return route_budget if route_budget is not None else settings.request_timeout_seconds
+
+
+class DeadlineMiddleware:
+    """ASGI middleware that runs each request under its deadline and cancels it on disconnect"""
+
+    def __init__(self, app, routes: list = None):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not get_settings().request_deadlines_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        budget = request_budget(scope, self.routes)
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        # * Only this middleware reads from the server, so it notices a disconnect even
+        # * while the handler is busy; the handler gets the messages through a queue
+        messages: asyncio.Queue = asyncio.Queue()
+        disconnected = False
+        response_started = False
+        response_complete = False
+
+        async def relay_receive():
+            if disconnected and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        async def tracking_send(message):
+            nonlocal response_started, response_complete
+            if message["type"] == "http.response.start":
+                response_started = True
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_complete = True
+            await send(message)
+
+        async def run_handler():
+            with request_deadline(budget):
+                async with asyncio.timeout(budget):
+                    await self.app(scope, relay_receive, tracking_send)
+
+        handler = asyncio.create_task(run_handler())
+
+        async def watch_client():
+            nonlocal disconnected
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    disconnected = True
+                    if not response_complete:
+                        handler.cancel()
+                    return
+
+        watcher = asyncio.create_task(watch_client())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not disconnected:
+                raise
+            logger.info(f"Client disconnected, cancelled {scope['method']} {scope['path']}")
+        except TimeoutError:
+            if response_started:
+                raise
+            logger.error(f"{scope['method']} {scope['path']} exceeded its {budget}s deadline")
+            response = JSONResponse(status_code=504, content={"detail": "The request took too long and was cancelled"})
+            await response(scope, receive, send)
+        finally:
+            watcher.cancel()
+            handler.cancel()
@@ -1,12 +1,13 @@
 import json
 import asyncio
 import base64
-import os
 from typing import Callable, Optional
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response, JSONResponse, PlainTextResponse
-import redis.asyncio as redis
+
+from utils.settings import get_settings
+from utils.tracing import TracedRedis, tracer
 
 
 class IdempotencyMiddleware(BaseHTTPMiddleware):
@@ -18,10 +19,10 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
         lock_ttl: int = 10,
     ):
         super().__init__(app)
-        # Use environment variable if redis_url not provided
+        # Use the configured Redis URL if redis_url not provided
         if redis_url is None:
-            redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-        self._redis = redis.from_url(
+            redis_url = get_settings().redis_url
+        self._redis = TracedRedis.from_url(
             redis_url, encoding="utf-8", decode_responses=False
         )
         self.ttl = ttl_seconds
@@ -70,24 +71,25 @@ class IdempotencyMiddleware(BaseHTTPMiddleware):
         if not locked:
             # Another worker is processing this idempotency key: wait for result or timeout
             # Poll for cached response for a short time
-            for _ in range(20):  # total wait ~ lock_ttl * some fraction
-                await asyncio.sleep(0.2)
-                cached = await self._redis.get(cache_key)
-                if cached:
-                    payload = json.loads(cached.decode("utf-8"))
-                    status = payload.get("status", 200)
-                    headers = payload.get("headers", {})
-                    body_b64 = payload.get("body_b64")
-                    if body_b64 is None:
-                        body = payload.get("body")
-                        return JSONResponse(
-                            content=body, status_code=status, headers=headers
-                        )
-                    else:
-                        body_bytes = base64.b64decode(body_b64)
-                        return Response(
-                            content=body_bytes, status_code=status, headers=headers
-                        )
+            with tracer.span("idempotency lock wait", attributes={"idempotency.key": idemp_key}):
+                for _ in range(20):  # total wait ~ lock_ttl * some fraction
+                    await asyncio.sleep(0.2)
+                    cached = await self._redis.get(cache_key)
+                    if cached:
+                        payload = json.loads(cached.decode("utf-8"))
+                        status = payload.get("status", 200)
+                        headers = payload.get("headers", {})
+                        body_b64 = payload.get("body_b64")
+                        if body_b64 is None:
+                            body = payload.get("body")
+                            return JSONResponse(
+                                content=body, status_code=status, headers=headers
+                            )
+                        else:
+                            body_bytes = base64.b64decode(body_b64)
+                            return Response(
+                                content=body_bytes, status_code=status, headers=headers
+                            )
             # timed out waiting, return 202 accepted or 409 depending on desired semantics
             return JSONResponse({"detail": "Request in progress"}, status_code=202)
 
@@ -0,0 +1,107 @@
+"""
+On-demand profiling of individual requests.
+
+Registered only when `PROFILING_ENABLED` is set. A request is profiled when it
+carries a valid `X-Profile` header (issued to admins by
+`POST /metrics/profile-token` and signed with `SECRET_KEY`) or, at
+`PROFILING_SAMPLE_RATE`, at random. At most `PROFILING_MAX_CONCURRENT` requests
+are profiled at a time; others run normally. Each profile is written to
+`PROFILING_DIR` as collapsed stacks and its file name is returned in the
+`X-Profile-Id` response header.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import random
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter, time
+from uuid import uuid4
+
+from utils.api_logger import logger
+from utils.profiler import SamplingProfiler, write_collapsed
+from utils.settings import get_settings
+
+
+PROFILE_HEADER = b"x-profile"
+
+
+def _signature(expires: int) -> str:
+    return hmac.new(get_settings().secret_key.encode(), f"profile:{expires}".encode(), hashlib.sha256).hexdigest()
+
+
+def profile_token(ttl_seconds: int) -> tuple[str, int]:
+    """Issue an `X-Profile` header value.
+
+    Args:
+        ttl_seconds (int): How long the token stays valid.
+
+    Returns:
+        **tuple[str, int]**: The header value and its expiry as a Unix timestamp.
+    """
+    expires = int(time()) + ttl_seconds
+    return f"{expires}.{_signature(expires)}", expires
+
+
+def verify_profile_token(value: str) -> bool:
+    """Check the signature and expiry of an `X-Profile` header value"""
+    expires, _, signature = value.partition(".")
+    if not expires.isdigit() or int(expires) < time() or not get_settings().secret_key:
+        return False
+    return hmac.compare_digest(signature, _signature(int(expires)))
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that runs the sampling profiler around selected requests"""
+
+    def __init__(self, app):
+        settings = get_settings()
+        self.app = app
+        self.sample_rate = settings.profiling_sample_rate
+        self.max_concurrent = settings.profiling_max_concurrent
+        self.directory = Path(settings.profiling_dir)
+        self.profiler = SamplingProfiler(settings.profiling_interval_seconds)
+
+    def _selected(self, scope: dict) -> bool:
+        token = dict(scope.get("headers", [])).get(PROFILE_HEADER)
+        if token is not None:
+            return verify_profile_token(token.decode("latin-1"))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if self.profiler.active >= self.max_concurrent:
+            logger.info(f"Not profiling {scope['method']} {scope['path']}: {self.max_concurrent} profiles already running")
+            await self.app(scope, receive, send)
+            return
+
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        route = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-") or "root"
+        profile_id = f"{stamp}-{scope['method']}-{route}-{uuid4().hex[:8]}.collapsed"
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        task = asyncio.current_task()
+        started = perf_counter()
+        self.profiler.start(task)
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            counts = self.profiler.stop(task)
+            elapsed_ms = (perf_counter() - started) * 1000
+            try:
+                await asyncio.to_thread(write_collapsed, self.directory / profile_id, counts)
+                logger.info(
+                    f"Profiled {scope['method']} {scope['path']} in {elapsed_ms:.1f}ms "
+                    f"({counts.total()} samples): {profile_id}"
+                )
+            except OSError as e:
+                logger.error(f"Writing profile {profile_id} failed: {e}")
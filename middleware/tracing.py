@@ -0,0 +1,48 @@
+"""
+Server spans for incoming requests.
+
+Each sampled request gets a span named after its route template
+(`GET /api/v1/doctors/{doctor_id}`), continuing the caller's trace when a
+`traceparent` header is sent. The span's `traceparent` is returned in the
+`traceresponse` header so a slow response can be looked up in the exported spans.
+"""
+
+from utils.tracing import tracer
+
+
+class TracingMiddleware:
+    """ASGI middleware that records a server span per sampled request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = dict(scope.get("headers", [])).get(b"traceparent", b"").decode("latin-1")
+        span = tracer.start_trace(f"{scope['method']} {scope['path']}", traceparent)
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_traced(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                message["headers"] = [*message.get("headers", []), (b"traceresponse", span.traceparent.encode())]
+            await send(message)
+
+        span.attributes.update({"http.method": scope["method"], "http.target": scope["path"]})
+        try:
+            with tracer.activate(span):
+                await self.app(scope, receive, send_traced)
+        except BaseException as e:
+            span.record_error(repr(e))
+            raise
+        finally:
+            route = scope.get("route")
+            if route is not None and hasattr(route, "path"):
+                span.name = f"{scope['method']} {route.path}"
+                span.set_attribute("http.route", route.path)
+            tracer.end(span)
@@ -0,0 +1,30 @@
+"""
+Pre-aggregated analytics models.
+"""
+
+from beanie import Document, PydanticObjectId
+from pydantic import Field, field_serializer
+from pymongo import ASCENDING, IndexModel
+from typing import Annotated
+from datetime import datetime
+
+
+class DiagnosisRollup(Document):
+    """Number of diagnoses per day, severity and condition"""
+    day: Annotated[datetime, Field(description="Start of the day the diagnoses were made")]
+    severity: Annotated[str, Field(description="Normalized severity assessment")]
+    condition: Annotated[str, Field(description="Normalized primary diagnosis")]
+    total: Annotated[int, Field(ge=0, default=0)]
+
+    @field_serializer("id")
+    def convert_pydantic_object_id_to_string(self, id: PydanticObjectId) -> str:
+        return str(id)
+
+    class Settings:
+        indexes = [
+            IndexModel(
+                [("day", ASCENDING), ("severity", ASCENDING), ("condition", ASCENDING)],
+                unique=True,
+                name="day_severity_condition",
+            ),
+        ]
@@ -4,6 +4,7 @@ from beanie import PydanticObjectId
 
 from beanie import Document
 from pydantic import Field, field_serializer
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from typing import Annotated, Optional, Literal
 from datetime import datetime
 
@@ -18,4 +19,10 @@ class Appointment(Document):
 
     @field_serializer("id")
     def convert_pydantic_object_id_to_string(self, id: PydanticObjectId) -> str:
-        return str(id)
\ No newline at end of file
+        return str(id)
+
+    class Settings:
+        indexes = [
+            IndexModel([("patient", ASCENDING), ("appointment_date", DESCENDING)], name="patient_appointment_date"),
+            IndexModel([("doctor", ASCENDING), ("appointment_date", DESCENDING)], name="doctor_appointment_date"),
+        ]
@@ -0,0 +1,44 @@
+"""
+Archive (cold tier) models.
+
+Completed and canceled appointments and diagnoses older than the archive
+horizon are moved here by the tiering job (see `utils.tiering`), which keeps
+the hot collections, their indexes and the working set of everyday queries
+small. Archived records keep their IDs and fields; reads that can reach old
+records fall through to these collections.
+"""
+
+from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from typing import Annotated
+from datetime import datetime
+
+from .appointment import Appointment
+from .diagnosis import Diagnosis
+
+
+class ArchivedAppointment(Appointment):
+    """Appointment moved to the archive"""
+    archived_at: Annotated[datetime, Field(default_factory=datetime.now, serialization_alias="archivedAt")]
+
+    class Settings:
+        name = "AppointmentArchive"
+        indexes = [
+            IndexModel([("patient", ASCENDING), ("appointment_date", DESCENDING)], name="patient_appointment_date"),
+            IndexModel([("doctor", ASCENDING), ("appointment_date", DESCENDING)], name="doctor_appointment_date"),
+        ]
+
+
+class ArchivedDiagnosis(Diagnosis):
+    """Diagnosis moved to the archive.
+
+    Only the per-patient index is kept; symptom facets and text search cover
+    the hot collection.
+    """
+    archived_at: Annotated[datetime, Field(default_factory=datetime.now, serialization_alias="archivedAt")]
+
+    class Settings:
+        name = "DiagnosisArchive"
+        indexes = [
+            IndexModel([("diagnosed_user_id", ASCENDING), ("created_at", DESCENDING)], name="diagnosed_user_created_at"),
+        ]
@@ -5,8 +5,15 @@ Contains all the database models for the diagnosis module.
 from beanie import PydanticObjectId
 
 from beanie import Document
-from pydantic import Field, field_serializer
-from typing import Annotated
+from pydantic import Field, field_serializer, model_validator
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from typing import Annotated, Optional, Self
+from datetime import datetime
+
+
+def normalize_symptom(symptom: str) -> str:
+    """Normalize a symptom for indexing and filtering (trimmed, single-spaced, lower case)"""
+    return " ".join(symptom.split()).lower()
 
 
 class Diagnosis(Document):
@@ -17,11 +24,36 @@ class Diagnosis(Document):
     description: Annotated[str, Field(description="Detailed description of the diagnosis", serialization_alias="description")]
     precautions: Annotated[list[str], Field(description="List of precautions to be taken", default_factory=list, serialization_alias="precautions")]
     severity_assessment: Annotated[str, Field(description="Assessment of the severity of the diagnosis", serialization_alias="severityAssessment")]
-    initial_symptom: Annotated[str, Field(description="Initial symptom reported by the user", default=None, serialization_alias="initialSymptom")]
+    initial_symptom: Annotated[Optional[str], Field(description="Initial symptom reported by the user", default=None, serialization_alias="initialSymptom")]
     additional_symptoms: Annotated[list[str], Field(description="List of additional symptoms reported by the user", default_factory=list, serialization_alias="additionalSymptoms")]
     days_experiencing: Annotated[int, Field(description="Number of days the user has been experiencing symptoms", default=0, serialization_alias="daysExperiencingSymptoms")]
     confidence_level: Annotated[str, Field(description="Confidence level of the diagnosis", serialization_alias="confidenceLevel")]
+    symptoms: Annotated[list[str], Field(description="Normalized initial and additional symptoms, used for search and facets", default_factory=list, serialization_alias="symptoms")]
+    created_at: Annotated[datetime, Field(default_factory=datetime.now, serialization_alias="createdAt")]
+
+    # * Keep the normalized symptoms in sync with the reported ones
+    @model_validator(mode="after")
+    def derive_symptoms(self) -> Self:
+        reported = [self.initial_symptom, *self.additional_symptoms] if self.initial_symptom else self.additional_symptoms
+        self.symptoms = list(dict.fromkeys(normalize_symptom(symptom) for symptom in reported if symptom))
+        return self
 
     @field_serializer("id")
     def convert_pydantic_object_id_to_string(self, id: PydanticObjectId) -> str:
-        return str(id)
\ No newline at end of file
+        return str(id)
+
+    class Settings:
+        indexes = [
+            IndexModel([("diagnosed_user_id", ASCENDING), ("created_at", DESCENDING)], name="diagnosed_user_created_at"),
+            IndexModel([("symptoms", ASCENDING), ("_id", DESCENDING)], name="symptoms"),
+            IndexModel(
+                [
+                    ("primary_diagnosis", TEXT),
+                    ("secondary_diagnoses", TEXT),
+                    ("symptoms", TEXT),
+                    ("description", TEXT),
+                ],
+                weights={"primary_diagnosis": 10, "secondary_diagnoses": 5, "symptoms": 5, "description": 1},
+                name="diagnosis_text_search",
+            ),
+        ]
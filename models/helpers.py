@@ -1,8 +1,23 @@
 """Helper Models for all the other models in the application
 """
 
-from pydantic import BaseModel, Field, EmailStr
-from typing import Annotated
+import unicodedata
+
+from pydantic import BaseModel, Field, EmailStr, field_validator, model_validator
+from typing import Annotated, Literal, Optional, Self
+
+
+def minute_of_day(time: str) -> int:
+    """Convert a "HH:MMAM"/"HH:MMPM" time to the number of minutes since midnight"""
+    hours, minutes = int(time[:2]) % 12, int(time[3:5])
+    if time[5:] == "PM":
+        hours += 12
+    return hours * 60 + minutes
+
+def fold_search_key(text: str) -> str:
+    """Normalize text for prefix search (accents removed, case-folded, trimmed, single-spaced)"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return " ".join("".join(char for char in decomposed if not unicodedata.combining(char)).casefold().split())
 
 class Address(BaseModel):
     """Address Model"""
@@ -34,6 +49,31 @@ class OperationalHours(BaseModel):
             pattern=r"^(0[1-9]|1[0-2]):([0-5][0-9])(AM|PM)$",
         ),
     ]
+    open_minute: Annotated[Optional[int], Field(default=None, ge=0, lt=24 * 60, serialization_alias="openMinute")]
+    close_minute: Annotated[Optional[int], Field(default=None, ge=0, lt=24 * 60, serialization_alias="closeMinute")]
+    overnight: Annotated[bool, Field(default=False, description="Closes after midnight (or never closes)")]
+
+    # * Precompute minute-of-day ranges so "open now" is an indexed range query instead of string parsing
+    @model_validator(mode="after")
+    def compute_minute_ranges(self) -> Self:
+        self.open_minute = minute_of_day(self.open_time)
+        self.close_minute = minute_of_day(self.close_time)
+        self.overnight = self.close_minute <= self.open_minute
+        return self
+
+
+class GeoPoint(BaseModel):
+    """GeoJSON Point Model"""
+    type: Annotated[Literal["Point"], Field(default="Point")]
+    coordinates: Annotated[list[float], Field(min_length=2, max_length=2, description="[longitude, latitude]")]
+
+    @field_validator("coordinates")
+    @classmethod
+    def validate_coordinates(cls, v):
+        longitude, latitude = v
+        if not -180 <= longitude <= 180 or not -90 <= latitude <= 90:
+            raise ValueError("Coordinates must be [longitude, latitude] within valid ranges")
+        return v
 
 class Reviews(BaseModel):
     """
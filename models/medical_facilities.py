@@ -1,30 +1,42 @@
 """Medical Facility Model
 """
 
-from beanie import Document
-from pydantic import Field
+from beanie import Document, PydanticObjectId
+from pydantic import Field, field_serializer
+from pymongo import ASCENDING, GEOSPHERE, IndexModel
 from typing import Annotated
 
-from .helpers import ContactInfo, Address, OperationalHours, Reviews
-from .pharmacy import DrugInventory
+from .helpers import ContactInfo, Address, OperationalHours, GeoPoint
 
 class MedicalFacilityBase(Document):
     """Medical Facility Model"""
     name: Annotated[str, Field(max_length=100)]
-    address: Annotated[str, Field(max_length=200)]
+    address: Annotated[Address, Field()]
+    location: Annotated[GeoPoint, Field(description="GeoJSON location of the facility")]
     contact_info: Annotated[ContactInfo, Field()]
-    reviews: Annotated[list[Reviews], Field(default_factory=list)]
+    # * Reviews live in the Review collection; only their aggregates live here
+    rating_sum: Annotated[float, Field(ge=0, default=0, serialization_alias="ratingSum")]
+    rating_count: Annotated[int, Field(ge=0, default=0, serialization_alias="ratingCount")]
+    rating_average: Annotated[float, Field(ge=0, default=0, serialization_alias="ratingAverage")]
     operational_hours: Annotated[
         OperationalHours, Field(serialization_alias="operationalHours")
     ]
 
+    @field_serializer("id")
+    def convert_pydantic_object_id_to_string(self, id: PydanticObjectId) -> str:
+        return str(id)
+
+    class Settings:
+        indexes = [
+            IndexModel([("location", GEOSPHERE), ("specialties", ASCENDING)], name="location_specialties"),
+        ]
+
 
 class Pharmacy(MedicalFacilityBase):
-    """Pharmacy Model"""
-    available_drugs: Annotated[
-        list[DrugInventory],
-        Field(default_factory=list, serialization_alias="availableDrugs"),
-    ]
+    """Pharmacy Model
+
+    Stock is kept in `DrugInventory`, never embedded in the pharmacy document.
+    """
 
 class Clinic(MedicalFacilityBase):
     """Clinic Model"""
@@ -35,4 +47,4 @@ class Clinic(MedicalFacilityBase):
 class Hospital(MedicalFacilityBase):
     """Hospital Model"""
     specialties: Annotated[list[str], Field(default_factory=list)]
-    doctors: Annotated[list[str], Field(default_factory=list)]
\ No newline at end of file
+    doctors: Annotated[list[str], Field(default_factory=list)]
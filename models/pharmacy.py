@@ -3,10 +3,9 @@
 
 from beanie import Document, PydanticObjectId
 from pydantic import Field, field_serializer
+from pymongo import ASCENDING, IndexModel
 from typing import Annotated, Optional
 
-from .helpers import Reviews
-
 class DrugManufacturer(Document):
     """Drug Manufacturer Model"""
     name: Annotated[str, Field(max_length=100)]
@@ -23,16 +22,22 @@ class Drug(Document):
     """Drugs Model"""
     name: Annotated[str, Field(max_length=100)]
     description: Annotated[str, Field(max_length=500)]
-    reviews: Annotated[list[Reviews], Field(default_factory=list)]
+    # * Reviews live in the Review collection; only their aggregates live here
+    rating_sum: Annotated[float, Field(ge=0, default=0, serialization_alias="ratingSum")]
+    rating_count: Annotated[int, Field(ge=0, default=0, serialization_alias="ratingCount")]
+    rating_average: Annotated[float, Field(ge=0, default=0, serialization_alias="ratingAverage")]
     side_effects: Annotated[list[str], Field(default_factory=list, serialization_alias="sideEffects")]
-    manufacturer: Annotated[DrugManufacturer, Field()]
+    manufacturer_id: Annotated[str, Field(serialization_alias="manufacturerId")]
 
     @field_serializer("id")
     def convert_pydantic_object_id_to_string(self, id: PydanticObjectId) -> str:
         return str(id)
 
 class DrugInventory(Document):
-    """Drug Inventory Model"""
+    """Drug Inventory Model
+
+    The single source of truth for stock: one document per drug per pharmacy.
+    """
     drug_id: Annotated[str, Field(serialization_alias="drugId")]
     pharmacy_id: Annotated[str, Field(serialization_alias="pharmacyId")]
     quantity: Annotated[int, Field(ge=0)]
@@ -40,4 +45,10 @@ class DrugInventory(Document):
 
     @field_serializer("id")
     def convert_pydantic_object_id_to_string(self, id: PydanticObjectId) -> str:
-        return str(id)
\ No newline at end of file
+        return str(id)
+
+    class Settings:
+        indexes = [
+            IndexModel([("drug_id", ASCENDING), ("pharmacy_id", ASCENDING)], unique=True, name="drug_pharmacy"),
+            IndexModel([("pharmacy_id", ASCENDING), ("drug_id", ASCENDING)], name="pharmacy_drug"),
+        ]
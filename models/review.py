@@ -0,0 +1,35 @@
+"""
+Review Model
+"""
+
+from beanie import Document, PydanticObjectId
+from pydantic import Field, field_serializer
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from typing import Annotated, Literal
+from datetime import datetime
+
+
+class Review(Document):
+    """Review of a doctor, facility or drug, stored apart from the reviewed document"""
+    target_type: Annotated[
+        Literal["doctor", "hospital", "clinic", "pharmacy", "drug"],
+        Field(serialization_alias="targetType"),
+    ]
+    target_id: Annotated[str, Field(serialization_alias="targetId")]
+    user_id: Annotated[str, Field(max_length=100, serialization_alias="userId")]
+    rating: Annotated[float, Field(ge=0, le=5)]
+    comment: Annotated[str, Field(max_length=500)]
+    created_at: Annotated[datetime, Field(default_factory=datetime.now, serialization_alias="createdAt")]
+
+    @field_serializer("id")
+    def convert_pydantic_object_id_to_string(self, id: PydanticObjectId) -> str:
+        return str(id)
+
+    class Settings:
+        indexes = [
+            # * Newest-first pages of a target's reviews; `_id` keeps the order total for cursors
+            IndexModel(
+                [("target_type", ASCENDING), ("target_id", ASCENDING), ("_id", DESCENDING)],
+                name="target_newest",
+            ),
+        ]
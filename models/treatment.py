@@ -3,19 +3,29 @@
 
 from beanie import Document, PydanticObjectId
 from pydantic import Field, field_serializer
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from typing import Annotated
 
 from datetime import datetime
-from .pharmacy import Drug
 
 
 class Treatment(Document):
     """Treatment Model"""
     patient_id: Annotated[str, Field(serialization_alias="patientId")]
     doctor_id: Annotated[str, Field(serialization_alias="doctorId")]
-    medication: Annotated[Drug, Field()]
+    drug_id: Annotated[str, Field(description="The ID of the prescribed drug", serialization_alias="drugId")]
     dosage: Annotated[str, Field(max_length=100)]
     frequency: Annotated[str, Field(max_length=100)]
     start_date: Annotated[datetime, Field(default_factory=datetime.now, serialization_alias="startDate")]
     end_date: Annotated[datetime, Field(default_factory=datetime.now, serialization_alias="endDate")]
-    notes: Annotated[str | None, Field(max_length=500, default=None)]
\ No newline at end of file
+    notes: Annotated[str | None, Field(max_length=500, default=None)]
+
+    @field_serializer("id")
+    def convert_pydantic_object_id_to_string(self, id: PydanticObjectId) -> str:
+        return str(id)
+
+    class Settings:
+        indexes = [
+            IndexModel([("patient_id", ASCENDING), ("start_date", DESCENDING)], name="patient_start_date"),
+            IndexModel([("doctor_id", ASCENDING), ("start_date", DESCENDING)], name="doctor_start_date"),
+        ]
@@ -1,19 +1,24 @@
 """User models for the application."""
 
-from pydantic import BaseModel, Field, field_serializer
-from typing import Optional, Annotated, Literal
+from pydantic import BaseModel, Field, field_serializer, model_validator
+from typing import Optional, Annotated, Literal, Self
 
 from beanie import Document, PydanticObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 from datetime import datetime
 
-from .helpers import ContactInfo, Reviews, BirthDetails
-from .treatment import Treatment
+from .helpers import ContactInfo, Reviews, BirthDetails, fold_search_key
 
 from .appointment import Appointment
 
 from .medical_facilities import Pharmacy, Hospital, Clinic
 
+def patient_search_keys(first_name: str, last_name: str, email: str) -> list[str]:
+    """Folded typeahead keys of a patient: "first last", "last first" and the email"""
+    keys = [f"{first_name} {last_name}", f"{last_name} {first_name}", email]
+    return list(dict.fromkeys(fold_search_key(key) for key in keys))
+
 class UserBase(BaseModel):
     """Base Model for all users
     """
@@ -35,25 +40,33 @@ class Patient(UserBase, Document):
     medical_history: Annotated[list[str], Field(default_factory=list, serialization_alias="medicalHistory")]
     insurance_provider: Annotated[Optional[str], Field(max_length=100, default=None, serialization_alias="insuranceProvider")]
     insurance_number: Annotated[Optional[str], Field(max_length=50, default=None, serialization_alias="insuranceNumber")]
-    diagnoses: Annotated[
-        list[str],
-        Field(
-            default_factory=list,
-            serialization_alias="diagnoses",
-        ),
-    ]
     height: Annotated[Optional[float], Field(ge=0, default=None, serialization_alias="height")]
     weight: Annotated[Optional[float], Field(ge=0, default=None, serialization_alias="weight")]
-    treatments: Annotated[list[Optional[Treatment]], Field(default_factory=list, serialization_alias="treatments")]
-    appointments: Annotated[list[str], Field(default_factory=list)]
+    # * Appointments, diagnoses and treatments reference the patient; only their counts live here
+    appointment_count: Annotated[int, Field(ge=0, default=0, serialization_alias="appointmentCount")]
+    diagnosis_count: Annotated[int, Field(ge=0, default=0, serialization_alias="diagnosisCount")]
+    treatment_count: Annotated[int, Field(ge=0, default=0, serialization_alias="treatmentCount")]
+    search_keys: Annotated[list[str], Field(default_factory=list, description="Folded name and email keys, used for typeahead", serialization_alias="searchKeys")]
     role: Annotated[
         Literal["patient", "doctor", "nurse", "admin", "pharmacist"], Field()
     ]
 
+    # * Keep the typeahead keys in sync with the name and email
+    @model_validator(mode="after")
+    def derive_search_keys(self) -> Self:
+        self.search_keys = patient_search_keys(self.first_name, self.last_name, self.contact_info.email)
+        return self
+
     @field_serializer("id")
     def convert_pydantic_object_id_to_string(self, id: PydanticObjectId) -> str:
         return str(id)
 
+    class Settings:
+        indexes = [
+            # * Keys are folded before they are stored, so prefix ranges on the plain binary order are exact
+            IndexModel([("search_keys", ASCENDING)], name="search_keys"),
+        ]
+
 
 class Doctor(UserBase, Document):
     """Doctor Model"""
@@ -62,8 +75,11 @@ class Doctor(UserBase, Document):
     years_of_experience: Annotated[int, Field(ge=0, serialization_alias="yearsOfExperience")]
     patients: Annotated[list[Patient], Field(default_factory=list)]
     medical_facility: Annotated[str, Field(serialization_alias="medicalFacility")]
-    reviews: Annotated[list[Reviews], Field(default_factory=list)]
-    appointments: Annotated[list[str], Field(default_factory=list)]
+    # * Appointments and reviews reference the doctor; only their aggregates live here
+    appointment_count: Annotated[int, Field(ge=0, default=0, serialization_alias="appointmentCount")]
+    rating_sum: Annotated[float, Field(ge=0, default=0, serialization_alias="ratingSum")]
+    rating_count: Annotated[int, Field(ge=0, default=0, serialization_alias="ratingCount")]
+    rating_average: Annotated[float, Field(ge=0, default=0, serialization_alias="ratingAverage")]
     role: Annotated[
         Literal["patient", "doctor", "nurse", "admin", "pharmacist"], Field()
     ]
@@ -72,6 +88,28 @@ class Doctor(UserBase, Document):
     def convert_pydantic_object_id_to_string(self, id: PydanticObjectId) -> str:
         return str(id)
 
+    class Settings:
+        indexes = [
+            # * Serves "top rated by specialty" as an index walk, filtering on the review count within the index
+            IndexModel(
+                [("specialty", ASCENDING), ("rating_average", DESCENDING), ("rating_count", DESCENDING)],
+                name="specialty_rating",
+            ),
+            # * Doctor search filters: specialty (multikey), facility and experience, alone or combined
+            IndexModel(
+                [("specialty", ASCENDING), ("medical_facility", ASCENDING), ("years_of_experience", ASCENDING)],
+                name="specialty_facility_experience",
+            ),
+            IndexModel([("medical_facility", ASCENDING), ("years_of_experience", ASCENDING)], name="facility_experience"),
+            IndexModel([("years_of_experience", ASCENDING)], name="experience"),
+            # * Doctor search results, best rated first, with and without a specialty filter
+            IndexModel(
+                [("specialty", ASCENDING), ("rating_average", DESCENDING), ("_id", DESCENDING)],
+                name="specialty_rating_id",
+            ),
+            IndexModel([("rating_average", DESCENDING), ("_id", DESCENDING)], name="rating"),
+        ]
+
 
 class Nurse(UserBase, Document):
     """Nurse Model"""
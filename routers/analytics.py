@@ -0,0 +1,48 @@
+"""
+Analytics Router with dashboard aggregates served from pre-aggregated rollups.
+"""
+
+from utils.api_logger import logger
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+
+from fastapi_limiter.depends import RateLimiter
+from typing import List, Annotated, Optional, Literal
+from datetime import datetime
+
+from schema.responses.analytics import DiagnosisAnalyticsResponse, DiagnosisCountBucket
+from utils.analytics import diagnosis_counts
+
+
+router = APIRouter(
+    prefix="/api/v1/analytics",
+    tags=["Analytics"],
+    dependencies=[Depends(RateLimiter(times=5, seconds=60))],  # Limit to 5 requests per minute per IP
+)
+
+
+@router.get("/diagnoses", response_model=DiagnosisAnalyticsResponse, status_code=status.HTTP_200_OK)
+async def get_diagnosis_analytics(
+    start: Annotated[Optional[datetime], Query(description="Inclusive start day")] = None,
+    end: Annotated[Optional[datetime], Query(description="Exclusive end day")] = None,
+    group_by: Annotated[
+        List[Literal["day", "severity", "condition"]],
+        Query(description="Dimensions to group the counts by"),
+    ] = ["day"],
+    severity: Annotated[Optional[str], Query(description="Only count this severity")] = None,
+    condition: Annotated[Optional[str], Query(description="Only count this condition")] = None,
+):
+    """Get diagnosis counts per day, severity and/or condition.
+
+    Counts are read from rollup documents maintained as diagnoses are created,
+    so the cost depends on the number of buckets, not the number of diagnoses.
+    """
+    try:
+        groups = await diagnosis_counts(start, end, list(dict.fromkeys(group_by)), severity, condition)
+        return DiagnosisAnalyticsResponse(
+            buckets=[DiagnosisCountBucket(**group) for group in groups],
+            total=sum(group["count"] for group in groups),
+        )
+    except Exception as e:
+        logger.error(f"An error occurred while retrieving diagnosis analytics: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Something went wrong: {e}")
@@ -5,24 +5,31 @@ Appointment Router with all the routes for managing appointments.
 
 from utils.api_logger import logger
 
-from fastapi import APIRouter, Depends, HTTPException, status, Security, Query, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Security, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from fastapi_limiter.depends import RateLimiter
 from beanie import PydanticObjectId
 from typing import List, Annotated, Optional
+from datetime import datetime
 
-from pydantic import ValidationError, Field
+from pydantic import ValidationError, Field, TypeAdapter
 
 from models.appointment import Appointment
 from schema.responses.appointment import AppointmentInDB, AppointmentCreateResponse
 from schema.requests.appointment import AppointmentCreateRequest
 
-from utils.background_tasks import notify_appointment_creation
+from utils.jobs import job_queue
+from utils.reminders import reminder_queue
+from utils.replica_reads import ReplicaReads, get_replica_reads
+from utils.tiering import archive_union, get_with_archive, spans_archive
+from utils.wire import MSGPACK, NDJSON, negotiated, encode_records, stream_response
 
-from models.users import Patient, Doctor
+from models.users import Admin, Patient, Doctor
 
-from beanie.operators import And
+from security.helpers import get_current_active_user
+
+from beanie.operators import Inc
 from beanie.exceptions import DocumentNotFound
 
 
@@ -34,7 +41,7 @@ router = APIRouter(
 
 
 @router.post("", response_model=AppointmentCreateResponse, status_code=status.HTTP_201_CREATED)
-async def create_appointment(request: AppointmentCreateRequest, background_tasks: BackgroundTasks):
+async def create_appointment(request: AppointmentCreateRequest):
     """Create a new appointment.
 
     This endpoint creates a new appointment in the system. It does not require authentication.
@@ -62,15 +69,22 @@ async def create_appointment(request: AppointmentCreateRequest, background_tasks
 
         await new_appointment.save()
 
-        patient_in_db.appointments.append(str(new_appointment.id))
-        doctor_in_db.appointments.append(str(new_appointment.id))
-
-        await patient_in_db.save()
-        await doctor_in_db.save()
+        # * Only the counters change, so the write size does not grow with the appointment history
+        await patient_in_db.update(Inc({Patient.appointment_count: 1}))
+        await doctor_in_db.update(Inc({Doctor.appointment_count: 1}))
 
         appointment_in_db = AppointmentInDB(**new_appointment.model_dump())
 
-        background_tasks.add_task(notify_appointment_creation, appointment=appointment_in_db)
+        # * The notification job and the reminder share one Redis round trip
+        async with job_queue.redis.pipeline(transaction=True) as pipe:
+            await job_queue.enqueue(
+                "notify_appointment_creation",
+                {"appointment_id": str(new_appointment.id)},
+                job_id=f"appointment-created:{new_appointment.id}",
+                pipe=pipe,
+            )
+            await reminder_queue.schedule(new_appointment, pipe)
+            await pipe.execute()
         
         return AppointmentCreateResponse(message="Appointment created successfully", appointment=appointment_in_db)
     except ValidationError as e:
@@ -81,6 +95,40 @@ async def create_appointment(request: AppointmentCreateRequest, background_tasks
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Something went wrong: {e}")
     
     
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={status.HTTP_200_OK: {"content": {NDJSON: {}, MSGPACK: {}}}},
+)
+async def export_appointments(
+    request: Request,
+    current_user: Annotated[Admin, Security(get_current_active_user, scopes=["admin"])],
+    doctor_id: Annotated[Optional[str], Query(description="Filter by doctor ID")] = None,
+    patient_id: Annotated[Optional[str], Query(description="Filter by patient ID")] = None,
+):
+    """Export every matching appointment as a stream (admins only).
+
+    Returns newline-delimited JSON, or a sequence of MessagePack objects with
+    `Accept: application/msgpack`. Large exports are compressed with zstd or gzip
+    when the client sends a matching `Accept-Encoding`.
+
+    **doctor_id**: Filter appointments by doctor ID (optional).
+    **patient_id**: Filter appointments by patient ID (optional).
+    """
+    filters = []
+    if doctor_id:
+        filters.append(Appointment.doctor == doctor_id)
+    if patient_id:
+        filters.append(Appointment.patient == patient_id)
+
+    async def records():
+        async for appointment in Appointment.find(*filters).sort(+Appointment.id):
+            yield AppointmentInDB(**appointment.model_dump())
+
+    chunks, media_type = encode_records(request, AppointmentInDB, records())
+    return await stream_response(request, chunks, media_type)
+
+
 @router.get("/{appointment_id}", response_model=AppointmentInDB, status_code=status.HTTP_200_OK)
 async def get_appointment(appointment_id: str):
     """Get an appointment by ID.
@@ -88,10 +136,10 @@ async def get_appointment(appointment_id: str):
     This endpoint retrieves an appointment by its ID. It does not require authentication.
     Due to the time constraints of the hackathon, error handling is minimal.
     
-    **appointment_id**: The ID of the appointment to retrieve.
+    **appointment_id**: The ID of the appointment to retrieve. Archived appointments are found too.
     """ 
     try:
-        appointment = await Appointment.get(PydanticObjectId(appointment_id))
+        appointment = await get_with_archive(Appointment, PydanticObjectId(appointment_id))
         
         if not appointment:
             raise DocumentNotFound
@@ -107,10 +155,22 @@ async def get_appointment(appointment_id: str):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Something went wrong: {e}")
 
 
-@router.get("", response_model=List[AppointmentInDB], status_code=status.HTTP_200_OK)
+appointment_list_adapter = TypeAdapter(List[AppointmentInDB])
+
+
+@router.get(
+    "",
+    response_model=List[AppointmentInDB],
+    status_code=status.HTTP_200_OK,
+    responses={status.HTTP_200_OK: {"content": {MSGPACK: {}}}},
+)
 async def get_appointments(
+    request: Request,
+    reads: Annotated[ReplicaReads, Depends(get_replica_reads)],
     doctor_id: Annotated[Optional[str], Query(description="Filter by doctor ID")] = None,
     patient_id: Annotated[Optional[str], Query(description="Filter by patient ID")] = None,
+    from_date: Annotated[Optional[datetime], Query(description="Only appointments on or after this date")] = None,
+    to_date: Annotated[Optional[datetime], Query(description="Only appointments on or before this date")] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, le=100),
 ):
@@ -119,24 +179,48 @@ async def get_appointments(
     This endpoint has pagination support. It does not require authentication.
     Due to the time constraints of the hackathon, error handling is minimal.
     
-    Returns a list of appointments.
+    Returns a list of appointments, as MessagePack with `Accept: application/msgpack`.
+    Served from a secondary when secondary reads are enabled; send the
+    `X-Consistency-Token` returned by `create_appointment` to see the new appointment.
     
     **skip**: Number of records to skip (default is 0).
     **limit**: Maximum number of records to return (default is 10, max is 100).
     **doctor_id**: Filter appointments by doctor ID (optional).
     **patient_id**: Filter appointments by patient ID (optional).
+    **from_date** / **to_date**: Filter by appointment date (optional). Results are then
+    ordered newest first, and a range reaching past the archive horizon includes
+    archived appointments.
     """
+    # * Appointment dates are stored as naive local times; bring "...Z" or "+02:00" inputs to the same convention
+    from_date, to_date = (
+        value.astimezone().replace(tzinfo=None) if value and value.tzinfo else value
+        for value in (from_date, to_date)
+    )
+
     try:
-        
-        if doctor_id and patient_id:
-            appointments = await Appointment.find(And(Appointment.doctor == doctor_id, Appointment.patient == patient_id)).skip(skip).limit(limit).to_list()
-        elif doctor_id:
-            appointments = await Appointment.find(Appointment.doctor == doctor_id).skip(skip).limit(limit).to_list()
-        elif patient_id:
-            appointments = await Appointment.find(Appointment.patient == patient_id).skip(skip).limit(limit).to_list()
+        filters = []
+        if doctor_id:
+            filters.append(Appointment.doctor == doctor_id)
+        if patient_id:
+            filters.append(Appointment.patient == patient_id)
+        if from_date:
+            filters.append(Appointment.appointment_date >= from_date)
+        if to_date:
+            filters.append(Appointment.appointment_date <= to_date)
+        query = Appointment.find(*filters)
+
+        if spans_archive(from_date, to_date):
+            pipeline = archive_union(query, {"appointment_date": -1, "_id": -1}, skip, limit)
+            appointments = await reads.aggregate(Appointment, pipeline)
+        elif from_date or to_date:
+            appointments = await reads.to_list(query.sort(-Appointment.appointment_date, -Appointment.id).skip(skip).limit(limit))
         else:
-            appointments = await Appointment.find().skip(skip).limit(limit).to_list()
-        return [AppointmentInDB(**appointment.model_dump()) for appointment in appointments]
+            appointments = await reads.to_list(query.skip(skip).limit(limit))
+        return negotiated(
+            request,
+            appointment_list_adapter,
+            [AppointmentInDB(**appointment.model_dump()) for appointment in appointments],
+        )
     except DocumentNotFound:
         logger.error("No appointments found")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No appointments found")
@@ -1,4 +1,3 @@
-import os
 from datetime import timedelta
 
 from fastapi import APIRouter, status, HTTPException, Depends
@@ -6,13 +5,11 @@ from fastapi.security import OAuth2PasswordRequestForm
 
 from typing import Annotated
 
-from dotenv import load_dotenv
-
 from security.helpers import authenticate_user, create_access_token
 
 from security.schema import Token, LoginResponse
 
-load_dotenv()
+from utils.settings import get_settings
 
 
 router = APIRouter(tags=["Auth"])
@@ -26,7 +23,7 @@ async def login_for_access_token(
 
     if user:
         access_token_expires = timedelta(
-            minutes=int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+            minutes=get_settings().access_token_expire_minutes
         )
         access_token = create_access_token(
             data={"sub": user.contact_info.email, "scopes": user.permissions},
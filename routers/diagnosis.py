@@ -2,19 +2,26 @@
 """
 
 from utils.api_logger import logger
-from fastapi import APIRouter, Depends, HTTPException, status, Security, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Security, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 
 
 from fastapi_limiter.depends import RateLimiter
 from beanie import PydanticObjectId
+from beanie.operators import Inc
 from typing import List, Annotated, Optional
 
 
-from pydantic import ValidationError, Field
+from pydantic import ValidationError, Field, TypeAdapter
 from models.diagnosis import Diagnosis
-from models.users import Patient
+from models.users import Admin, Patient
 from schema.requests.diagnosis import DiagnosisCreateRequest
+from schema.responses.diagnosis import DiagnosisSearchResponse
+from security.helpers import get_current_active_user
+from utils.diagnosis_search import search_diagnoses
+from utils.analytics import record_diagnosis
+from utils.tiering import get_with_archive
+from utils.wire import MSGPACK, NDJSON, negotiated, encode_records, stream_response
 
 
 router = APIRouter(
@@ -42,8 +49,8 @@ async def create_diagnosis(request: DiagnosisCreateRequest):
         
         await new_diagnosis.save()
         
-        patient.diagnoses.append(str(new_diagnosis.id))
-        await patient.save()
+        await patient.update(Inc({Patient.diagnosis_count: 1}))
+        await record_diagnosis(new_diagnosis)
 
         logger.info(f"New diagnosis created with ID: {new_diagnosis.id}")
 
@@ -51,7 +58,7 @@ async def create_diagnosis(request: DiagnosisCreateRequest):
             status_code=status.HTTP_201_CREATED,
             content={
                 "message": "Diagnosis created successfully",
-                "diagnosis": new_diagnosis.model_dump(),
+                "diagnosis": new_diagnosis.model_dump(mode="json"),
             },
         )
     except ValidationError as e:
@@ -68,6 +75,64 @@ async def create_diagnosis(request: DiagnosisCreateRequest):
         )
         
         
+@router.get("/search", response_model=DiagnosisSearchResponse)
+async def search_diagnosis_records(
+    q: Annotated[Optional[str], Query(max_length=200, description="Free text matched against diagnoses, description and symptoms")] = None,
+    symptoms: Annotated[Optional[List[str]], Query(description="Symptoms that must all be present")] = None,
+    cursor: Annotated[Optional[str], Query(description="The nextCursor of the previous page")] = None,
+    limit: int = Query(10, ge=1, le=100),
+):
+    """
+    Endpoint to search diagnoses.
+
+    Results are ranked by text relevance when `q` is given, newest first otherwise,
+    and include the most common symptoms among all matches.
+    """
+    if not q and not symptoms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide a search query or at least one symptom",
+        )
+
+    try:
+        return DiagnosisSearchResponse(**await search_diagnoses(q, symptoms, cursor, limit))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"An error occurred while searching diagnoses: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while searching diagnoses: {e}",
+        )
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={status.HTTP_200_OK: {"content": {NDJSON: {}, MSGPACK: {}}}},
+)
+async def export_diagnoses(
+    request: Request,
+    current_user: Annotated[Admin, Security(get_current_active_user, scopes=["admin"])],
+    user_id: Optional[str] = Query(None, description="Filter by diagnosed user ID"),
+):
+    """
+    Endpoint to export every matching diagnosis as a stream (admins only).
+
+    Returns newline-delimited JSON, or a sequence of MessagePack objects with
+    `Accept: application/msgpack`. Large exports are compressed with zstd or gzip
+    when the client sends a matching `Accept-Encoding`.
+    """
+    filters = [Diagnosis.diagnosed_user_id == user_id] if user_id else []
+
+    async def records():
+        async for diagnosis in Diagnosis.find(*filters).sort(+Diagnosis.id):
+            yield diagnosis
+
+    chunks, media_type = encode_records(request, Diagnosis, records())
+    return await stream_response(request, chunks, media_type)
+
+
 @router.get("/{diagnosis_id}", response_model=Diagnosis)
 async def get_diagnosis(
     diagnosis_id: Annotated[
@@ -75,10 +140,10 @@ async def get_diagnosis(
     ],
 ):
     """
-    Endpoint to retrieve a diagnosis's details by their ID.
+    Endpoint to retrieve a diagnosis's details by their ID. Archived diagnoses are found too.
     """
     try:
-        diagnosis = await Diagnosis.get(PydanticObjectId(diagnosis_id))
+        diagnosis = await get_with_archive(Diagnosis, PydanticObjectId(diagnosis_id))
         if not diagnosis:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -99,21 +164,25 @@ async def get_diagnosis(
         )
         
         
-@router.get("", response_model=List[Diagnosis])
+diagnosis_list_adapter = TypeAdapter(List[Diagnosis])
+
+
+@router.get("", response_model=List[Diagnosis], responses={status.HTTP_200_OK: {"content": {MSGPACK: {}}}})
 async def get_diagnoses(
+    request: Request,
     user_id: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(10, le=100)
 ):
     """
-    Endpoint to retrieve a list of diagnoses.
+    Endpoint to retrieve a list of diagnoses, as MessagePack with `Accept: application/msgpack`.
     """
     try:
         if user_id:
             diagnoses = await Diagnosis.find(Diagnosis.diagnosed_user_id == user_id).limit(limit).skip(skip).to_list()
         else:
             diagnoses = await Diagnosis.find().limit(limit).skip(skip).to_list()
-        return diagnoses
+        return negotiated(request, diagnosis_list_adapter, diagnoses)
     except Exception as e:
         logger.error(f"An error occurred while retrieving diagnoses: {e}")
         raise HTTPException(
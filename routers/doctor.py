@@ -11,15 +11,19 @@ from fastapi.responses import JSONResponse
 from fastapi_limiter.depends import RateLimiter
 
 from beanie import PydanticObjectId
-from typing import List, Annotated
+from typing import List, Annotated, Optional
 
 from pydantic import ValidationError, Field
 
 from schema.requests.users import DoctorCreateRequest
-from schema.responses.users import DoctorResponse, DoctorInDB
+from schema.responses.users import DoctorResponse, DoctorInDB, DoctorExpansions, DoctorSearchResponse
+from schema.responses.appointment import AppointmentInDB
 from models.users import Admin, Nurse, Doctor
 
 from security.helpers import get_password_hash, get_current_active_user
+from utils.doctor_search import doctor_directory, search_doctors
+from utils.loaders import RequestLoaders, get_loaders, parse_expand
+from utils.reviews import top_rated_doctors
 
 
 router = APIRouter(
@@ -49,6 +53,7 @@ async def create_new_doctor(request: DoctorCreateRequest):
         )
 
         await new_doctor.save()
+        await doctor_directory.clear()
 
         doctor_in_db = DoctorInDB(**new_doctor.model_dump())
 
@@ -71,6 +76,58 @@ async def create_new_doctor(request: DoctorCreateRequest):
         )
 
 
+@router.get("/top-rated", response_model=List[DoctorInDB])
+async def get_top_rated_doctors(
+    specialty: Annotated[str, Query(max_length=100, description="The specialty to rank")],
+    min_reviews: Annotated[int, Query(ge=1, description="Leave out doctors with fewer reviews")] = 5,
+    limit: int = Query(10, ge=1, le=100, description="Max number of doctors to return"),
+):
+    """
+    Endpoint to retrieve the best rated doctors of a specialty.
+
+    Doctors are ranked by average rating, then by number of reviews, straight
+    from the `specialty_rating` index.
+    """
+    try:
+        doctors = await top_rated_doctors(specialty, min_reviews, limit)
+        return [DoctorInDB(**doctor.model_dump()) for doctor in doctors]
+    except Exception as e:
+        logger.error(f"An error occurred while ranking doctors: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Something went wrong: {e}",
+        )
+
+
+@router.get("/search", response_model=DoctorSearchResponse)
+async def search_doctor_directory(
+    specialty: Annotated[Optional[List[str]], Query(description="Doctors with any of these specialties")] = None,
+    medical_facility: Annotated[Optional[List[str]], Query(description="Doctors working at any of these facilities")] = None,
+    min_experience: Annotated[Optional[int], Query(ge=0, description="Minimum years of experience")] = None,
+    max_experience: Annotated[Optional[int], Query(ge=0, description="Maximum years of experience")] = None,
+    cursor: Annotated[Optional[str], Query(description="The nextCursor of the previous page")] = None,
+    limit: int = Query(10, ge=1, le=100),
+):
+    """
+    Endpoint to search doctors by specialty, facility and years of experience.
+
+    Results are ranked by average rating and include the specialty, facility
+    and experience counts among all matches.
+    """
+    try:
+        found = await search_doctors(specialty, medical_facility, min_experience, max_experience, cursor, limit)
+        found["results"] = [DoctorInDB(**doctor.model_dump()) for doctor in found["results"]]
+        return DoctorSearchResponse(**found)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"An error occurred while searching doctors: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Something went wrong: {e}",
+        )
+
+
 @router.get("/{doctor_id}", response_model=DoctorResponse)
 async def get_doctor(
     doctor_id: Annotated[
@@ -80,10 +137,18 @@ async def get_doctor(
         Admin | Nurse | Doctor,
         Security(get_current_active_user, scopes=["get-doctor"]),
     ],
+    loaders: Annotated[RequestLoaders, Depends(get_loaders)],
+    expand: Annotated[Optional[str], Query(description="Comma-separated references to include: appointments")] = None,
+    expand_limit: Annotated[int, Query(ge=1, le=100, description="Maximum records included per expansion (most recent first)")] = 20,
 ):
     """
     Endpoint to retrieve a doctor's details by their ID.
+
+    With `expand=appointments`, the doctor's most recent appointments are
+    included, read from the appointments collection through the doctor foreign key.
     """
+    expansions = parse_expand(expand, {"appointments"})
+
     doctor = await Doctor.get(PydanticObjectId(doctor_id))
 
     if not doctor:
@@ -100,8 +165,15 @@ async def get_doctor(
 
     doctor_in_db = DoctorInDB(**doctor.model_dump())
 
+    expanded = None
+    if "appointments" in expansions:
+        appointments = await loaders.doctor_appointments(expand_limit).load(doctor_id) or []
+        expanded = DoctorExpansions(
+            appointments=[AppointmentInDB(**appointment.model_dump()) for appointment in appointments],
+        )
+
     return DoctorResponse(
-        message="Doctor retrieved successfully", doctor=doctor_in_db
+        message="Doctor retrieved successfully", doctor=doctor_in_db, expanded=expanded
     )
 
 
@@ -113,8 +185,11 @@ async def get_doctors(
     """
     Endpoint to retrieve all doctors. 
     
-    Returns a list of doctors with pagination support.
+    Returns a list of doctors with pagination support. Pages are served from
+    the doctor directory cache.
     """
-    doctors = await Doctor.find(skip=skip, limit=limit).to_list()
+    async def load():
+        doctors = await Doctor.find(skip=skip, limit=limit).to_list()
+        return [DoctorInDB(**doctor.model_dump()) for doctor in doctors]
 
-    return [DoctorInDB(**doctor.model_dump()) for doctor in doctors]
+    return await doctor_directory.get(f"{skip}:{limit}", load)
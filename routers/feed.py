@@ -0,0 +1,155 @@
+"""
+Live appointment feed over Server-Sent Events and WebSockets.
+"""
+
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Security, WebSocket, status
+from fastapi.responses import StreamingResponse
+
+from fastapi_limiter.depends import RateLimiter
+from typing import Annotated, Optional
+
+from models.users import Patient, Doctor, Nurse, Admin, Pharmacist
+
+from security.helpers import get_current_active_user, get_current_websocket_user
+from utils.appointment_feed import RESET, appointment_feed
+from utils.settings import get_settings
+
+
+router = APIRouter(
+    prefix="/api/v1/feed",
+    tags=["Live Feed"],
+)
+
+
+def feed_topics(
+    user: Patient | Doctor | Nurse | Admin | Pharmacist,
+    doctor_id: str | None,
+    patient_id: str | None,
+) -> set[tuple[str, str]]:
+    """Resolve which appointments a user may follow.
+
+    Doctors and patients follow their own appointments; nurses and admins pick
+    a doctor and/or patient.
+
+    Raises:
+        HTTPException: 400 if nothing to follow was given, 403 if the user may not follow it.
+
+    Returns:
+        **set[tuple[str, str]]**: The feed topics.
+    """
+    if isinstance(user, Doctor):
+        return {("doctor", str(user.id))}
+    if isinstance(user, Patient):
+        return {("patient", str(user.id))}
+    if not isinstance(user, (Nurse, Admin)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions to follow appointments")
+
+    topics = set()
+    if doctor_id:
+        topics.add(("doctor", doctor_id))
+    if patient_id:
+        topics.add(("patient", patient_id))
+    if not topics:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Provide doctor_id and/or patient_id")
+    return topics
+
+
+@router.get(
+    "/appointments",
+    response_class=StreamingResponse,
+    responses={status.HTTP_200_OK: {"content": {"text/event-stream": {}}}},
+    dependencies=[Depends(RateLimiter(times=5, seconds=60))],  # Limit to 5 connections per minute per IP
+)
+async def appointment_events(
+    current_user: Annotated[
+        Patient | Doctor | Nurse | Admin | Pharmacist,
+        Security(get_current_active_user, scopes=["me"]),
+    ],
+    doctor_id: Annotated[Optional[str], Query(description="Doctor to follow (nurses and admins only)")] = None,
+    patient_id: Annotated[Optional[str], Query(description="Patient to follow (nurses and admins only)")] = None,
+    last_event_id: Annotated[Optional[str], Header(description="Set by EventSource when reconnecting")] = None,
+):
+    """
+    Server-Sent Events stream of new and updated appointments.
+
+    Doctors and patients receive their own appointments. After a reconnect,
+    missed events are replayed from `Last-Event-ID`; a `reset` event means the
+    client should reload its appointments through the REST API.
+    """
+    subscription = appointment_feed.subscribe(feed_topics(current_user, doctor_id, patient_id), last_event_id)
+    keepalive = get_settings().feed_keepalive_seconds
+
+    async def events():
+        try:
+            while True:
+                event = await subscription.next_event(keepalive)
+                if event is None:
+                    yield ": keepalive\n\n"
+                elif event is RESET:
+                    yield "event: reset\ndata: {}\n\n"
+                    return
+                else:
+                    yield f"id: {event['id']}\nevent: appointment\ndata: {json.dumps(event)}\n\n"
+        finally:
+            appointment_feed.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/appointments/ws")
+async def appointment_socket(
+    websocket: WebSocket,
+    current_user: Annotated[Patient | Doctor | Nurse | Admin | Pharmacist, Depends(get_current_websocket_user)],
+    doctor_id: Annotated[Optional[str], Query()] = None,
+    patient_id: Annotated[Optional[str], Query()] = None,
+    last_event_id: Annotated[Optional[str], Query()] = None,
+):
+    """
+    WebSocket stream of new and updated appointments, one JSON event per message.
+
+    Same events as the SSE stream; pass the last received event `id` as
+    `last_event_id` when reconnecting.
+    """
+    try:
+        topics = feed_topics(current_user, doctor_id, patient_id)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+        return
+
+    await websocket.accept()
+    subscription = appointment_feed.subscribe(topics, last_event_id)
+    keepalive = get_settings().feed_keepalive_seconds
+
+    async def send():
+        while True:
+            event = await subscription.next_event(keepalive)
+            if event is None:
+                await websocket.send_json({"type": "keepalive"})
+            elif event is RESET:
+                await websocket.send_json(RESET)
+                await websocket.close()
+                return
+            else:
+                await websocket.send_json(event)
+
+    async def receive():
+        # * Clients do not send anything; this only notices disconnects
+        while True:
+            await websocket.receive_text()
+
+    tasks = [asyncio.create_task(send()), asyncio.create_task(receive())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        # * Collect the outcome of both tasks; a disconnect ends them with an exception
+        await asyncio.gather(*tasks, return_exceptions=True)
+        appointment_feed.unsubscribe(subscription)
@@ -0,0 +1,130 @@
+"""
+Liveness and readiness probes for load balancers and orchestrators.
+"""
+
+import asyncio
+from time import perf_counter
+
+from fastapi import APIRouter, HTTPException, Query, Request, Security, status
+from fastapi.responses import JSONResponse
+from typing import Annotated
+
+from models.users import Admin
+
+from utils.api_logger import logger
+from middleware.admission import admission_controller
+from middleware.profiling import profile_token
+from security.helpers import get_current_active_user
+from utils.cache import cache_bus
+from utils.settings import get_settings
+
+
+router = APIRouter(tags=["Health"])
+
+
+async def _ping(name: str, ping) -> dict:
+    """Run a dependency ping and report its latency.
+
+    Args:
+        name (str): The name of the dependency.
+        ping (Awaitable): The ping coroutine.
+
+    Returns:
+        **dict**: The status of the dependency and its latency in milliseconds.
+    """
+    started = perf_counter()
+    try:
+        await asyncio.wait_for(ping, timeout=get_settings().readiness_timeout_seconds)
+    except Exception as e:
+        logger.error(f"Readiness check for {name} failed: {e}")
+        return {"status": "unavailable", "error": str(e)}
+    return {"status": "ok", "latencyMs": round((perf_counter() - started) * 1000, 2)}
+
+
+@router.get("/healthz", status_code=status.HTTP_200_OK)
+async def liveness():
+    """Liveness probe.
+
+    Returns 200 as long as the worker's event loop is responsive.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/readyz", status_code=status.HTTP_200_OK)
+async def readiness(request: Request):
+    """Readiness probe.
+
+    Returns 200 only once the lifespan warm-up has completed and MongoDB and Redis
+    answer a ping, otherwise 503 so the load balancer keeps traffic away from the worker.
+    """
+    state = request.app.state
+
+    if not getattr(state, "ready", False):
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "starting"},
+        )
+
+    mongo, redis = await asyncio.gather(
+        _ping("mongo", state.mongo_client.admin.command("ping")),
+        _ping("redis", state.redis.ping()),
+    )
+    dependencies = {"mongo": mongo, "redis": redis}
+    ready = all(dependency["status"] == "ok" for dependency in dependencies.values())
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "unavailable",
+            "startupMs": round(state.startup_profile.total_ms, 2),
+            "dependencies": dependencies,
+        },
+    )
+
+
+@router.get("/metrics/cache", status_code=status.HTTP_200_OK)
+async def cache_metrics():
+    """Reference cache metrics of the worker that serves the request.
+
+    Counts L1 hits, stale L1 hits (served while refreshing), L2 hits and misses,
+    and the resulting hit ratio, per cache.
+    """
+    return {
+        "worker": cache_bus.worker_id,
+        "caches": {name: cache.metrics() for name, cache in cache_bus.caches.items()},
+    }
+
+
+@router.get("/metrics/admission", status_code=status.HTTP_200_OK)
+async def admission_metrics():
+    """Admission control state of the worker that serves the request.
+
+    Reports the current adaptive limit, requests in flight and queued, and the
+    admitted and shed counts, per admission class.
+    """
+    return {
+        "worker": cache_bus.worker_id,
+        "classes": admission_controller.metrics(),
+    }
+
+
+@router.post("/metrics/profile-token", status_code=status.HTTP_200_OK)
+async def issue_profile_token(
+    current_user: Annotated[Admin, Security(get_current_active_user, scopes=["admin"])],
+    ttl_seconds: Annotated[int, Query(ge=1, le=3600, description="How long the token stays valid")] = 300,
+):
+    """Issue an `X-Profile` header value (admins only).
+
+    Requests sent with the header are profiled while the token is valid; the
+    profile's file name comes back in the `X-Profile-Id` response header.
+    """
+    if not get_settings().profiling_enabled:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Profiling is not enabled")
+
+    # * Tokens are signed with SECRET_KEY; without it none could be issued or verified
+    if not get_settings().secret_key:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="SECRET_KEY is not configured")
+
+    value, expires = profile_token(ttl_seconds)
+    logger.info(f"Admin {current_user.id} issued a profiling token valid for {ttl_seconds}s")
+    return {"header": "X-Profile", "value": value, "expiresAt": expires}
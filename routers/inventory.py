@@ -0,0 +1,107 @@
+"""
+Inventory Router with all the routes for managing pharmacy drug stock.
+"""
+
+from utils.api_logger import logger
+
+from fastapi import APIRouter, Depends, HTTPException, status, Security, Query
+
+from fastapi_limiter.depends import RateLimiter
+from typing import List, Annotated
+
+from pydantic import Field
+
+from models.pharmacy import DrugInventory
+from models.users import Admin, Pharmacist
+from schema.requests.inventory import DispenseRequest, RestockRequest
+from schema.responses.inventory import RestockResponse
+
+from security.helpers import get_current_active_user
+from utils import inventory
+
+
+router = APIRouter(
+    prefix="/api/v1/inventory",
+    tags=["Inventory"],
+    dependencies=[Depends(RateLimiter(times=5, seconds=60))],  # Limit to 5 requests per minute per IP
+)
+
+
+@router.post("/dispense", response_model=DrugInventory, status_code=status.HTTP_200_OK)
+async def dispense_drug(
+    request: DispenseRequest,
+    current_user: Annotated[
+        Admin | Pharmacist,
+        Security(get_current_active_user, scopes=["manage-inventory"]),
+    ],
+):
+    """Dispense a drug from a pharmacy's stock.
+
+    The stock check and the decrement are a single atomic update, so stock never goes negative.
+    """
+    try:
+        updated = await inventory.dispense(request.drug_id, request.pharmacy_id, request.quantity)
+        if updated:
+            return updated
+
+        if not await DrugInventory.find_one(
+            DrugInventory.drug_id == request.drug_id,
+            DrugInventory.pharmacy_id == request.pharmacy_id,
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Pharmacy {request.pharmacy_id} does not stock drug {request.drug_id}",
+            )
+
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Insufficient stock to dispense {request.quantity} units",
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"An error occurred while dispensing: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Something went wrong: {e}")
+
+
+@router.post("/restock", response_model=RestockResponse, status_code=status.HTTP_200_OK)
+async def restock_drugs(
+    request: RestockRequest,
+    current_user: Annotated[
+        Admin | Pharmacist,
+        Security(get_current_active_user, scopes=["manage-inventory"]),
+    ],
+):
+    """Add stock for many drugs and pharmacies in one bulk write."""
+    try:
+        result = await inventory.restock([item.model_dump() for item in request.items])
+        logger.info(f"Restocked {len(request.items)} inventory rows")
+        return RestockResponse(**result)
+    except Exception as e:
+        logger.error(f"An error occurred while restocking: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Something went wrong: {e}")
+
+
+@router.get("/drugs/{drug_id}/pharmacies", response_model=List[DrugInventory])
+async def get_drug_stockists(
+    drug_id: Annotated[str, Field(..., max_length=100, description="The ID of the drug")],
+    min_quantity: int = Query(1, ge=1, description="Minimum units in stock"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(10, le=100, description="Max number of records to return"),
+):
+    """
+    Endpoint to find the pharmacies that stock a drug, largest stock first.
+    """
+    return await inventory.stockists(drug_id, min_quantity, skip, limit)
+
+
+@router.get("/pharmacies/{pharmacy_id}", response_model=List[DrugInventory])
+async def get_pharmacy_inventory(
+    pharmacy_id: Annotated[str, Field(..., max_length=100, description="The ID of the pharmacy")],
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(10, le=100, description="Max number of records to return"),
+):
+    """
+    Endpoint to retrieve a pharmacy's inventory.
+    """
+    return await inventory.pharmacy_stock(pharmacy_id, skip, limit)
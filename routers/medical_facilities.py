@@ -0,0 +1,100 @@
+"""
+Medical Facilities Router with the routes for hospitals, clinics and pharmacies.
+"""
+
+from utils.api_logger import logger
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+
+from fastapi_limiter.depends import RateLimiter
+from beanie import PydanticObjectId
+from typing import List, Annotated, Optional, Literal
+
+from pydantic import ValidationError, Field
+
+from schema.requests.medical_facilities import FacilityCreateRequest
+from schema.responses.medical_facilities import FacilityInDB, FacilityResponse
+from utils.facilities import FACILITY_MODELS, facility_cache, nearby_facilities
+
+
+router = APIRouter(
+    prefix="/api/v1/facilities",
+    tags=["Medical Facilities"],
+    dependencies=[Depends(RateLimiter(times=5, seconds=60))],  # Limit to 5 requests per minute per IP
+)
+
+FacilityType = Literal["hospitals", "clinics", "pharmacies"]
+
+
+@router.post("/{facility_type}", response_model=FacilityResponse, status_code=status.HTTP_201_CREATED)
+async def create_facility(facility_type: FacilityType, request: FacilityCreateRequest):
+    """Create a new hospital, clinic or pharmacy."""
+    try:
+        exclude = {"specialties", "doctors"} if facility_type == "pharmacies" else set()
+        new_facility = FACILITY_MODELS[facility_type](**request.model_dump(exclude=exclude))
+
+        await new_facility.save()
+
+        logger.info(f"New facility created in {facility_type} with ID: {new_facility.id}")
+
+        return FacilityResponse(
+            facility=FacilityInDB(facility_type=facility_type, **new_facility.model_dump()),
+        )
+    except ValidationError as e:
+        logger.error(f"Validation error occurred: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid data provided: {e}")
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Something went wrong: {e}")
+
+
+@router.get("/nearby", response_model=List[FacilityInDB])
+async def get_nearby_facilities(
+    longitude: Annotated[float, Query(ge=-180, le=180)],
+    latitude: Annotated[float, Query(ge=-90, le=90)],
+    max_distance_km: Annotated[float, Query(gt=0, le=500, description="Search radius in kilometers")] = 10,
+    facility_type: Annotated[Optional[FacilityType], Query(description="Only search this facility type")] = None,
+    specialty: Annotated[Optional[str], Query(description="Only facilities offering this specialty")] = None,
+    open_now: Annotated[bool, Query(description="Only facilities that are currently open")] = False,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Endpoint to find the facilities nearest to a location, closest first.
+    """
+    try:
+        results = await nearby_facilities(
+            longitude,
+            latitude,
+            max_distance_km * 1000,
+            [facility_type] if facility_type else list(FACILITY_MODELS),
+            specialty,
+            open_now,
+            limit,
+        )
+        return [
+            FacilityInDB(facility_type=found_type, distance_meters=distance, **facility.model_dump())
+            for found_type, distance, facility in results
+        ]
+    except Exception as e:
+        logger.error(f"An error occurred while searching facilities: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Something went wrong: {e}")
+
+
+@router.get("/{facility_type}/{facility_id}", response_model=FacilityInDB)
+async def get_facility(
+    facility_type: FacilityType,
+    facility_id: Annotated[str, Field(..., max_length=100, description="The ID of the facility to retrieve")],
+):
+    """
+    Endpoint to retrieve a facility by its ID.
+    """
+    async def load():
+        facility = await FACILITY_MODELS[facility_type].get(PydanticObjectId(facility_id))
+        return FacilityInDB(facility_type=facility_type, **facility.model_dump()) if facility else None
+
+    facility = await facility_cache.get(f"{facility_type}:{facility_id}", load)
+
+    if not facility:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Facility not found")
+
+    return facility
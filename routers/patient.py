@@ -6,20 +6,29 @@ from utils.api_logger import logger
 
 
 from fastapi import APIRouter, Depends, HTTPException, status, Security, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+
+import asyncio
 
 from beanie import PydanticObjectId
-from typing import List, Annotated
+from bson.errors import InvalidId
+from typing import List, Annotated, Optional
 
 from fastapi_limiter.depends import RateLimiter
 
 from pydantic import ValidationError, Field
 
 from schema.requests.users import PatientCreateRequest
-from schema.responses.users import PatientInDB, PatientResponse
+from schema.responses.users import PatientInDB, PatientResponse, PatientExpansions
+from schema.responses.appointment import AppointmentInDB
+from schema.responses.timeline import TimelinePage
 from models.users import Patient, Pharmacist, Admin, Nurse, Doctor
 
 from security.helpers import get_password_hash, get_current_active_user
+from utils.loaders import RequestLoaders, get_loaders, parse_expand
+from utils.replica_reads import ReplicaReads, get_replica_reads
+from utils.timeline import build_timeline_pipeline, stream_timeline
+from utils.typeahead import patient_created
 
 
 router = APIRouter(
@@ -49,6 +58,7 @@ async def create_new_patient(request: PatientCreateRequest):
         )
 
         await new_patient.save()
+        await patient_created(new_patient)
 
         patient_in_db = PatientInDB(**new_patient.model_dump())
 
@@ -73,10 +83,20 @@ async def create_new_patient(request: PatientCreateRequest):
 
 
 @router.get("/{patient_id}", response_model=PatientResponse)
-async def get_patient(patient_id: Annotated[str, Field(..., max_length=100, description="The ID of the patient to retrieve")]):
+async def get_patient(
+    patient_id: Annotated[str, Field(..., max_length=100, description="The ID of the patient to retrieve")],
+    loaders: Annotated[RequestLoaders, Depends(get_loaders)],
+    expand: Annotated[Optional[str], Query(description="Comma-separated references to include: appointments, diagnoses")] = None,
+    expand_limit: Annotated[int, Query(ge=1, le=100, description="Maximum records included per expansion (most recent first)")] = 20,
+):
     """
     Endpoint to retrieve a patient's details by their ID.
+
+    With `expand`, the patient's most recent appointments and/or diagnoses are
+    included, each read from its own collection through the patient foreign key.
     """
+    expansions = parse_expand(expand, {"appointments", "diagnoses"})
+
     patient = await Patient.get(PydanticObjectId(patient_id))
 
     if not patient:
@@ -87,17 +107,66 @@ async def get_patient(patient_id: Annotated[str, Field(..., max_length=100, desc
 
     patient_in_db = PatientInDB(**patient.model_dump())
 
+    expanded = None
+    if expansions:
+        async def nothing():
+            return None
+
+        appointments, diagnoses = await asyncio.gather(
+            loaders.patient_appointments(expand_limit).load(patient_id) if "appointments" in expansions else nothing(),
+            loaders.patient_diagnoses(expand_limit).load(patient_id) if "diagnoses" in expansions else nothing(),
+        )
+        expanded = PatientExpansions(
+            appointments=[AppointmentInDB(**appointment.model_dump()) for appointment in appointments or []] if "appointments" in expansions else None,
+            diagnoses=(diagnoses or []) if "diagnoses" in expansions else None,
+        )
+
     return PatientResponse(
         message="Patient retrieved successfully",
-        patient=patient_in_db
+        patient=patient_in_db,
+        expanded=expanded,
     )
 
 
+@router.get(
+    "/{patient_id}/timeline",
+    response_class=StreamingResponse,
+    responses={status.HTTP_200_OK: {"model": TimelinePage}},
+)
+async def get_patient_timeline(
+    patient_id: Annotated[str, Field(..., max_length=100, description="The ID of the patient")],
+    cursor: Annotated[Optional[str], Query(description="The nextCursor of the previous page")] = None,
+    limit: int = Query(20, ge=1, le=100, description="Max number of records to return"),
+):
+    """
+    Endpoint to retrieve a patient's appointments, diagnoses and treatments, newest first.
+
+    The records of all three collections are merged by one aggregation and streamed
+    as they are read. The patient document itself is never loaded.
+    """
+    if not PydanticObjectId.is_valid(patient_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
+
+    # * Parse the cursor before the response starts streaming, while a 400 can still be sent
+    try:
+        pipeline = build_timeline_pipeline(patient_id, cursor, limit)
+    except (ValueError, TypeError, InvalidId):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+    if not await Patient.find(Patient.id == PydanticObjectId(patient_id)).count():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Patient not found")
+
+    return StreamingResponse(stream_timeline(pipeline, limit), media_type="application/json")
+
+
 @router.get("", response_model=List[PatientInDB])
-async def get_patients(current_user: Annotated[Admin | Nurse | Doctor, Security(get_current_active_user, scopes=["get-patients"])], skip: int = Query(0, ge=0, description="Number of records to skip"), limit: int = Query(10, le=100, description="Max number of records to return")):
+async def get_patients(current_user: Annotated[Admin | Nurse | Doctor, Security(get_current_active_user, scopes=["get-patients"])], reads: Annotated[ReplicaReads, Depends(get_replica_reads)], skip: int = Query(0, ge=0, description="Number of records to skip"), limit: int = Query(10, le=100, description="Max number of records to return")):
     """
     Endpoint to retrieve all patients.
+
+    Served from a secondary when secondary reads are enabled; send the
+    `X-Consistency-Token` of your last write to read your own changes.
     """
-    patients = await Patient.find(skip=skip, limit=limit).to_list()
+    patients = await reads.to_list(Patient.find(skip=skip, limit=limit))
 
     return [PatientInDB(**patient.model_dump()) for patient in patients]
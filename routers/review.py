@@ -0,0 +1,95 @@
+"""
+Review Router with the routes for reviewing doctors, facilities and drugs.
+"""
+
+from utils.api_logger import logger
+
+from fastapi import APIRouter, Depends, HTTPException, status, Security, Query
+
+from fastapi_limiter.depends import RateLimiter
+from typing import Annotated, Optional, Literal
+
+from pydantic import ValidationError
+
+from models.review import Review
+from models.users import Patient, Doctor, Nurse, Admin, Pharmacist
+from schema.requests.review import ReviewCreateRequest
+from schema.responses.review import ReviewPage, ReviewResponse
+
+from security.helpers import get_current_active_user
+from utils.catalogue import drug_cache
+from utils.doctor_search import doctor_directory
+from utils.facilities import facility_cache
+from utils.reviews import get_reviews, submit_review
+
+
+router = APIRouter(
+    prefix="/api/v1/reviews",
+    tags=["Reviews"],
+    dependencies=[Depends(RateLimiter(times=5, seconds=60))],  # Limit to 5 requests per minute per IP
+)
+
+FACILITY_TYPES = {"hospital": "hospitals", "clinic": "clinics", "pharmacy": "pharmacies"}
+
+
+@router.post("", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
+async def create_review(
+    request: ReviewCreateRequest,
+    current_user: Annotated[
+        Patient | Doctor | Nurse | Admin | Pharmacist,
+        Security(get_current_active_user, scopes=["me"]),
+    ],
+):
+    """
+    Endpoint to review a doctor, hospital, clinic, pharmacy or drug.
+
+    The review is stored in its own collection and the rating is added to the
+    reviewed document's `ratingSum`, `ratingCount` and `ratingAverage`.
+    """
+    try:
+        review = await submit_review(Review(user_id=str(current_user.id), **request.model_dump()))
+
+        if not review:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{request.target_type.capitalize()} with ID {request.target_id} not found",
+            )
+
+        # * Cached doctors, facilities and drugs would show the old rating until their TTL expires
+        if request.target_type in FACILITY_TYPES:
+            await facility_cache.invalidate(f"{FACILITY_TYPES[request.target_type]}:{request.target_id}")
+        elif request.target_type == "drug":
+            await drug_cache.invalidate(request.target_id)
+        elif request.target_type == "doctor":
+            await doctor_directory.clear()
+
+        logger.info(f"New review of {request.target_type} {request.target_id} with ID: {review.id}")
+
+        return ReviewResponse(review=review)
+    except HTTPException:
+        raise
+    except ValidationError as e:
+        logger.error(f"Validation error occurred: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid data provided: {e}")
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Something went wrong: {e}")
+
+
+@router.get("", response_model=ReviewPage)
+async def list_reviews(
+    target_type: Annotated[Literal["doctor", "hospital", "clinic", "pharmacy", "drug"], Query(description="The kind of the reviewed document")],
+    target_id: Annotated[str, Query(max_length=100, description="The ID of the reviewed document")],
+    cursor: Annotated[Optional[str], Query(description="The nextCursor of the previous page")] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Endpoint to retrieve the reviews of a doctor, facility or drug, newest first.
+    """
+    try:
+        return ReviewPage(**await get_reviews(target_type, target_id, cursor, limit))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"An error occurred while listing reviews: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Something went wrong: {e}")
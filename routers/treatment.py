@@ -0,0 +1,116 @@
+"""
+Treatment Router with all the routes for managing treatments.
+"""
+
+from utils.api_logger import logger
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+
+from fastapi_limiter.depends import RateLimiter
+from beanie import PydanticObjectId
+from beanie.operators import Inc
+from typing import List, Annotated, Optional
+
+from pydantic import ValidationError, Field
+
+from models.treatment import Treatment
+from models.users import Patient, Doctor
+from schema.requests.treatment import TreatmentCreateRequest
+from schema.responses.treatment import TreatmentInDB, TreatmentCreateResponse, MedicationSummary, ManufacturerSummary
+
+from utils.catalogue import resolve_drugs
+
+
+router = APIRouter(
+    prefix="/api/v1/treatments",
+    tags=["Treatments"],
+    dependencies=[Depends(RateLimiter(times=5, seconds=60))],  # Limit to 5 requests per minute per IP
+)
+
+
+async def to_response(treatments: list[Treatment]) -> list[TreatmentInDB]:
+    """Attach catalogue data to treatments, resolving all their drugs in one batch"""
+    drugs = await resolve_drugs({treatment.drug_id for treatment in treatments})
+
+    responses = []
+    for treatment in treatments:
+        medication = None
+        if treatment.drug_id in drugs:
+            drug, manufacturer = drugs[treatment.drug_id]
+            medication = MedicationSummary(
+                **drug.model_dump(include={"id", "name", "description", "side_effects"}),
+                manufacturer=ManufacturerSummary(**manufacturer.model_dump(include={"id", "name", "website"})) if manufacturer else None,
+            )
+        responses.append(TreatmentInDB(**treatment.model_dump(), medication=medication))
+    return responses
+
+
+@router.post("", response_model=TreatmentCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_treatment(request: TreatmentCreateRequest):
+    """Prescribe a treatment to a patient."""
+    try:
+        patient_in_db = await Patient.get(PydanticObjectId(request.patient_id))
+        if not patient_in_db:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Patient with ID {request.patient_id} not found")
+
+        if not await Doctor.get(PydanticObjectId(request.doctor_id)):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Doctor with ID {request.doctor_id} not found")
+
+        if request.drug_id not in await resolve_drugs([request.drug_id]):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Drug with ID {request.drug_id} not found")
+
+        new_treatment = Treatment(**request.model_dump())
+        await new_treatment.save()
+
+        await patient_in_db.update(Inc({Patient.treatment_count: 1}))
+
+        logger.info(f"New treatment created with ID: {new_treatment.id}")
+
+        [treatment_in_db] = await to_response([new_treatment])
+        return TreatmentCreateResponse(treatment=treatment_in_db)
+    except HTTPException:
+        raise
+    except ValidationError as e:
+        logger.error(f"Validation error occurred: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid data provided: {e}")
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Something went wrong: {e}")
+
+
+@router.get("/{treatment_id}", response_model=TreatmentInDB)
+async def get_treatment(
+    treatment_id: Annotated[str, Field(..., max_length=100, description="The ID of the treatment to retrieve")],
+):
+    """
+    Endpoint to retrieve a treatment by its ID, with its medication resolved.
+    """
+    treatment = await Treatment.get(PydanticObjectId(treatment_id))
+
+    if not treatment:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Treatment not found")
+
+    [treatment_in_db] = await to_response([treatment])
+    return treatment_in_db
+
+
+@router.get("", response_model=List[TreatmentInDB])
+async def get_treatments(
+    patient_id: Annotated[Optional[str], Query(description="Filter by patient ID")] = None,
+    doctor_id: Annotated[Optional[str], Query(description="Filter by doctor ID")] = None,
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(10, le=100, description="Max number of records to return"),
+):
+    """
+    Endpoint to retrieve treatments, newest first.
+
+    The medications of the whole page are resolved with a single batched query.
+    """
+    filters = []
+    if patient_id:
+        filters.append(Treatment.patient_id == patient_id)
+    if doctor_id:
+        filters.append(Treatment.doctor_id == doctor_id)
+
+    treatments = await Treatment.find(*filters).sort(-Treatment.start_date).skip(skip).limit(limit).to_list()
+    return await to_response(treatments)
@@ -0,0 +1,52 @@
+"""
+Typeahead Router with the as-you-type patient lookup.
+
+Kept apart from the patient router, whose per-IP rate limit is too low for a
+request per keystroke. Included before it, so `/typeahead` is not taken for a
+patient ID.
+"""
+
+from utils.api_logger import logger
+
+from fastapi import APIRouter, Depends, HTTPException, status, Security, Query
+
+from fastapi_limiter.depends import RateLimiter
+from typing import List, Annotated
+
+from models.users import Admin, Nurse, Doctor
+from schema.responses.users import PatientSuggestion
+
+from security.helpers import get_current_active_user
+from utils.typeahead import TYPEAHEAD_MAX_RESULTS, suggest_patients
+
+
+router = APIRouter(
+    prefix="/api/v1/patients",
+    tags=["Patients"],
+)
+
+
+@router.get(
+    "/typeahead",
+    response_model=List[PatientSuggestion],
+    dependencies=[Depends(RateLimiter(times=120, seconds=60))],  # Limit to 120 keystrokes per minute per IP
+)
+async def patient_typeahead(
+    current_user: Annotated[Admin | Nurse | Doctor, Security(get_current_active_user, scopes=["get-patients"])],
+    q: Annotated[str, Query(min_length=1, max_length=100, description="Start of a patient's name (either order) or email")],
+    limit: int = Query(10, ge=1, le=TYPEAHEAD_MAX_RESULTS),
+):
+    """
+    Endpoint to suggest patients as their name or email is typed.
+
+    Case and accents are ignored. Suggestions are ordered by the matched name
+    or email.
+    """
+    try:
+        return [PatientSuggestion(**suggestion) for suggestion in await suggest_patients(q, limit)]
+    except Exception as e:
+        logger.error(f"An error occurred while suggesting patients: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Something went wrong: {e}",
+        )
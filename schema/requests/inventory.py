@@ -0,0 +1,26 @@
+"""
+Inventory request schemas.
+"""
+
+from typing import Annotated, Optional
+from pydantic import BaseModel, Field
+
+
+class DispenseRequest(BaseModel):
+    """Schema for dispensing a drug from a pharmacy's stock."""
+    drug_id: Annotated[str, Field(serialization_alias="drugId")]
+    pharmacy_id: Annotated[str, Field(serialization_alias="pharmacyId")]
+    quantity: Annotated[int, Field(gt=0)]
+
+
+class RestockItem(BaseModel):
+    """Stock to add for one drug at one pharmacy."""
+    drug_id: Annotated[str, Field(serialization_alias="drugId")]
+    pharmacy_id: Annotated[str, Field(serialization_alias="pharmacyId")]
+    quantity: Annotated[int, Field(gt=0)]
+    price: Annotated[Optional[float], Field(ge=0.0, default=None)]
+
+
+class RestockRequest(BaseModel):
+    """Schema for restocking many drugs at once."""
+    items: Annotated[list[RestockItem], Field(min_length=1, max_length=1000)]
@@ -0,0 +1,25 @@
+"""
+Medical facility request schemas.
+"""
+
+from typing import Annotated
+from pydantic import BaseModel, Field
+
+from models.helpers import Address, ContactInfo, OperationalHours, GeoPoint
+
+
+class FacilityCreateRequest(BaseModel):
+    """Schema for creating a hospital, clinic or pharmacy."""
+    name: Annotated[str, Field(max_length=100)]
+    address: Annotated[Address, Field()]
+    location: Annotated[GeoPoint, Field(description="GeoJSON location of the facility")]
+    contact_info: Annotated[ContactInfo, Field(serialization_alias="contactInfo")]
+    operational_hours: Annotated[OperationalHours, Field(serialization_alias="operationalHours")]
+    specialties: Annotated[
+        list[str],
+        Field(default_factory=list, description="Ignored for pharmacies"),
+    ]
+    doctors: Annotated[
+        list[str],
+        Field(default_factory=list, description="Ignored for pharmacies"),
+    ]
@@ -0,0 +1,17 @@
+"""
+Review request schemas.
+"""
+
+from typing import Annotated, Literal
+from pydantic import BaseModel, Field
+
+
+class ReviewCreateRequest(BaseModel):
+    """Schema for reviewing a doctor, facility or drug."""
+    target_type: Annotated[
+        Literal["doctor", "hospital", "clinic", "pharmacy", "drug"],
+        Field(serialization_alias="targetType"),
+    ]
+    target_id: Annotated[str, Field(max_length=100, serialization_alias="targetId")]
+    rating: Annotated[float, Field(ge=0, le=5)]
+    comment: Annotated[str, Field(max_length=500)]
@@ -0,0 +1,19 @@
+"""
+Treatment request schema.
+"""
+
+from typing import Annotated, Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class TreatmentCreateRequest(BaseModel):
+    """Schema for prescribing a treatment."""
+    patient_id: Annotated[str, Field(serialization_alias="patientId")]
+    doctor_id: Annotated[str, Field(serialization_alias="doctorId")]
+    drug_id: Annotated[str, Field(description="The ID of the prescribed drug", serialization_alias="drugId")]
+    dosage: Annotated[str, Field(max_length=100)]
+    frequency: Annotated[str, Field(max_length=100)]
+    start_date: Annotated[datetime, Field(default_factory=datetime.now, serialization_alias="startDate")]
+    end_date: Annotated[datetime, Field(default_factory=datetime.now, serialization_alias="endDate")]
+    notes: Annotated[Optional[str], Field(max_length=500, default=None)]
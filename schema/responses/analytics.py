@@ -0,0 +1,21 @@
+"""
+Analytics response schemas.
+"""
+
+from typing import Annotated, Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class DiagnosisCountBucket(BaseModel):
+    """Number of diagnoses in one group."""
+    day: Annotated[Optional[datetime], Field(default=None)]
+    severity: Annotated[Optional[str], Field(default=None)]
+    condition: Annotated[Optional[str], Field(default=None)]
+    count: Annotated[int, Field()]
+
+
+class DiagnosisAnalyticsResponse(BaseModel):
+    """Schema for the diagnosis analytics response."""
+    buckets: Annotated[list[DiagnosisCountBucket], Field(default_factory=list)]
+    total: Annotated[int, Field(description="Total number of diagnoses across all buckets")]
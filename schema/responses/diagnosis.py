@@ -0,0 +1,29 @@
+"""
+Diagnosis response schemas.
+"""
+
+from typing import Annotated, Optional
+from pydantic import BaseModel, Field
+
+from models.diagnosis import Diagnosis
+
+
+class SymptomFacet(BaseModel):
+    """Number of matching diagnoses that report a symptom."""
+    symptom: Annotated[str, Field()]
+    count: Annotated[int, Field()]
+
+
+class DiagnosisSearchResponse(BaseModel):
+    """Schema for a page of diagnosis search results."""
+    results: Annotated[list[Diagnosis], Field(default_factory=list)]
+    facets: Annotated[list[SymptomFacet], Field(default_factory=list)]
+    total: Annotated[int, Field(description="Total number of matching diagnoses")]
+    next_cursor: Annotated[
+        Optional[str],
+        Field(
+            description="Cursor for the next page, absent on the last page",
+            default=None,
+            serialization_alias="nextCursor",
+        ),
+    ]
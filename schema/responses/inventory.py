@@ -0,0 +1,14 @@
+"""
+Inventory response schemas.
+"""
+
+from typing import Annotated
+from pydantic import BaseModel, Field
+
+
+class RestockResponse(BaseModel):
+    """Schema for the result of a bulk restock."""
+    message: Annotated[str, Field(default="Inventory restocked successfully")]
+    matched: Annotated[int, Field()]
+    modified: Annotated[int, Field()]
+    created: Annotated[int, Field()]
@@ -0,0 +1,36 @@
+"""
+Medical facility response schemas.
+"""
+
+from typing import Annotated, Optional, Literal
+from pydantic import BaseModel, Field
+
+from models.helpers import Address, ContactInfo, OperationalHours, GeoPoint
+
+
+class FacilityInDB(BaseModel):
+    """Schema for a hospital, clinic or pharmacy."""
+    id: Annotated[str, Field()]
+    facility_type: Annotated[
+        Literal["hospitals", "clinics", "pharmacies"],
+        Field(serialization_alias="facilityType"),
+    ]
+    name: Annotated[str, Field(max_length=100)]
+    address: Annotated[Address, Field()]
+    location: Annotated[GeoPoint, Field()]
+    contact_info: Annotated[ContactInfo, Field(serialization_alias="contactInfo")]
+    operational_hours: Annotated[OperationalHours, Field(serialization_alias="operationalHours")]
+    specialties: Annotated[list[str], Field(default_factory=list)]
+    doctors: Annotated[list[str], Field(default_factory=list)]
+    rating_count: Annotated[int, Field(default=0, serialization_alias="ratingCount")]
+    rating_average: Annotated[float, Field(default=0, serialization_alias="ratingAverage")]
+    distance_meters: Annotated[
+        Optional[float],
+        Field(default=None, serialization_alias="distanceMeters"),
+    ]
+
+
+class FacilityResponse(BaseModel):
+    """Response Model for a facility"""
+    message: Annotated[str, Field(default="Facility created successfully")]
+    facility: Annotated[FacilityInDB, Field()]
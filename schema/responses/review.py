@@ -0,0 +1,27 @@
+"""
+Review response schemas.
+"""
+
+from typing import Annotated, Optional
+from pydantic import BaseModel, Field
+
+from models.review import Review
+
+
+class ReviewResponse(BaseModel):
+    """Response Model for a submitted review"""
+    message: Annotated[str, Field(default="Review submitted successfully")]
+    review: Annotated[Review, Field()]
+
+
+class ReviewPage(BaseModel):
+    """Schema for a page of reviews, newest first."""
+    results: Annotated[list[Review], Field(default_factory=list)]
+    next_cursor: Annotated[
+        Optional[str],
+        Field(
+            description="Cursor for the next page, absent on the last page",
+            default=None,
+            serialization_alias="nextCursor",
+        ),
+    ]
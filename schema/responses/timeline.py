@@ -0,0 +1,33 @@
+"""
+Patient timeline response schemas.
+"""
+
+from typing import Annotated, Optional, Literal
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+from models.diagnosis import Diagnosis
+from schema.responses.appointment import AppointmentInDB
+from schema.responses.treatment import TreatmentInDB
+
+
+class TimelineEntry(BaseModel):
+    """One record on a patient's timeline; exactly one of the record fields is set."""
+    kind: Annotated[Literal["appointment", "diagnosis", "treatment"], Field()]
+    date: Annotated[datetime, Field()]
+    appointment: Annotated[Optional[AppointmentInDB], Field(default=None)]
+    diagnosis: Annotated[Optional[Diagnosis], Field(default=None)]
+    treatment: Annotated[Optional[TreatmentInDB], Field(default=None)]
+
+
+class TimelinePage(BaseModel):
+    """Schema of a page of a patient's timeline (streamed)."""
+    items: Annotated[list[TimelineEntry], Field(default_factory=list)]
+    next_cursor: Annotated[
+        Optional[str],
+        Field(
+            description="Cursor for the next page, absent on the last page",
+            default=None,
+            serialization_alias="nextCursor",
+        ),
+    ]
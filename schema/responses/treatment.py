@@ -0,0 +1,46 @@
+"""
+Treatment response schemas.
+"""
+
+from typing import Annotated, Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class ManufacturerSummary(BaseModel):
+    """Catalogue data of a drug manufacturer."""
+    id: Annotated[str, Field()]
+    name: Annotated[str, Field()]
+    website: Annotated[Optional[str], Field(default=None)]
+
+
+class MedicationSummary(BaseModel):
+    """Catalogue data of a prescribed drug."""
+    id: Annotated[str, Field()]
+    name: Annotated[str, Field()]
+    description: Annotated[str, Field()]
+    side_effects: Annotated[list[str], Field(default_factory=list, serialization_alias="sideEffects")]
+    manufacturer: Annotated[Optional[ManufacturerSummary], Field(default=None)]
+
+
+class TreatmentInDB(BaseModel):
+    """Schema for a treatment with its medication resolved."""
+    id: Annotated[str, Field()]
+    patient_id: Annotated[str, Field(serialization_alias="patientId")]
+    doctor_id: Annotated[str, Field(serialization_alias="doctorId")]
+    drug_id: Annotated[str, Field(serialization_alias="drugId")]
+    medication: Annotated[
+        Optional[MedicationSummary],
+        Field(default=None, description="Absent if the drug is no longer in the catalogue"),
+    ]
+    dosage: Annotated[str, Field()]
+    frequency: Annotated[str, Field()]
+    start_date: Annotated[datetime, Field(serialization_alias="startDate")]
+    end_date: Annotated[datetime, Field(serialization_alias="endDate")]
+    notes: Annotated[Optional[str], Field(default=None)]
+
+
+class TreatmentCreateResponse(BaseModel):
+    """Schema for creating a treatment response."""
+    message: Annotated[str, Field(default="Treatment created successfully")]
+    treatment: Annotated[TreatmentInDB, Field()]
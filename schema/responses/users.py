@@ -7,9 +7,9 @@ from typing import Optional, Annotated, Literal
 from datetime import datetime
 
 from models.helpers import ContactInfo, BirthDetails
-from models.treatment import Treatment
+from models.diagnosis import Diagnosis
 
-from models.appointment import Appointment
+from schema.responses.appointment import AppointmentInDB
 
 class PatientInDB(BaseModel):
     id: Annotated[str, Field()]
@@ -46,24 +46,15 @@ class PatientInDB(BaseModel):
         Optional[str],
         Field(max_length=50, default=None, serialization_alias="insuranceNumber"),
     ]
-    diagnoses: Annotated[
-        list[str],
-        Field(
-            default_factory=list,
-            serialization_alias="diagnoses",
-        ),
-    ]
     height: Annotated[
         Optional[float], Field(ge=0, default=None, serialization_alias="height")
     ]
     weight: Annotated[
         Optional[float], Field(ge=0, default=None, serialization_alias="weight")
     ]
-    treatments: Annotated[
-        list[Optional[Treatment]],
-        Field(default_factory=list, serialization_alias="treatments"),
-    ]
-    appointments: Annotated[list[str], Field(default_factory=list)]
+    appointment_count: Annotated[int, Field(default=0, serialization_alias="appointmentCount")]
+    diagnosis_count: Annotated[int, Field(default=0, serialization_alias="diagnosisCount")]
+    treatment_count: Annotated[int, Field(default=0, serialization_alias="treatmentCount")]
     role: Annotated[Literal["patient", "doctor", "nurse", "admin", "pharmacist"], Field()]
 
 
@@ -92,19 +83,80 @@ class DoctorInDB(BaseModel):
     years_of_experience: Annotated[int, Field(ge=0, serialization_alias="yearsOfExperience")]
     patients: Annotated[list, Field(default_factory=list, serialization_alias="patients")]
     medical_facility: Annotated[str, Field(serialization_alias="medicalFacility")]
-    reviews: Annotated[list, Field(default_factory=list)]
-    appointments: Annotated[list[str], Field(default_factory=list)]
+    appointment_count: Annotated[int, Field(default=0, serialization_alias="appointmentCount")]
+    rating_sum: Annotated[float, Field(default=0, serialization_alias="ratingSum")]
+    rating_count: Annotated[int, Field(default=0, serialization_alias="ratingCount")]
+    rating_average: Annotated[float, Field(default=0, serialization_alias="ratingAverage")]
     role: Annotated[
         Literal["patient", "doctor", "nurse", "admin", "pharmacist"], Field()
     ]
 
+class PatientSuggestion(BaseModel):
+    """Patient suggested by the typeahead."""
+    id: Annotated[str, Field()]
+    first_name: Annotated[str, Field(serialization_alias="firstName")]
+    last_name: Annotated[str, Field(serialization_alias="lastName")]
+    email: Annotated[str, Field()]
+
+
+class FacetCount(BaseModel):
+    """Number of matching doctors sharing a value."""
+    value: Annotated[str, Field()]
+    count: Annotated[int, Field()]
+
+
+class ExperienceBucket(BaseModel):
+    """Number of matching doctors within a range of years of experience."""
+    min_years: Annotated[int, Field(serialization_alias="minYears")]
+    max_years: Annotated[
+        Optional[int],
+        Field(default=None, description="Exclusive upper bound, absent for the last bucket", serialization_alias="maxYears"),
+    ]
+    count: Annotated[int, Field()]
+
+
+class DoctorSearchFacets(BaseModel):
+    """Facet counts over all the doctors matching a search."""
+    specialties: Annotated[list[FacetCount], Field(default_factory=list)]
+    facilities: Annotated[list[FacetCount], Field(default_factory=list)]
+    experience: Annotated[list[ExperienceBucket], Field(default_factory=list)]
+
+
+class DoctorSearchResponse(BaseModel):
+    """Schema for a page of doctor search results."""
+    results: Annotated[list[DoctorInDB], Field(default_factory=list)]
+    facets: Annotated[DoctorSearchFacets, Field()]
+    total: Annotated[int, Field(description="Total number of matching doctors")]
+    next_cursor: Annotated[
+        Optional[str],
+        Field(
+            description="Cursor for the next page, absent on the last page",
+            default=None,
+            serialization_alias="nextCursor",
+        ),
+    ]
+
+
+class PatientExpansions(BaseModel):
+    """Referenced records of a patient, included on request with `expand=`"""
+    appointments: Annotated[Optional[list[AppointmentInDB]], Field(default=None)]
+    diagnoses: Annotated[Optional[list[Diagnosis]], Field(default=None)]
+
+
+class DoctorExpansions(BaseModel):
+    """Referenced records of a doctor, included on request with `expand=`"""
+    appointments: Annotated[Optional[list[AppointmentInDB]], Field(default=None)]
+
+
 class PatientResponse(BaseModel):
     """Response Model for Patient"""
     message: Annotated[str, Field(default="Account created successfully")]
     patient: Annotated[PatientInDB, Field()]
+    expanded: Annotated[Optional[PatientExpansions], Field(default=None)]
 
 
 class DoctorResponse(BaseModel):
     """Response Model for Doctor"""
     message: Annotated[str, Field(default="Account created successfully")]
     doctor: Annotated[DoctorInDB, Field()]
+    expanded: Annotated[Optional[DoctorExpansions], Field(default=None)]
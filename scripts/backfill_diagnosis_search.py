@@ -0,0 +1,76 @@
+"""Populate `symptoms` and `created_at` of diagnoses created before they existed.
+
+Usage (from the repository root):
+
+    python -m scripts.backfill_diagnosis_search [--batch-size 1000] [--all]
+
+Symptoms are normalized with `normalize_symptom`, the same function the model
+uses, so backfilled diagnoses match the symptom filters and facets exactly.
+Diagnoses are read in `_id` order, a batch at a time, and updated with
+unordered bulk writes; only the reported symptoms are transferred. A missing
+`created_at` is recovered from the ObjectId timestamp. Without `--all`, only
+diagnoses without symptoms are updated, so the script can be stopped and run
+again.
+"""
+
+import argparse
+import asyncio
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from models.diagnosis import Diagnosis, normalize_symptom
+from utils.settings import get_settings
+
+
+def search_fields(diagnosis: dict) -> dict:
+    """Return the `$set` of the search fields of a raw diagnosis document"""
+    initial = diagnosis.get("initial_symptom")
+    reported = [initial, *diagnosis.get("additional_symptoms", [])] if initial else diagnosis.get("additional_symptoms", [])
+    fields = {"symptoms": list(dict.fromkeys(normalize_symptom(symptom) for symptom in reported if symptom))}
+    if "created_at" not in diagnosis:
+        fields["created_at"] = diagnosis["_id"].generation_time
+    return fields
+
+
+async def run(args):
+    settings = get_settings()
+    client = AsyncIOMotorClient(settings.database_connection_string)
+    await init_beanie(database=client[settings.database_name], document_models=[Diagnosis])
+
+    diagnoses = Diagnosis.get_motor_collection()
+    query = {} if args.all else {"symptoms": {"$exists": False}}
+    last_id, updated = None, 0
+    while True:
+        batch_query = {**query, "_id": {"$gt": last_id}} if last_id else query
+        batch = await diagnoses.find(
+            batch_query,
+            {"initial_symptom": 1, "additional_symptoms": 1, "created_at": 1},
+            sort=[("_id", 1)],
+            limit=args.batch_size,
+        ).to_list(None)
+        if not batch:
+            break
+
+        await diagnoses.bulk_write([
+            UpdateOne({"_id": diagnosis["_id"]}, {"$set": search_fields(diagnosis)})
+            for diagnosis in batch
+        ], ordered=False)
+        last_id = batch[-1]["_id"]
+        updated += len(batch)
+        print(f"\rUpdated {updated:,} diagnoses", end="", flush=True)
+    print()
+
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--all", action="store_true", help="Recompute the symptoms of every diagnosis")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Populate the typeahead `search_keys` of patients created before they existed.
+
+Usage (from the repository root):
+
+    python -m scripts.backfill_patient_search_keys [--batch-size 1000] [--all]
+
+Keys are folded in Python (accent removal has no aggregation equivalent), so
+patients are read in `_id` order, a batch at a time, and updated with unordered
+bulk writes. Only the name and email are transferred. Without `--all`, only
+patients without keys are updated, so the script can be stopped and run again.
+"""
+
+import argparse
+import asyncio
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from models.users import Patient, patient_search_keys
+from utils.settings import get_settings
+
+
+async def run(args):
+    settings = get_settings()
+    client = AsyncIOMotorClient(settings.database_connection_string)
+    await init_beanie(database=client[settings.database_name], document_models=[Patient])
+
+    patients = Patient.get_motor_collection()
+    query = {} if args.all else {"search_keys": {"$exists": False}}
+    last_id, updated = None, 0
+    while True:
+        batch_query = {**query, "_id": {"$gt": last_id}} if last_id else query
+        batch = await patients.find(
+            batch_query,
+            {"first_name": 1, "last_name": 1, "contact_info.email": 1},
+            sort=[("_id", 1)],
+            limit=args.batch_size,
+        ).to_list(None)
+        if not batch:
+            break
+
+        await patients.bulk_write([
+            UpdateOne(
+                {"_id": patient["_id"]},
+                {"$set": {"search_keys": patient_search_keys(
+                    patient.get("first_name", ""), patient.get("last_name", ""), patient.get("contact_info", {}).get("email", "")
+                )}},
+            )
+            for patient in batch
+        ], ordered=False)
+        last_id = batch[-1]["_id"]
+        updated += len(batch)
+        print(f"\rUpdated {updated:,} patients", end="", flush=True)
+    print()
+
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--all", action="store_true", help="Recompute the keys of every patient")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
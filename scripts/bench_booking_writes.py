@@ -0,0 +1,73 @@
+"""Write latency of booking an appointment for a patient with a long history.
+
+Usage (from the repository root):
+
+    python -m scripts.bench_booking_writes [--history 10000] [--writes 200]
+
+Compares the two ways of recording a booking on the patient document in a
+scratch database (`<DATABASE_NAME>_bench` by default):
+
+- before: the patient document holds every appointment ID; the booking loads
+  the document, appends an ID and saves the whole document back.
+- after: the patient document holds `appointment_count`; the booking is a
+  single `$inc`.
+"""
+
+import argparse
+import asyncio
+import statistics
+from time import perf_counter
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from utils.settings import get_settings
+
+
+def report(name: str, latencies: list[float]):
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{name:>7}: p50={quantiles[49]:.2f}ms p95={quantiles[94]:.2f}ms p99={quantiles[98]:.2f}ms")
+
+
+async def run(args):
+    settings = get_settings()
+    client = AsyncIOMotorClient(settings.database_connection_string)
+    collection = client[args.database or f"{settings.database_name}_bench"]["BookingWrites"]
+    await collection.drop()
+
+    before_id, after_id = ObjectId(), ObjectId()
+    await collection.insert_many([
+        {"_id": before_id, "appointments": [str(ObjectId()) for _ in range(args.history)]},
+        {"_id": after_id, "appointment_count": args.history},
+    ])
+
+    latencies = []
+    for _ in range(args.writes):
+        started = perf_counter()
+        patient = await collection.find_one({"_id": before_id})
+        patient["appointments"].append(str(ObjectId()))
+        await collection.replace_one({"_id": before_id}, patient)
+        latencies.append((perf_counter() - started) * 1000)
+    report("before", latencies)
+
+    latencies = []
+    for _ in range(args.writes):
+        started = perf_counter()
+        await collection.update_one({"_id": after_id}, {"$inc": {"appointment_count": 1}})
+        latencies.append((perf_counter() - started) * 1000)
+    report("after", latencies)
+
+    await collection.drop()
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default=None, help="Benchmark database name")
+    parser.add_argument("--history", type=int, default=10_000, help="Existing appointments of the patient")
+    parser.add_argument("--writes", type=int, default=200)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
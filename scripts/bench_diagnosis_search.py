@@ -0,0 +1,113 @@
+"""Latency benchmark for the diagnosis search endpoint.
+
+Usage (from the repository root):
+
+    python -m scripts.bench_diagnosis_search [--documents 1000000] [--queries 200] [--skip-seed]
+
+Seeds a benchmark database (`<DATABASE_NAME>_bench` by default) with synthetic
+diagnoses, builds the search indexes, and reports p50/p95/p99 latency of the
+same aggregation the `/api/v1/diagnoses/search` endpoint runs.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from models.diagnosis import Diagnosis
+from utils.diagnosis_search import search_diagnoses
+from utils.settings import get_settings
+
+
+CONDITIONS = [
+    "influenza", "common cold", "measles", "malaria", "dengue fever", "migraine", "gastroenteritis",
+    "bronchitis", "pneumonia", "tonsillitis", "chickenpox", "allergic rhinitis", "dermatitis",
+    "urinary tract infection", "hypertension", "asthma", "sinusitis", "conjunctivitis",
+]
+SYMPTOMS = [
+    "fever", "rash", "cough", "headache", "fatigue", "nausea", "vomiting", "sore throat", "chills",
+    "muscle pain", "shortness of breath", "itching", "diarrhea", "dizziness", "runny nose", "joint pain",
+]
+SEVERITIES = ["mild", "moderate", "severe", "critical"]
+
+
+def synthetic_diagnosis(rng: random.Random, now: datetime) -> dict:
+    """Build one raw diagnosis document with a skewed symptom distribution"""
+    symptoms = list(dict.fromkeys(rng.choices(SYMPTOMS, weights=range(len(SYMPTOMS), 0, -1), k=rng.randint(1, 4))))
+    primary = rng.choice(CONDITIONS)
+    return {
+        "diagnosed_user_id": f"{rng.getrandbits(96):024x}",
+        "primary_diagnosis": primary,
+        "secondary_diagnoses": rng.sample(CONDITIONS, k=rng.randint(0, 2)),
+        "description": f"Patient presents with {', '.join(symptoms)} consistent with {primary}.",
+        "precautions": [],
+        "severity_assessment": rng.choice(SEVERITIES),
+        "initial_symptom": symptoms[0],
+        "additional_symptoms": symptoms[1:],
+        "days_experiencing": rng.randint(0, 30),
+        "confidence_level": rng.choice(["low", "medium", "high"]),
+        "symptoms": symptoms,
+        "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+    }
+
+
+async def seed(documents: int, batch_size: int, seed_value: int):
+    collection = Diagnosis.get_motor_collection()
+    await collection.delete_many({})
+
+    rng = random.Random(seed_value)
+    now = datetime.now()
+    for start in range(0, documents, batch_size):
+        batch = [synthetic_diagnosis(rng, now) for _ in range(min(batch_size, documents - start))]
+        await collection.insert_many(batch, ordered=False)
+        print(f"\rSeeded {start + len(batch):,}/{documents:,} diagnoses", end="", flush=True)
+    print()
+
+
+async def run(args):
+    settings = get_settings()
+    client = AsyncIOMotorClient(settings.database_connection_string)
+    await init_beanie(database=client[args.database or f"{settings.database_name}_bench"], document_models=[Diagnosis])
+
+    if not args.skip_seed:
+        await seed(args.documents, args.batch_size, args.seed)
+
+    rng = random.Random(args.seed)
+    scenarios = {
+        "text": lambda: (rng.choice(CONDITIONS), None),
+        "symptoms": lambda: (None, rng.sample(SYMPTOMS, k=2)),
+        "text+symptoms": lambda: (rng.choice(CONDITIONS), [rng.choice(SYMPTOMS)]),
+    }
+
+    for name, make_query in scenarios.items():
+        latencies = []
+        for _ in range(args.queries):
+            query, symptoms = make_query()
+            started = perf_counter()
+            await search_diagnoses(query, symptoms, None, 20)
+            latencies.append((perf_counter() - started) * 1000)
+
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(f"{name:>14}: p50={quantiles[49]:.1f}ms p95={quantiles[94]:.1f}ms p99={quantiles[98]:.1f}ms")
+
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default=None, help="Benchmark database name")
+    parser.add_argument("--documents", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the already seeded corpus")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
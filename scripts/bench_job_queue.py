@@ -0,0 +1,92 @@
+"""Throughput benchmark for the Redis Streams job queue.
+
+Usage (from the repository root):
+
+    python -m scripts.bench_job_queue [--jobs 10000] [--workers 2] [--concurrency 50] [--handler-ms 0]
+
+Enqueues `--jobs` notification jobs the way `create_appointment` does (one
+pipelined call per job, `--clients` requests in parallel), then drains them
+with `--workers` in-process workers. The handler only sleeps `--handler-ms`, so
+the numbers measure the queue rather than the SMS provider. Uses separate keys
+(`{jobs-bench}:*`) and deletes them afterwards.
+"""
+
+import argparse
+import asyncio
+from time import perf_counter
+
+import redis.asyncio as redis
+
+from utils.jobs import JobQueue, JobWorker, job_handler
+from utils.settings import get_settings
+
+
+@job_handler("bench_notification")
+async def bench_notification(appointment_id: str, delay: float):
+    if delay:
+        await asyncio.sleep(delay)
+
+
+async def run(args):
+    connection = redis.from_url(get_settings().redis_url, encoding="utf-8", decode_responses=True)
+    queue = JobQueue(prefix="{jobs-bench}")
+    queue.init(connection)
+
+    keys = [key async for key in connection.scan_iter(match="{jobs-bench}:*")]
+    if keys:
+        await connection.delete(*keys)
+    await queue.ensure_group()
+
+    semaphore = asyncio.Semaphore(args.clients)
+
+    async def enqueue(number: int):
+        async with semaphore:
+            async with connection.pipeline(transaction=True) as pipe:
+                await queue.enqueue(
+                    "bench_notification",
+                    {"appointment_id": str(number), "delay": args.handler_ms / 1000},
+                    job_id=f"bench:{number}",
+                    pipe=pipe,
+                )
+                await pipe.execute()
+
+    started = perf_counter()
+    await asyncio.gather(*(enqueue(number) for number in range(args.jobs)))
+    elapsed = perf_counter() - started
+    print(f"Enqueued {args.jobs:,} jobs in {elapsed:.2f}s ({args.jobs / elapsed:,.0f} jobs/s)")
+
+    await asyncio.gather(*(enqueue(number) for number in range(min(args.jobs, 100))))
+    print(f"Stream length after re-enqueueing 100 duplicate IDs: {await connection.xlen(queue.stream_key):,}")
+
+    workers = [JobWorker(queue, args.concurrency, consumer=f"bench-{number}") for number in range(args.workers)]
+    started = perf_counter()
+    runs = [asyncio.create_task(worker.run(block_ms=100)) for worker in workers]
+    while sum(worker.processed + worker.failed for worker in workers) < args.jobs:
+        await asyncio.sleep(0.05)
+    elapsed = perf_counter() - started
+    for worker in workers:
+        worker.stop()
+    await asyncio.gather(*runs)
+
+    processed = sum(worker.processed for worker in workers)
+    print(f"Processed {processed:,} jobs with {args.workers} workers x {args.concurrency} in {elapsed:.2f}s ({processed / elapsed:,.0f} jobs/s)")
+    print(f"Left in stream: {await connection.xlen(queue.stream_key):,}")
+
+    keys = [key async for key in connection.scan_iter(match="{jobs-bench}:*")]
+    if keys:
+        await connection.delete(*keys)
+    await connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10_000)
+    parser.add_argument("--clients", type=int, default=50, help="Parallel enqueueing requests")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--handler-ms", type=float, default=0, help="Simulated handler latency")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Index size and latency benefit of archiving old appointments.
+
+Usage (from the repository root):
+
+    python -m scripts.bench_tiering [--appointments 2000000] [--queries 200] [--skip-seed]
+
+Seeds a benchmark database (`<DATABASE_NAME>_tiering` by default) with
+synthetic appointments spread over the last `--years` years, reports the
+storage and index sizes of the hot collection (`$collStats`) and the latency of
+the doctor schedule and patient history queries, runs the archiving job, and
+reports the same numbers again, plus the latency of a date-range query that
+falls through to the archive.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from models.appointment import Appointment
+from models.archive import ArchivedAppointment, ArchivedDiagnosis
+from models.diagnosis import Diagnosis
+from utils.replica_reads import ReplicaReads
+from utils.settings import get_settings
+from utils.tiering import archive_cold_records, archive_union
+
+
+def synthetic_appointment(rng: random.Random, now: datetime, years: int, doctors: int, patients: int) -> dict:
+    """Build one raw appointment; past appointments are mostly completed or canceled"""
+    date = now + timedelta(minutes=rng.randint(-60 * 24 * 365 * years, 60 * 24 * 30))
+    if date > now:
+        status = "scheduled"
+    else:
+        status = rng.choices(["completed", "canceled", "scheduled"], weights=[85, 10, 5])[0]
+    return {
+        "patient": f"patient-{rng.randrange(patients)}",
+        "doctor": f"doctor-{rng.randrange(doctors)}",
+        "appointment_date": date,
+        "status": status,
+        "ai_diagnosis": "",
+        "notes": "",
+    }
+
+
+async def seed(args):
+    collection = Appointment.get_motor_collection()
+    await collection.delete_many({})
+    await ArchivedAppointment.get_motor_collection().delete_many({})
+
+    rng = random.Random(args.seed)
+    now = datetime.now()
+    for start in range(0, args.appointments, args.batch_size):
+        batch = [
+            synthetic_appointment(rng, now, args.years, args.doctors, args.patients)
+            for _ in range(min(args.batch_size, args.appointments - start))
+        ]
+        await collection.insert_many(batch, ordered=False)
+        print(f"\rSeeded {start + len(batch):,}/{args.appointments:,} appointments", end="", flush=True)
+    print()
+
+
+async def storage(model) -> dict:
+    stats = await model.get_motor_collection().aggregate([{"$collStats": {"storageStats": {}}}]).to_list(None)
+    storage_stats = stats[0]["storageStats"]
+    return {
+        "count": storage_stats["count"],
+        "size": storage_stats["size"],
+        "totalIndexSize": storage_stats["totalIndexSize"],
+        "indexSizes": storage_stats["indexSizes"],
+    }
+
+
+def report_storage(label: str, stats: dict):
+    indexes = ", ".join(f"{name}={size / 2 ** 20:.1f}MB" for name, size in stats["indexSizes"].items())
+    print(
+        f"{label}: {stats['count']:,} documents, data {stats['size'] / 2 ** 20:.1f}MB, "
+        f"indexes {stats['totalIndexSize'] / 2 ** 20:.1f}MB ({indexes})"
+    )
+
+
+async def latency(name: str, queries: int, make_query):
+    latencies = []
+    for _ in range(queries):
+        started = perf_counter()
+        await make_query()
+        latencies.append((perf_counter() - started) * 1000)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{name:>22}: p50={quantiles[49]:.2f}ms p95={quantiles[94]:.2f}ms p99={quantiles[98]:.2f}ms")
+
+
+async def measure(args, rng: random.Random):
+    now = datetime.now()
+    await latency(
+        "doctor schedule",
+        args.queries,
+        lambda: Appointment.find(
+            Appointment.doctor == f"doctor-{rng.randrange(args.doctors)}",
+            Appointment.appointment_date >= now - timedelta(days=7),
+        ).sort(-Appointment.appointment_date).limit(20).to_list(),
+    )
+    await latency(
+        "patient history",
+        args.queries,
+        lambda: Appointment.find(Appointment.patient == f"patient-{rng.randrange(args.patients)}").limit(20).to_list(),
+    )
+
+
+async def run(args):
+    settings = get_settings()
+    client = AsyncIOMotorClient(settings.database_connection_string)
+    await init_beanie(
+        database=client[args.database or f"{settings.database_name}_tiering"],
+        document_models=[Appointment, ArchivedAppointment, Diagnosis, ArchivedDiagnosis],
+    )
+
+    if not args.skip_seed:
+        await seed(args)
+
+    rng = random.Random(args.seed)
+    report_storage("hot before", await storage(Appointment))
+    await measure(args, rng)
+
+    started = perf_counter()
+    archived = await archive_cold_records(batch_size=args.archive_batch_size, max_batches=10 ** 9)
+    elapsed = perf_counter() - started
+    moved = archived[Appointment.get_motor_collection().name]
+    print(f"Archived {moved:,} appointments in {elapsed:.1f}s ({moved / max(elapsed, 1e-9):,.0f}/s)")
+
+    report_storage("hot after", await storage(Appointment))
+    report_storage("archive", await storage(ArchivedAppointment))
+    await measure(args, rng)
+
+    reads = ReplicaReads()
+    since = datetime.now() - timedelta(days=365 * args.years)
+    await latency(
+        "history with archive",
+        args.queries,
+        lambda: reads.aggregate(Appointment, archive_union(
+            Appointment.find(
+                Appointment.patient == f"patient-{rng.randrange(args.patients)}",
+                Appointment.appointment_date >= since,
+            ),
+            {"appointment_date": -1, "_id": -1},
+            0,
+            20,
+        )),
+    )
+
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default=None, help="Benchmark database name")
+    parser.add_argument("--appointments", type=int, default=2_000_000)
+    parser.add_argument("--years", type=int, default=3, help="Years of appointment history")
+    parser.add_argument("--doctors", type=int, default=2_000)
+    parser.add_argument("--patients", type=int, default=200_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--archive-batch-size", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the already seeded appointments")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
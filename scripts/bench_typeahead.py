@@ -0,0 +1,86 @@
+"""Latency benchmark for the patient typeahead.
+
+Usage (from the repository root):
+
+    python -m scripts.generate_dataset --patients 1000000 --appointments 0 --diagnoses 0 --treatments 0 --reviews 0 --drop
+    python -m scripts.bench_typeahead [--queries 2000] [--budget-ms 20]
+
+Runs against the synthetic database (`<DATABASE_NAME>_synthetic` by default).
+Prefixes of 1 to 8 characters are cut from the keys of sampled patients, and
+the p50/p95/p99 latency of the index range query alone and of the trie in front
+of it is reported. Exits with a non-zero status when the p99 of either exceeds
+`--budget-ms`.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+from time import perf_counter
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from models.users import Patient
+from utils.settings import get_settings
+from utils.typeahead import patient_typeahead, query_prefix, suggest_patients
+
+
+async def latency(name: str, prefixes: list[str], lookup) -> float:
+    latencies = []
+    for prefix in prefixes:
+        started = perf_counter()
+        await lookup(prefix)
+        latencies.append((perf_counter() - started) * 1000)
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{name:>12}: p50={quantiles[49]:.2f}ms p95={quantiles[94]:.2f}ms p99={quantiles[98]:.2f}ms")
+    return quantiles[98]
+
+
+async def run(args) -> bool:
+    settings = get_settings()
+    client = AsyncIOMotorClient(settings.database_connection_string)
+    await init_beanie(database=client[args.database or f"{settings.database_name}_synthetic"], document_models=[Patient])
+
+    total = await Patient.get_motor_collection().estimated_document_count()
+    samples = await Patient.get_motor_collection().aggregate([
+        {"$sample": {"size": args.queries}},
+        {"$project": {"search_keys": 1}},
+    ]).to_list(None)
+    if not samples:
+        print("No patients found; load them with scripts.generate_dataset first")
+        client.close()
+        return False
+
+    rng = random.Random(args.seed)
+    prefixes = []
+    for sample in samples:
+        key = rng.choice(sample["search_keys"])
+        prefixes.append(key[:rng.randint(1, min(8, len(key)))])
+
+    print(f"{len(prefixes):,} prefixes over {total:,} patients")
+    index_p99 = await latency("index only", prefixes, lambda prefix: query_prefix(prefix, args.limit))
+    patient_typeahead.drop()
+    trie_p99 = await latency("with trie", prefixes, lambda prefix: suggest_patients(prefix, args.limit))
+    print(f"Trie: {patient_typeahead.metrics()}")
+
+    client.close()
+    ok = max(index_p99, trie_p99) <= args.budget_ms
+    print("OK" if ok else f"p99 exceeded the budget of {args.budget_ms:.1f}ms")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default=None, help="Database loaded by scripts.generate_dataset")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10, help="Suggestions per query")
+    parser.add_argument("--budget-ms", type=float, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    if not asyncio.run(run(parser.parse_args())):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Size and encode/decode time of the negotiated wire formats.
+
+Usage (from the repository root):
+
+    python -m scripts.bench_wire_formats [--records 5000] [--repeat 5]
+
+Builds synthetic appointment and diagnosis pages from the response models and
+encodes them the way the list endpoints do, as JSON and as MessagePack, then
+compresses each body with gzip and (if installed) zstd. No database is needed.
+"""
+
+import argparse
+import gzip
+import json
+import random
+from datetime import datetime, timedelta
+from time import perf_counter
+
+import msgpack
+from beanie import PydanticObjectId
+from pydantic import TypeAdapter
+
+from models.diagnosis import Diagnosis
+from schema.responses.appointment import AppointmentInDB
+from scripts.bench_diagnosis_search import synthetic_diagnosis
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def synthetic_appointments(rng: random.Random, count: int) -> list[AppointmentInDB]:
+    now = datetime.now()
+    return [
+        AppointmentInDB(
+            id=PydanticObjectId(),
+            patient=f"{rng.getrandbits(96):024x}",
+            doctor=f"{rng.getrandbits(96):024x}",
+            appointment_date=now + timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+            status=rng.choice(["scheduled", "completed", "canceled"]),
+            ai_diagnosis=rng.choice(["", "Likely viral infection, rest and fluids advised."]),
+            notes=rng.choice(["", "Follow-up visit", "Bring previous test results"]),
+        )
+        for _ in range(count)
+    ]
+
+
+def timed(function, repeat: int) -> tuple[float, object]:
+    """Return the best wall time of `repeat` runs in milliseconds, and the last result"""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = perf_counter()
+        result = function()
+        best = min(best, (perf_counter() - started) * 1000)
+    return best, result
+
+
+def report(name: str, items: list, repeat: int):
+    adapter = TypeAdapter(list[type(items[0])])
+
+    encoders = {
+        "json": (
+            lambda: adapter.dump_json(items, by_alias=True),
+            json.loads,
+        ),
+        "msgpack": (
+            lambda: msgpack.packb(adapter.dump_python(items, mode="json", by_alias=True)),
+            msgpack.unpackb,
+        ),
+    }
+
+    print(f"\n{name} ({len(items):,} records)")
+    print(f"{'format':>8} {'bytes':>10} {'gzip':>10} {'zstd':>10} {'encode ms':>10} {'decode ms':>10}")
+    for format_name, (encode, decode) in encoders.items():
+        encode_ms, body = timed(encode, repeat)
+        decode_ms, _ = timed(lambda: decode(body), repeat)
+        gzipped = len(gzip.compress(body, compresslevel=6))
+        zstd = len(zstandard.ZstdCompressor(level=3).compress(body)) if zstandard else None
+        print(
+            f"{format_name:>8} {len(body):>10,} {gzipped:>10,} {zstd if zstd is not None else '-':>10,} "
+            f"{encode_ms:>10.1f} {decode_ms:>10.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime.now()
+    diagnoses = [
+        Diagnosis.model_construct(id=PydanticObjectId(), **synthetic_diagnosis(rng, now))
+        for _ in range(args.records)
+    ]
+
+    report("appointments", synthetic_appointments(rng, args.records), args.repeat)
+    report("diagnoses", diagnoses, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
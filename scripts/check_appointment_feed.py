@@ -0,0 +1,85 @@
+"""End-to-end check of the live appointment feed against a replica set.
+
+Usage (from the repository root):
+
+    python -m scripts.check_appointment_feed [--timeout 10]
+
+Change streams need a replica set. For a local single-node replica set:
+
+    docker run -d --name mongo-rs -p 27017:27017 mongo:7 --replSet rs0
+    docker exec mongo-rs mongosh --quiet --eval "rs.initiate()"
+    set DATABASE_CONNECTION_STRING=mongodb://localhost:27017/?replicaSet=rs0&directConnection=true
+
+Starts the worker's change-stream watcher in a scratch database
+(`<DATABASE_NAME>_feed` by default), subscribes to one doctor, then inserts and
+updates an appointment and verifies that both events arrive, that events for
+other doctors are not delivered, and that reconnecting with the first event ID
+replays the second. Exits with a non-zero status on failure.
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from models.appointment import Appointment
+from utils.appointment_feed import appointment_feed
+from utils.settings import get_settings
+
+
+async def run(args) -> bool:
+    settings = get_settings()
+    client = AsyncIOMotorClient(settings.database_connection_string)
+    await init_beanie(database=client[args.database or f"{settings.database_name}_feed"], document_models=[Appointment])
+    await Appointment.find_all().delete()
+
+    appointment_feed.start()
+    subscription = appointment_feed.subscribe({("doctor", "doctor-1")})
+    # * Give the watcher time to open the change stream before writing
+    await asyncio.sleep(1)
+
+    appointment = Appointment(patient="patient-1", doctor="doctor-1", appointment_date=datetime.now() + timedelta(days=1))
+    await Appointment(patient="patient-2", doctor="doctor-2", appointment_date=datetime.now() + timedelta(days=1)).insert()
+    await appointment.insert()
+    appointment.status = "canceled"
+    await appointment.save()
+
+    received = []
+    while len(received) < 2:
+        event = await subscription.next_event(args.timeout)
+        if event is None:
+            break
+        received.append(event)
+
+    types = [event["type"] for event in received]
+    doctors = {event["appointment"]["doctor"] for event in received}
+    ok = types == ["created", "updated"] and doctors == {"doctor-1"}
+    print(f"Received {types} for doctors {sorted(doctors)}: {'OK' if ok else 'FAILED'}")
+
+    if ok:
+        replay = appointment_feed.subscribe({("doctor", "doctor-1")}, last_event_id=received[0]["id"])
+        replayed = await replay.next_event(args.timeout)
+        resumed = replayed is not None and replayed.get("id") == received[1]["id"]
+        print(f"Replay after reconnect: {'OK' if resumed else 'FAILED'}")
+        ok = ok and resumed
+        appointment_feed.unsubscribe(replay)
+
+    appointment_feed.unsubscribe(subscription)
+    await appointment_feed.close()
+    client.close()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default=None, help="Scratch database name")
+    parser.add_argument("--timeout", type=float, default=10, help="Seconds to wait for each event")
+    if not asyncio.run(run(parser.parse_args())):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
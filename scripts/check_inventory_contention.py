@@ -0,0 +1,59 @@
+"""Contention check for atomic dispensing.
+
+Usage (from the repository root):
+
+    python -m scripts.check_inventory_contention [--dispenses 500] [--stock 300]
+
+Seeds one SKU in a scratch database (`<DATABASE_NAME>_contention` by default),
+fires `--dispenses` parallel single-unit dispenses at it and verifies that
+exactly `--stock` of them succeed and that the stock never goes negative.
+Exits with a non-zero status if the invariant is violated.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from models.pharmacy import DrugInventory
+from utils.inventory import dispense
+from utils.settings import get_settings
+
+
+async def run(args) -> bool:
+    settings = get_settings()
+    client = AsyncIOMotorClient(settings.database_connection_string, maxPoolSize=args.dispenses)
+    await init_beanie(database=client[args.database or f"{settings.database_name}_contention"], document_models=[DrugInventory])
+
+    await DrugInventory.find_all().delete()
+    await DrugInventory(drug_id="drug", pharmacy_id="pharmacy", quantity=args.stock, price=1.0).insert()
+
+    results = await asyncio.gather(*(dispense("drug", "pharmacy", 1) for _ in range(args.dispenses)))
+    succeeded = [result for result in results if result is not None]
+    final = await DrugInventory.find_one(DrugInventory.drug_id == "drug")
+
+    expected = min(args.stock, args.dispenses)
+    ok = (
+        len(succeeded) == expected
+        and final.quantity == args.stock - expected
+        and all(result.quantity >= 0 for result in succeeded)
+    )
+    print(f"{len(succeeded)} of {args.dispenses} dispenses succeeded, final stock {final.quantity}: {'OK' if ok else 'FAILED'}")
+
+    client.close()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default=None, help="Scratch database name")
+    parser.add_argument("--dispenses", type=int, default=500)
+    parser.add_argument("--stock", type=int, default=300)
+    if not asyncio.run(run(parser.parse_args())):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
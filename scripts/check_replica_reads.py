@@ -0,0 +1,114 @@
+"""Check read-your-writes on secondaries against a multi-node replica set.
+
+Usage (from the repository root):
+
+    python -m scripts.check_replica_reads [--rounds 50]
+
+Needs a replica set with at least one secondary and `SECRET_KEY` set. For a
+local three-node replica set, map `mongo1`, `mongo2` and `mongo3` to
+`127.0.0.1` in your hosts file, then:
+
+    docker network create mongo-rs
+    docker run -d --name mongo1 --net mongo-rs -p 27017:27017 mongo:7 --replSet rs0 --bind_ip_all --port 27017
+    docker run -d --name mongo2 --net mongo-rs -p 27018:27018 mongo:7 --replSet rs0 --bind_ip_all --port 27018
+    docker run -d --name mongo3 --net mongo-rs -p 27019:27019 mongo:7 --replSet rs0 --bind_ip_all --port 27019
+    docker exec mongo1 mongosh --quiet --eval "rs.initiate({_id: 'rs0', members: [{_id: 0, host: 'mongo1:27017'}, {_id: 1, host: 'mongo2:27018'}, {_id: 2, host: 'mongo3:27019'}]})"
+    set DATABASE_CONNECTION_STRING=mongodb://mongo1:27017,mongo2:27018,mongo3:27019/?replicaSet=rs0
+
+Each round inserts an appointment in a scratch database
+(`<DATABASE_NAME>_replicas` by default), turns the recorded write times into a
+consistency token, and reads the appointment back through `ReplicaReads` with
+and without the token. Every read with the token must find the appointment and
+be served by a secondary. Reads without it may miss; their misses are reported
+to show the lag the token protects against. Exits with a non-zero status on
+failure.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SECONDARY_READS_ENABLED", "true")
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from models.appointment import Appointment
+from utils.replica_reads import CausalTokenListener, ReplicaReads, decode_token, encode_token, track_writes
+from utils.settings import get_settings
+
+
+class FindServers(monitoring.CommandListener):
+    """Remembers which servers answered `find` commands"""
+
+    def __init__(self):
+        self.servers: list[tuple[str, int]] = []
+
+    def started(self, event):
+        if event.command_name == "find":
+            self.servers.append(event.connection_id)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def run(args) -> bool:
+    settings = get_settings()
+    finds = FindServers()
+    client = AsyncIOMotorClient(settings.database_connection_string, event_listeners=[CausalTokenListener(), finds])
+    await init_beanie(database=client[args.database or f"{settings.database_name}_replicas"], document_models=[Appointment])
+    await Appointment.find_all().delete()
+
+    hello = await client.admin.command("hello")
+    if not hello.get("setName") or not hello.get("hosts") or len(hello["hosts"]) < 2:
+        print("Not connected to a multi-node replica set")
+        client.close()
+        return False
+
+    missed_with_token = missed_without_token = 0
+    read_from_primary = 0
+    for round_number in range(args.rounds):
+        times = track_writes()
+        appointment = Appointment(
+            patient=f"patient-{round_number}",
+            doctor="doctor-1",
+            appointment_date=datetime.now() + timedelta(days=1),
+        )
+        await appointment.insert()
+        token = decode_token(encode_token(times))
+
+        without_token = await ReplicaReads().to_list(Appointment.find(Appointment.id == appointment.id))
+        missed_without_token += not without_token
+
+        finds.servers.clear()
+        with_token = await ReplicaReads(token).to_list(Appointment.find(Appointment.id == appointment.id))
+        missed_with_token += not with_token
+        read_from_primary += any(f"{host}:{port}" == hello["primary"] for host, port in finds.servers)
+
+    print(f"Reads without a token that missed the write: {missed_without_token}/{args.rounds}")
+    print(f"Reads with a token that missed the write: {missed_with_token}/{args.rounds}")
+    print(f"Reads with a token served by the primary: {read_from_primary}/{args.rounds}")
+    ok = missed_with_token == 0 and read_from_primary == 0
+    print("OK" if ok else "FAILED")
+
+    await Appointment.find_all().delete()
+    client.close()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default=None, help="Scratch database name")
+    parser.add_argument("--rounds", type=int, default=50, help="Number of write-then-read rounds")
+    if not asyncio.run(run(parser.parse_args())):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
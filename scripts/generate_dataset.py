@@ -0,0 +1,561 @@
+"""Generate and bulk load a synthetic, production-scale dataset.
+
+Usage (from the repository root):
+
+    python -m scripts.generate_dataset [--patients 1000000] [--doctors 10000] [--appointments 20000000]
+                                       [--workers 8] [--seed 42] [--as-of 2025-01-01] [--drop]
+
+Loads a benchmark database (`<DATABASE_NAME>_synthetic` by default) with
+hospitals, clinics, pharmacies, drug manufacturers, drugs, pharmacy inventory,
+doctors, patients, appointments, diagnoses, treatments and reviews.
+
+- Referentially valid: every document gets an ObjectId derived from its kind
+  and position, so children reference parents without any lookups, and every
+  reference points to a document of the same run.
+- Skewed: doctors and patients are picked from power-law distributions
+  (`--doctor-skew`, `--patient-skew`; 0 is uniform), so a few doctors carry a
+  large share of the appointments and most patients have a handful.
+- Repeatable: each chunk is generated from its own generator seeded with
+  (`--seed`, kind, chunk), and dates are relative to `--as-of`, so the same
+  arguments always produce the same documents, whatever `--workers` is.
+- Streaming and parallel: chunks of `--batch-size` documents are generated
+  and BSON-encoded in `--workers` processes, at most a few chunks ahead of the
+  loader, and loaded with unordered `insert_many` calls.
+
+Indexes are built once everything is loaded, then the patient and doctor
+counters and the ratings of reviewed documents are recomputed from the child
+collections. Every account's password is `--password`.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import struct
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from time import perf_counter
+
+from beanie import init_beanie
+from bson import ObjectId, encode
+from bson.raw_bson import RawBSONDocument
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+from models.appointment import Appointment
+from models.diagnosis import Diagnosis
+from models.helpers import minute_of_day
+from models.medical_facilities import Clinic, Hospital, Pharmacy
+from models.pharmacy import Drug, DrugInventory, DrugManufacturer
+from models.review import Review
+from models.treatment import Treatment
+from models.users import Doctor, Patient, patient_search_keys
+from scripts.bench_diagnosis_search import CONDITIONS, SEVERITIES, SYMPTOMS
+from scripts.migrate_user_relationships import write_counts
+from security.helpers import get_password_hash
+from utils.reviews import REVIEW_TARGETS
+from utils.settings import get_settings
+
+
+# * One byte per kind goes into the generated ObjectIds, so IDs never collide across kinds
+KINDS = [
+    "hospital", "clinic", "pharmacy", "manufacturer", "drug", "inventory",
+    "doctor", "patient", "appointment", "diagnosis", "treatment", "review",
+]
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS, start=1)}
+
+# * (city, longitude, latitude, share of the population)
+CITIES = [
+    ("Harare", 31.0534, -17.8292, 40), ("Bulawayo", 28.5833, -20.1500, 20), ("Chitungwiza", 31.0756, -18.0127, 10),
+    ("Mutare", 32.6709, -18.9707, 8), ("Gweru", 29.8149, -19.4500, 7), ("Kwekwe", 29.8149, -18.9281, 5),
+    ("Kadoma", 29.9153, -18.3333, 4), ("Masvingo", 30.8327, -20.0637, 3), ("Victoria Falls", 25.8307, -17.9318, 3),
+]
+FIRST_NAMES = [
+    "Tendai", "Tatenda", "Rudo", "Farai", "Nyasha", "Chipo", "Tafadzwa", "Kudzai", "Blessing", "Tinashe", "Ruvimbo",
+    "Simba", "Thandiwe", "Sipho", "Nomsa", "Themba", "Precious", "Memory", "Takudzwa", "Vimbai", "John", "Mary",
+    "José", "Chloé", "Zoë", "Renée",
+]
+LAST_NAMES = [
+    "Moyo", "Ncube", "Sibanda", "Dube", "Mpofu", "Ndlovu", "Chikwanha", "Mutasa", "Nyathi", "Chirwa", "Banda",
+    "Mhlanga", "Gumbo", "Marufu", "Chiwenga", "Mlambo", "Zhou", "Makoni", "Shumba", "Tshuma",
+]
+SPECIALTIES = [
+    "general practice", "pediatrics", "cardiology", "dermatology", "gynecology", "orthopedics", "neurology",
+    "psychiatry", "ophthalmology", "oncology", "radiology", "surgery", "internal medicine", "ent",
+]
+ALLERGIES = ["penicillin", "peanuts", "latex", "sulfa drugs", "pollen", "shellfish", "aspirin", "dust mites"]
+CHRONIC_CONDITIONS = ["hypertension", "diabetes", "asthma", "hiv", "epilepsy", "arthritis", "sickle cell disease"]
+INSURERS = ["CIMAS", "PSMAS", "First Mutual Health", "Fidelity Life", "Bonvie", None]
+DRUG_STEMS = ["amoxi", "para", "ibu", "metro", "cipro", "azi", "lisino", "amlo", "metfor", "predni", "cetiri", "omepra"]
+DRUG_SUFFIXES = ["cillin", "cetamol", "profen", "nidazole", "floxacin", "thromycin", "pril", "dipine", "min", "solone", "zine", "zole"]
+SIDE_EFFECTS = ["nausea", "headache", "dizziness", "drowsiness", "rash", "diarrhea", "dry mouth", "fatigue"]
+FREQUENCIES = ["once daily", "twice daily", "three times daily", "every 8 hours", "as needed"]
+OPENING_HOURS = [("07:00AM", "07:00PM"), ("08:00AM", "05:00PM"), ("08:00AM", "10:00PM"), ("12:00AM", "12:00AM")]
+COMMENTS = ["Very helpful", "Long wait but good care", "Explained everything clearly", "Would not recommend", "Excellent"]
+
+
+@dataclass(frozen=True)
+class Plan:
+    """Everything a worker needs to generate any chunk of the dataset"""
+    seed: int
+    as_of: datetime
+    years: int
+    hospitals: int
+    clinics: int
+    pharmacies: int
+    manufacturers: int
+    drugs: int
+    inventory: int
+    doctors: int
+    patients: int
+    appointments: int
+    diagnoses: int
+    treatments: int
+    reviews: int
+    doctor_skew: float
+    patient_skew: float
+    password_hash: str
+
+    @property
+    def start(self) -> datetime:
+        return self.as_of - timedelta(days=365 * self.years)
+
+    @property
+    def facilities(self) -> int:
+        return self.hospitals + self.clinics
+
+    def count(self, kind: str) -> int:
+        """Number of documents of a parent kind"""
+        return getattr(self, "pharmacies" if kind == "pharmacy" else f"{kind}s")
+
+
+def created_at(plan: Plan, kind: str, index: int) -> datetime:
+    """Creation time of a parent document; parents are created evenly over the history, in index order"""
+    return plan.start + (plan.as_of - plan.start) * (index / plan.count(kind))
+
+
+def object_id(kind: str, index: int, when: datetime) -> ObjectId:
+    """Deterministic ObjectId: creation time, then the kind, then the position within the kind"""
+    return ObjectId(struct.pack(">IB", int(when.timestamp()), KIND_CODES[kind]) + index.to_bytes(7, "big"))
+
+
+def parent_id(plan: Plan, kind: str, index: int) -> str:
+    """ID of a parent document, as child documents store it"""
+    return str(object_id(kind, index, created_at(plan, kind, index)))
+
+
+def skewed(rng: random.Random, n: int, skew: float) -> int:
+    """Pick an index in [0, n) with probability roughly proportional to (index + 1) ** -skew"""
+    u = rng.random()
+    if skew == 1:
+        x = (n + 1) ** u
+    else:
+        exponent = 1 - skew
+        x = (1 + u * ((n + 1) ** exponent - 1)) ** (1 / exponent)
+    return min(int(x) - 1, n - 1)
+
+
+def after(rng: random.Random, plan: Plan, earliest: datetime, future_days: int = 0) -> datetime:
+    """A time between `earliest` and `future_days` after the as-of date"""
+    end = plan.as_of + timedelta(days=future_days)
+    return earliest + timedelta(seconds=rng.randint(0, max(int((end - earliest).total_seconds()), 0)))
+
+
+def person(rng: random.Random, plan: Plan, kind: str, index: int) -> dict:
+    """Fields shared by patients and doctors"""
+    first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    born = plan.as_of - timedelta(days=rng.randint(365 * (25 if kind == "doctor" else 0), 365 * 90))
+    return {
+        "contact_info": {
+            "email": f"{first_name}.{last_name}.{kind}{index}@example.com".lower(),
+            "phone": f"+26377{rng.randrange(10 ** 7):07d}",
+        },
+        "password": plan.password_hash,
+        "first_name": first_name,
+        "last_name": last_name,
+        "active": rng.random() > 0.02,
+        "created_at": created_at(plan, kind, index),
+        "permissions": [],
+        "gender": rng.choices(["female", "male", "other"], weights=[52, 47, 1])[0],
+        "profile_picture": None,
+        "birth_details": {"day": born.day, "month": born.month, "year": born.year},
+    }
+
+
+def location(rng: random.Random) -> tuple[str, dict]:
+    city, longitude, latitude, _ = rng.choices(CITIES, weights=[city[3] for city in CITIES])[0]
+    return city, {
+        "type": "Point",
+        "coordinates": [round(longitude + rng.uniform(-0.1, 0.1), 6), round(latitude + rng.uniform(-0.1, 0.1), 6)],
+    }
+
+
+def facility(rng: random.Random, plan: Plan, kind: str, index: int) -> dict:
+    city, point = location(rng)
+    open_time, close_time = rng.choice(OPENING_HOURS)
+    open_minute, close_minute = minute_of_day(open_time), minute_of_day(close_time)
+    document = {
+        "_id": object_id(kind, index, created_at(plan, kind, index)),
+        "name": f"{rng.choice(LAST_NAMES)} {city} {kind.title()} {index}",
+        "address": {"street": f"{rng.randint(1, 999)} {rng.choice(LAST_NAMES)} Street", "city": city, "state": city, "zip": "00263"},
+        "location": point,
+        "contact_info": {"email": f"{kind}{index}@example.com", "phone": f"+26324{rng.randrange(10 ** 7):07d}"},
+        "operational_hours": {
+            "open_time": open_time,
+            "close_time": close_time,
+            "open_minute": open_minute,
+            "close_minute": close_minute,
+            "overnight": close_minute <= open_minute,
+        },
+        "rating_sum": 0,
+        "rating_count": 0,
+        "rating_average": 0,
+    }
+    if kind != "pharmacy":
+        # * Doctor i works at facility i % facilities, hospitals first
+        facility_index = index if kind == "hospital" else plan.hospitals + index
+        document["specialties"] = sorted(set(rng.sample(SPECIALTIES, k=rng.randint(1, 6 if kind == "hospital" else 2))))
+        document["doctors"] = [parent_id(plan, "doctor", doctor) for doctor in range(facility_index, plan.doctors, plan.facilities)]
+    return document
+
+
+def doctor_facility(plan: Plan, index: int) -> str:
+    facility_index = index % plan.facilities
+    if facility_index < plan.hospitals:
+        return parent_id(plan, "hospital", facility_index)
+    return parent_id(plan, "clinic", facility_index - plan.hospitals)
+
+
+def generate(plan: Plan, kind: str, index: int, rng: random.Random) -> dict:
+    """Build the raw document at `index` of `kind`"""
+    if kind in ("hospital", "clinic", "pharmacy"):
+        return facility(rng, plan, kind, index)
+
+    if kind == "manufacturer":
+        return {
+            "_id": object_id(kind, index, created_at(plan, kind, index)),
+            "name": f"{rng.choice(LAST_NAMES)} Pharmaceuticals {index}",
+            "address": f"{rng.randint(1, 999)} Industrial Road, {location(rng)[0]}",
+            "contact_info": f"sales{index}@example.com",
+            "website": f"https://manufacturer{index}.example.com",
+        }
+
+    if kind == "drug":
+        name = f"{rng.choice(DRUG_STEMS)}{rng.choice(DRUG_SUFFIXES)} {rng.choice([5, 10, 20, 50, 100, 250, 500])}mg"
+        return {
+            "_id": object_id(kind, index, created_at(plan, kind, index)),
+            "name": name,
+            "description": f"{name.split()[0].title()} tablets",
+            "side_effects": rng.sample(SIDE_EFFECTS, k=rng.randint(0, 3)),
+            "manufacturer_id": parent_id(plan, "manufacturer", rng.randrange(plan.manufacturers)),
+            "rating_sum": 0,
+            "rating_count": 0,
+            "rating_average": 0,
+        }
+
+    if kind == "doctor":
+        return {
+            "_id": object_id(kind, index, created_at(plan, kind, index)),
+            **person(rng, plan, kind, index),
+            "id_number": f"MDPCZ{index:07d}",
+            "specialty": [rng.choice(SPECIALTIES)],
+            "years_of_experience": rng.randint(0, 40),
+            "patients": [],
+            "medical_facility": doctor_facility(plan, index),
+            "appointment_count": 0,
+            "rating_sum": 0,
+            "rating_count": 0,
+            "rating_average": 0,
+            "role": "doctor",
+        }
+
+    if kind == "patient":
+        shared = person(rng, plan, kind, index)
+        return {
+            "_id": object_id(kind, index, created_at(plan, kind, index)),
+            **shared,
+            "search_keys": patient_search_keys(shared["first_name"], shared["last_name"], shared["contact_info"]["email"]),
+            "emergency_contact": f"+26371{rng.randrange(10 ** 7):07d}" if rng.random() < 0.6 else None,
+            "allergies": rng.sample(ALLERGIES, k=rng.choices([0, 1, 2], weights=[80, 15, 5])[0]),
+            "medical_history": rng.sample(CHRONIC_CONDITIONS, k=rng.choices([0, 1, 2], weights=[75, 20, 5])[0]),
+            "insurance_provider": (insurer := rng.choice(INSURERS)),
+            "insurance_number": f"{rng.randrange(10 ** 10):010d}" if insurer else None,
+            "height": round(rng.gauss(165, 10), 1),
+            "weight": round(rng.gauss(68, 12), 1),
+            "appointment_count": 0,
+            "diagnosis_count": 0,
+            "treatment_count": 0,
+            "role": "patient",
+        }
+
+    # * Children pick skewed parents and happen after the patient signed up
+    patient = skewed(rng, plan.patients, plan.patient_skew)
+    patient_since = max(created_at(plan, "patient", patient), plan.start)
+
+    if kind == "appointment":
+        date = after(rng, plan, patient_since, future_days=30)
+        if date > plan.as_of:
+            status = "scheduled"
+        else:
+            status = rng.choices(["completed", "canceled", "scheduled"], weights=[85, 10, 5])[0]
+        return {
+            "_id": object_id(kind, index, min(date, plan.as_of)),
+            "patient": parent_id(plan, "patient", patient),
+            "doctor": parent_id(plan, "doctor", skewed(rng, plan.doctors, plan.doctor_skew)),
+            "appointment_date": date,
+            "status": status,
+            "ai_diagnosis": "",
+            "notes": "",
+        }
+
+    if kind == "diagnosis":
+        when = after(rng, plan, patient_since)
+        symptoms = list(dict.fromkeys(rng.choices(SYMPTOMS, weights=range(len(SYMPTOMS), 0, -1), k=rng.randint(1, 4))))
+        primary = rng.choice(CONDITIONS)
+        return {
+            "_id": object_id(kind, index, when),
+            "diagnosed_user_id": parent_id(plan, "patient", patient),
+            "primary_diagnosis": primary,
+            "secondary_diagnoses": rng.sample(CONDITIONS, k=rng.randint(0, 2)),
+            "description": f"Patient presents with {', '.join(symptoms)} consistent with {primary}.",
+            "precautions": [],
+            "severity_assessment": rng.choices(SEVERITIES, weights=[50, 30, 15, 5])[0],
+            "initial_symptom": symptoms[0],
+            "additional_symptoms": symptoms[1:],
+            "days_experiencing": rng.randint(0, 30),
+            "confidence_level": rng.choice(["low", "medium", "high"]),
+            "symptoms": symptoms,
+            "created_at": when,
+        }
+
+    if kind == "treatment":
+        start = after(rng, plan, patient_since)
+        return {
+            "_id": object_id(kind, index, start),
+            "patient_id": parent_id(plan, "patient", patient),
+            "doctor_id": parent_id(plan, "doctor", skewed(rng, plan.doctors, plan.doctor_skew)),
+            "drug_id": parent_id(plan, "drug", skewed(rng, plan.drugs, 1)),
+            "dosage": f"{rng.choice([1, 1, 2])} tablet(s)",
+            "frequency": rng.choice(FREQUENCIES),
+            "start_date": start,
+            "end_date": start + timedelta(days=rng.choice([3, 5, 7, 14, 30, 90])),
+            "notes": None,
+        }
+
+    if kind == "review":
+        when = after(rng, plan, patient_since)
+        target_type = rng.choices(["doctor", "hospital", "clinic", "pharmacy", "drug"], weights=[70, 10, 10, 5, 5])[0]
+        if target_type == "doctor":
+            target = skewed(rng, plan.doctors, plan.doctor_skew)
+        else:
+            target = rng.randrange(plan.count(target_type))
+        return {
+            "_id": object_id(kind, index, when),
+            "target_type": target_type,
+            "target_id": parent_id(plan, target_type, target),
+            "user_id": parent_id(plan, "patient", patient),
+            "rating": float(rng.choices([1, 2, 3, 4, 5], weights=[5, 5, 15, 35, 40])[0]),
+            "comment": rng.choice(COMMENTS),
+            "created_at": when,
+        }
+
+    raise ValueError(f"Unknown kind {kind}")
+
+
+def inventory_for(plan: Plan, pharmacy: int) -> list[dict]:
+    """Stock of one pharmacy: about `plan.inventory` distinct drugs"""
+    rng = random.Random(f"{plan.seed}:inventory:{pharmacy}")
+    stocked = min(plan.drugs, max(1, int(rng.uniform(0.5, 1.5) * plan.inventory)))
+    pharmacy_id = parent_id(plan, "pharmacy", pharmacy)
+    return [
+        {
+            "_id": object_id("inventory", pharmacy * plan.drugs + drug, plan.start),
+            "drug_id": parent_id(plan, "drug", drug),
+            "pharmacy_id": pharmacy_id,
+            "quantity": rng.choices([0, rng.randint(1, 20), rng.randint(20, 500)], weights=[5, 25, 70])[0],
+            "price": round(rng.uniform(0.5, 60), 2),
+        }
+        for drug in sorted(rng.sample(range(plan.drugs), stocked))
+    ]
+
+
+_plan: Plan | None = None
+
+
+def set_plan(plan: Plan):
+    """Process pool initializer: the plan is sent to each worker once, not with every chunk"""
+    global _plan
+    _plan = plan
+
+
+def generate_chunk(kind: str, start: int, stop: int) -> list[bytes]:
+    """Generate documents [start, stop) of `kind`, BSON-encoded so the loader doesn't have to"""
+    if kind == "inventory":
+        return [encode(document) for pharmacy in range(start, stop) for document in inventory_for(_plan, pharmacy)]
+    rng = random.Random(f"{_plan.seed}:{kind}:{start}")
+    return [encode(generate(_plan, kind, index, rng)) for index in range(start, stop)]
+
+
+async def load(executor, collection, kind: str, total: int, args) -> int:
+    """Stream `total` documents of `kind` from the workers into `collection`.
+
+    At most `2 * workers` chunks are generated ahead of the loader and at most
+    `--insert-concurrency` batches are in flight, so memory stays flat at any
+    scale.
+    """
+    loop = asyncio.get_running_loop()
+    # * Inventory is generated per pharmacy, with about `--inventory` documents each
+    step = max(1, args.batch_size // args.inventory) if kind == "inventory" else args.batch_size
+    chunks = iter(range(0, total, step))
+    pending, inserts = deque(), set()
+    loaded, started = 0, perf_counter()
+
+    def submit():
+        start = next(chunks, None)
+        if start is not None:
+            pending.append(loop.run_in_executor(executor, generate_chunk, kind, start, min(start + step, total)))
+
+    async def insert(documents):
+        if not args.dry_run:
+            await collection.insert_many(documents, ordered=False)
+
+    for _ in range(2 * args.workers):
+        submit()
+    while pending:
+        chunk = await pending.popleft()
+        submit()
+        if len(inserts) >= args.insert_concurrency:
+            done, inserts = await asyncio.wait(inserts, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        inserts.add(asyncio.create_task(insert([RawBSONDocument(document) for document in chunk])))
+        loaded += len(chunk)
+        print(f"\r{kind:>12}: {loaded:,} documents ({loaded / (perf_counter() - started):,.0f}/s)", end="", flush=True)
+    for task in inserts:
+        await task
+    print()
+    return loaded
+
+
+async def write_ratings(model, target_type: str, batch_size: int) -> int:
+    """Set the rating aggregates of every `model` document from its reviews"""
+    groups = Review.get_motor_collection().aggregate([
+        {"$match": {"target_type": target_type}},
+        {"$group": {"_id": "$target_id", "sum": {"$sum": "$rating"}, "count": {"$sum": 1}}},
+    ])
+    parents = model.get_motor_collection()
+    updates, written = [], 0
+    async for group in groups:
+        updates.append(UpdateOne({"_id": ObjectId(group["_id"])}, {"$set": {
+            "rating_sum": group["sum"],
+            "rating_count": group["count"],
+            "rating_average": group["sum"] / group["count"],
+        }}))
+        if len(updates) >= batch_size:
+            written += (await parents.bulk_write(updates, ordered=False)).modified_count
+            updates = []
+    if updates:
+        written += (await parents.bulk_write(updates, ordered=False)).modified_count
+    return written
+
+
+async def run(args):
+    settings = get_settings()
+    as_of = datetime.combine(args.as_of, datetime.min.time()) if args.as_of else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    plan = Plan(
+        seed=args.seed, as_of=as_of, years=args.years,
+        hospitals=args.hospitals, clinics=args.clinics, pharmacies=args.pharmacies,
+        manufacturers=args.manufacturers, drugs=args.drugs, inventory=args.inventory,
+        doctors=args.doctors, patients=args.patients, appointments=args.appointments,
+        diagnoses=args.diagnoses, treatments=args.treatments, reviews=args.reviews,
+        doctor_skew=args.doctor_skew, patient_skew=args.patient_skew,
+        # * Hashing is deliberately slow, so every account shares one hash
+        password_hash=get_password_hash(args.password),
+    )
+
+    client = AsyncIOMotorClient(settings.database_connection_string)
+    database = client[args.database or f"{settings.database_name}_synthetic"]
+    document_models = [Hospital, Clinic, Pharmacy, DrugManufacturer, Drug, DrugInventory, Doctor, Patient, Appointment, Diagnosis, Treatment, Review]
+    # * Indexes are built once after loading, which is much faster than maintaining them during the load
+    await init_beanie(database=database, document_models=document_models, skip_indexes=True)
+
+    collections = [
+        ("hospital", Hospital, plan.hospitals), ("clinic", Clinic, plan.clinics), ("pharmacy", Pharmacy, plan.pharmacies),
+        ("manufacturer", DrugManufacturer, plan.manufacturers), ("drug", Drug, plan.drugs),
+        ("inventory", DrugInventory, plan.pharmacies), ("doctor", Doctor, plan.doctors), ("patient", Patient, plan.patients),
+        ("appointment", Appointment, plan.appointments), ("diagnosis", Diagnosis, plan.diagnoses),
+        ("treatment", Treatment, plan.treatments), ("review", Review, plan.reviews),
+    ]
+    if not args.dry_run:
+        for _, model, _ in collections:
+            collection = model.get_motor_collection()
+            if args.drop:
+                await collection.drop()
+            elif await collection.estimated_document_count():
+                print(f"{database.name}.{collection.name} is not empty; pass --drop to replace it")
+                client.close()
+                return
+
+    started = perf_counter()
+    total = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=set_plan, initargs=(plan,)) as executor:
+        for kind, model, count in collections:
+            total += await load(executor, model.get_motor_collection(), kind, count, args)
+    print(f"Generated {total:,} documents in {perf_counter() - started:.1f}s")
+
+    if not args.dry_run:
+        indexing = perf_counter()
+        await init_beanie(database=database, document_models=document_models)
+        print(f"Built indexes in {perf_counter() - indexing:.1f}s")
+
+        for parent, child, foreign_key, counter in [
+            (Patient, Appointment, "patient", "appointment_count"),
+            (Patient, Diagnosis, "diagnosed_user_id", "diagnosis_count"),
+            (Patient, Treatment, "patient_id", "treatment_count"),
+            (Doctor, Appointment, "doctor", "appointment_count"),
+        ]:
+            written = await write_counts(parent, child, foreign_key, counter, args.batch_size)
+            print(f"{parent.__name__}.{counter}: updated {written:,} documents")
+        for target_type, model in REVIEW_TARGETS.items():
+            print(f"{model.__name__} ratings: updated {await write_ratings(model, target_type, args.batch_size):,} documents")
+
+    print(f"Done in {perf_counter() - started:.1f}s")
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default=None, help="Target database name")
+    parser.add_argument("--hospitals", type=int, default=200)
+    parser.add_argument("--clinics", type=int, default=1_000)
+    parser.add_argument("--pharmacies", type=int, default=2_000)
+    parser.add_argument("--manufacturers", type=int, default=200)
+    parser.add_argument("--drugs", type=int, default=5_000)
+    parser.add_argument("--inventory", type=int, default=300, help="Average number of drugs stocked per pharmacy")
+    parser.add_argument("--doctors", type=int, default=10_000)
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--appointments", type=int, default=20_000_000)
+    parser.add_argument("--diagnoses", type=int, default=2_000_000)
+    parser.add_argument("--treatments", type=int, default=2_000_000)
+    parser.add_argument("--reviews", type=int, default=500_000)
+    parser.add_argument("--years", type=int, default=3, help="Years of history")
+    parser.add_argument("--as-of", type=datetime.fromisoformat, default=None, help="End of the history (default: today)")
+    parser.add_argument("--doctor-skew", type=float, default=0.5, help="Power-law exponent of doctor popularity")
+    parser.add_argument("--patient-skew", type=float, default=0.3, help="Power-law exponent of patient activity")
+    parser.add_argument("--password", default="Password123!", help="Password of every generated account")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Generator processes")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--insert-concurrency", type=int, default=4, help="insert_many calls in flight")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true", help="Drop the target collections first")
+    parser.add_argument("--dry-run", action="store_true", help="Generate without loading, to measure the generator")
+    args = parser.parse_args()
+    if min(args.hospitals + args.clinics, args.pharmacies, args.manufacturers, args.drugs, args.doctors, args.patients, args.inventory) < 1:
+        parser.error("facilities, pharmacies, manufacturers, drugs, doctors, patients and inventory must be at least 1")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
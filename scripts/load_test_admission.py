@@ -0,0 +1,120 @@
+"""Load test: GET latency during a login storm, with and without admission control.
+
+Usage (from the repository root):
+
+    python -m scripts.load_test_admission [--logins 2000] [--storm-concurrency 500] [--reads 300]
+
+Runs in-process against a small ASGI app that models the costs of the real
+routes: `/login` makes five sequential queries through a shared, bounded
+connection pool (standing in for the Motor pool) and spends `--bcrypt-ms` in
+the thread pool, while `GET /api/v1/doctors` makes one query. A login storm is
+fired while a steady stream of GETs measures latency, once without and once
+with `AdmissionMiddleware`. No MongoDB or Redis is needed.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from time import perf_counter
+
+import httpx
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+
+from middleware.admission import AdmissionController, AdmissionMiddleware
+
+
+def build_app(args, admission: bool) -> FastAPI:
+    app = FastAPI()
+    pool = asyncio.Semaphore(args.pool_size)
+
+    async def query(seconds: float):
+        async with pool:
+            await asyncio.sleep(seconds)
+
+    @app.post("/login")
+    async def login():
+        for _ in range(5):
+            await query(args.query_ms / 1000)
+        await run_in_threadpool(time.sleep, args.bcrypt_ms / 1000)
+        return {"message": "Login successful"}
+
+    @app.get("/api/v1/doctors")
+    async def doctors():
+        await query(args.query_ms / 1000)
+        return []
+
+    if admission:
+        app.add_middleware(AdmissionMiddleware, controller=AdmissionController())
+    return app
+
+
+async def scenario(args, admission: bool) -> dict:
+    app = build_app(args, admission)
+    transport = httpx.ASGITransport(app=app)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", limits=limits, timeout=None) as client:
+        storm_semaphore = asyncio.Semaphore(args.storm_concurrency)
+        login_statuses = []
+
+        async def login():
+            async with storm_semaphore:
+                response = await client.post("/login")
+                login_statuses.append(response.status_code)
+
+        async def reads() -> list[float]:
+            latencies = []
+            read_semaphore = asyncio.Semaphore(args.read_concurrency)
+
+            async def read():
+                async with read_semaphore:
+                    started = perf_counter()
+                    response = await client.get("/api/v1/doctors")
+                    if response.status_code == 200:
+                        latencies.append((perf_counter() - started) * 1000)
+
+            # * Let the storm build up before measuring
+            await asyncio.sleep(0.2)
+            await asyncio.gather(*(read() for _ in range(args.reads)))
+            return latencies
+
+        storm = asyncio.gather(*(login() for _ in range(args.logins)))
+        latencies = await reads()
+        await storm
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "p50": quantiles[49],
+        "p99": quantiles[98],
+        "reads_ok": len(latencies),
+        "logins_ok": login_statuses.count(200),
+        "logins_shed": login_statuses.count(503),
+    }
+
+
+async def run(args):
+    for admission in (False, True):
+        result = await scenario(args, admission)
+        print(
+            f"{'with' if admission else 'without':>7} admission control: "
+            f"GET p50={result['p50']:.1f}ms p99={result['p99']:.1f}ms ({result['reads_ok']} ok), "
+            f"logins ok={result['logins_ok']} shed={result['logins_shed']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=2000)
+    parser.add_argument("--storm-concurrency", type=int, default=500)
+    parser.add_argument("--reads", type=int, default=300)
+    parser.add_argument("--read-concurrency", type=int, default=5)
+    parser.add_argument("--pool-size", type=int, default=20, help="Size of the simulated connection pool")
+    parser.add_argument("--query-ms", type=float, default=5)
+    parser.add_argument("--bcrypt-ms", type=float, default=50)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
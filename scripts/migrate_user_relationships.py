@@ -0,0 +1,179 @@
+"""Move the unbounded relationship arrays out of patient and doctor documents.
+
+Usage (from the repository root):
+
+    python -m scripts.migrate_user_relationships [--batch-size 1000]
+
+1. Recomputes `appointment_count`, `diagnosis_count` and `treatment_count` on
+   patients and `appointment_count` on doctors from the child collections,
+   which already hold the foreign keys.
+2. Copies every embedded doctor, facility and drug review into the `Review`
+   collection and sets `rating_sum` / `rating_count` / `rating_average`,
+   removing the embedded reviews in the same step. Documents without a
+   `rating_average` get one computed from their sum and count (zero if never
+   reviewed).
+3. Unsets the `appointments`, `diagnoses` and `treatments` ID arrays.
+
+Counters are always recomputed from the source of truth, so the script can be
+run again safely; each document's reviews are removed as soon as they are
+copied, and copies get deterministic IDs so an interrupted copy is not repeated.
+"""
+
+import argparse
+import asyncio
+import hashlib
+from datetime import datetime
+
+from beanie import PydanticObjectId, init_beanie
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from models.appointment import Appointment
+from models.diagnosis import Diagnosis
+from models.review import Review
+from models.treatment import Treatment
+from models.users import Patient, Doctor
+from utils.reviews import REVIEW_TARGETS, rating_update
+from utils.settings import get_settings
+
+
+DUPLICATE_KEY = 11000
+
+
+async def write_counts(parent, child, foreign_key: str, counter: str, batch_size: int) -> int:
+    """Set `counter` on every `parent` to the number of `child` documents referencing it.
+
+    Each parent is `$set` to its own count, and only the parents left out of the
+    counts are zeroed afterwards, so an `$inc` made by a request while the script
+    runs is not wiped by a blanket reset first.
+    """
+    parents = parent.get_motor_collection()
+    counted = set()
+    updates, written = [], 0
+
+    async def flush():
+        nonlocal updates, written
+        if updates:
+            written += (await parents.bulk_write(updates, ordered=False)).modified_count
+            updates = []
+
+    groups = child.get_motor_collection().aggregate([{"$group": {"_id": f"${foreign_key}", "total": {"$sum": 1}}}])
+    async for group in groups:
+        if not group["_id"] or not PydanticObjectId.is_valid(group["_id"]):
+            continue
+        parent_id = PydanticObjectId(group["_id"])
+        counted.add(parent_id)
+        updates.append(UpdateOne({"_id": parent_id}, {"$set": {counter: group["total"]}}))
+        if len(updates) >= batch_size:
+            await flush()
+    await flush()
+
+    # * Scanned rather than one `_id: {"$nin": ...}`, which would outgrow the 16MB command limit
+    async for document in parents.find({counter: {"$ne": 0}}, {"_id": 1}):
+        if document["_id"] not in counted:
+            updates.append(UpdateOne({"_id": document["_id"], counter: {"$ne": 0}}, {"$set": {counter: 0}}))
+            if len(updates) >= batch_size:
+                await flush()
+    await flush()
+    return written
+
+
+def migrated_review_id(target_type: str, parent_id: ObjectId, index: int) -> ObjectId:
+    """Deterministic ID of the `index`-th embedded review of a parent.
+
+    The parent's timestamp keeps migrated reviews older than new ones, a hash of
+    the target tells parents apart, and the index keeps the embedded order.
+    """
+    target = hashlib.sha256(f"{target_type}:{parent_id}".encode()).digest()[:5]
+    return ObjectId(parent_id.binary[:4] + target + index.to_bytes(3, "big"))
+
+
+async def move_embedded_reviews(model, target_type: str) -> int:
+    """Copy embedded reviews into the Review collection and fold them into the rating counters.
+
+    Copied reviews get deterministic IDs, so if the script stops between the
+    copy and the parent update, the next run skips the reviews already copied.
+    """
+    parents = model.get_motor_collection()
+    reviews = Review.get_motor_collection()
+    moved = 0
+
+    async for parent in parents.find({"reviews": {"$exists": True}}, {"reviews": 1}):
+        embedded = parent.get("reviews") or []
+        if embedded:
+            migrated_at = datetime.now()
+            try:
+                await reviews.insert_many([
+                    {
+                        "_id": migrated_review_id(target_type, parent["_id"], index),
+                        "target_type": target_type,
+                        "target_id": str(parent["_id"]),
+                        "user_id": review["user_id"],
+                        "rating": review["rating"],
+                        "comment": review["comment"],
+                        "created_at": migrated_at,
+                    }
+                    for index, review in enumerate(embedded)
+                ], ordered=False)
+            except BulkWriteError as e:
+                if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+                    raise
+
+        await parents.update_one(
+            {"_id": parent["_id"]},
+            [
+                *rating_update(sum(review["rating"] for review in embedded), len(embedded)),
+                {"$unset": "reviews"},
+            ],
+        )
+        moved += len(embedded)
+    return moved
+
+
+async def run(args):
+    settings = get_settings()
+    client = AsyncIOMotorClient(settings.database_connection_string)
+    await init_beanie(
+        database=client[settings.database_name],
+        document_models=[Patient, *REVIEW_TARGETS.values(), Appointment, Diagnosis, Treatment, Review],
+    )
+
+    for parent, child, foreign_key, counter in [
+        (Patient, Appointment, "patient", "appointment_count"),
+        (Patient, Diagnosis, "diagnosed_user_id", "diagnosis_count"),
+        (Patient, Treatment, "patient_id", "treatment_count"),
+        (Doctor, Appointment, "doctor", "appointment_count"),
+    ]:
+        written = await write_counts(parent, child, foreign_key, counter, args.batch_size)
+        print(f"{parent.__name__}.{counter}: updated {written:,} documents")
+
+    for target_type, model in REVIEW_TARGETS.items():
+        print(f"Moved {await move_embedded_reviews(model, target_type):,} {target_type} reviews")
+        # * Adding no ratings fills in the missing fields from the existing sum and count (zero if
+        # * never reviewed), so indexed sorts on rating_average see every document
+        result = await model.get_motor_collection().update_many(
+            {"rating_average": {"$exists": False}},
+            rating_update(0, 0),
+        )
+        print(f"Completed the ratings of {result.modified_count:,} {target_type} documents")
+
+    result = await Patient.get_motor_collection().update_many(
+        {}, {"$unset": {"appointments": "", "diagnoses": "", "treatments": ""}}
+    )
+    print(f"Removed ID arrays from {result.modified_count:,} patients")
+    result = await Doctor.get_motor_collection().update_many({}, {"$unset": {"appointments": ""}})
+    print(f"Removed ID arrays from {result.modified_count:,} doctors")
+
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Report where the application spends its cold-start time.
+
+Usage (from the repository root):
+
+    python -m scripts.profile_startup [--top 25] [--lifespan] [--budget-ms 1500]
+
+The import of `main` is measured in a fresh interpreter with `-X importtime`,
+so the numbers reflect a real cold start. With `--lifespan` the lifespan
+start-up steps are also run and timed (MongoDB and Redis must be reachable).
+With `--budget-ms` the script exits with a non-zero status when the cold import
+exceeds the budget, which makes it usable as a CI gate.
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def profile_imports(module: str = "main") -> tuple[float, list[tuple[str, int, int]]]:
+    """Import `module` in a fresh interpreter and collect per-module import times.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        **tuple[float, list[tuple[str, int, int]]]**: The wall time of the import in
+        milliseconds and a list of `(module, self_us, cumulative_us)` entries.
+    """
+    code = f"import time; s = time.perf_counter(); import {module}; print((time.perf_counter() - s) * 1000)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    return float(result.stdout.strip().splitlines()[-1]), entries
+
+
+async def profile_lifespan():
+    """Run the application lifespan start-up and return its step timings"""
+    sys.path.insert(0, str(ROOT))
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        return app.state.startup_profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("--top", type=int, default=25, help="Number of slowest modules to show")
+    parser.add_argument("--lifespan", action="store_true", help="Also time the lifespan start-up steps")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if the cold import exceeds this budget")
+    args = parser.parse_args()
+
+    import_ms, entries = profile_imports(args.module)
+
+    print(f"Cold import of '{args.module}': {import_ms:.1f}ms ({len(entries)} modules)\n")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for name, self_us, cumulative_us in sorted(entries, key=lambda e: e[2], reverse=True)[: args.top]:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name}")
+
+    if args.lifespan:
+        started = perf_counter()
+        profile = asyncio.run(profile_lifespan())
+        print(f"\nLifespan start-up ({(perf_counter() - started) * 1000:.1f}ms wall):")
+        for name, duration in profile.steps:
+            print(f"{duration:>10.1f}ms  {name}")
+
+    if args.budget_ms is not None and import_ms > args.budget_ms:
+        print(f"\nCold import exceeded the budget: {import_ms:.1f}ms > {args.budget_ms:.1f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Rebuild the diagnosis analytics rollups from scratch.
+
+Usage (from the repository root):
+
+    python -m scripts.rebuild_rollups
+"""
+
+import asyncio
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from models.analytics import DiagnosisRollup
+from models.archive import ArchivedDiagnosis
+from models.diagnosis import Diagnosis
+from utils.analytics import rebuild_diagnosis_rollups
+from utils.settings import get_settings
+
+
+async def run():
+    settings = get_settings()
+    client = AsyncIOMotorClient(settings.database_connection_string)
+    await init_beanie(database=client[settings.database_name], document_models=[Diagnosis, ArchivedDiagnosis, DiagnosisRollup])
+
+    await rebuild_diagnosis_rollups()
+    print(f"Rebuilt {await DiagnosisRollup.count():,} rollup buckets")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
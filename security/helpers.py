@@ -1,14 +1,14 @@
-import os
 from datetime import datetime, timedelta, timezone
 
-from fastapi import Depends, HTTPException, status, Security
+from fastapi import Depends, HTTPException, status, Security, Query, WebSocketException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import (
     OAuth2PasswordBearer,
     SecurityScopes,
 )
 
 from jose import jwt
-from jose.exceptions import ExpiredSignatureError
+from jose.exceptions import ExpiredSignatureError, JWTError
 
 from .schema import TokenData
 
@@ -19,9 +19,7 @@ from typing import Annotated
 
 from models.users import Patient, Doctor, Nurse, Admin, Pharmacist
 
-from dotenv import load_dotenv
-
-load_dotenv()
+from utils.settings import get_settings
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -35,6 +33,7 @@ oauth2_scheme = OAuth2PasswordBearer(
         "get-patients": "Get all patients information",
         "get-doctor": "Get doctor information",
         "get-appointment": "Get appointment information",
+        "manage-inventory": "Dispense and restock pharmacy inventory",
     },
 )
 
@@ -74,7 +73,8 @@ async def authenticate_user(username: str, password: str):
 
     if not user:
         return False
-    if not verify_password(password, user.password):
+    # * bcrypt is CPU-bound; verify in the thread pool so the event loop keeps serving other requests
+    if not await run_in_threadpool(verify_password, password, user.password):
         return False
     return user
 
@@ -86,7 +86,7 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, os.getenv("SECRET_KEY"), algorithm="HS256")
+    encoded_jwt = jwt.encode(to_encode, get_settings().secret_key, algorithm="HS256")
     return encoded_jwt
 
 
@@ -105,7 +105,7 @@ async def get_current_user(
         headers={"WWW-Authenticate": authenticate_value},
     )
     try:
-        payload = jwt.decode(token, os.getenv("SECRET_KEY"), algorithms="HS256")
+        payload = jwt.decode(token, get_settings().secret_key, algorithms="HS256")
         username = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -143,4 +143,18 @@ async def get_current_active_user(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User is inactive"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+async def get_current_websocket_user(
+    token: Annotated[str, Query(description="Access token (browsers cannot send headers when opening a WebSocket)")],
+):
+    """Authenticates a WebSocket connection from its `token` query parameter"""
+    try:
+        user = await get_current_user(SecurityScopes(scopes=["me"]), token)
+    except (HTTPException, JWTError):
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
+
+    if user is None or not user.active:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION)
+    return user
@@ -0,0 +1,109 @@
+"""
+Incrementally maintained diagnosis analytics.
+
+Every new diagnosis increments exactly one `DiagnosisRollup` bucket (day,
+severity, condition) with an atomic upsert, so dashboards read a number of
+documents proportional to the buckets they cover, never the diagnoses.
+"""
+
+from datetime import datetime
+
+from models.analytics import DiagnosisRollup
+from models.archive import ArchivedDiagnosis
+from models.diagnosis import Diagnosis
+
+from .api_logger import logger
+
+
+ROLLUP_DIMENSIONS = ("day", "severity", "condition")
+
+
+def rollup_key(diagnosis: Diagnosis) -> dict:
+    """Return the rollup bucket a diagnosis counts towards"""
+    return {
+        "day": datetime.combine(diagnosis.created_at.date(), datetime.min.time()),
+        "severity": diagnosis.severity_assessment.strip().lower(),
+        "condition": diagnosis.primary_diagnosis.strip().lower(),
+    }
+
+
+async def record_diagnosis(diagnosis: Diagnosis):
+    """Count a newly created diagnosis in its rollup bucket.
+
+    Failures are logged and swallowed: the diagnosis itself has already been
+    stored, and `rebuild_diagnosis_rollups` can restore exact counts.
+
+    Args:
+        diagnosis (Diagnosis): The diagnosis that was just created.
+    """
+    try:
+        await DiagnosisRollup.get_motor_collection().update_one(
+            rollup_key(diagnosis), {"$inc": {"total": 1}}, upsert=True
+        )
+    except Exception as e:
+        logger.error(f"Failed to update diagnosis rollup for {diagnosis.id}: {e}")
+
+
+async def rebuild_diagnosis_rollups():
+    """Rebuild every rollup bucket from the `Diagnosis` collection and its archive.
+
+    The whole computation runs server-side and `$out` atomically replaces the
+    rollup collection (keeping its indexes) once it completes. Diagnoses created
+    while the rebuild is running may be missing from the result.
+    """
+    pipeline = [
+        {"$unionWith": {"coll": ArchivedDiagnosis.get_motor_collection().name}},
+        {"$group": {
+            "_id": {
+                "day": {"$dateTrunc": {"date": {"$ifNull": ["$created_at", {"$toDate": "$_id"}]}, "unit": "day"}},
+                "severity": {"$toLower": {"$trim": {"input": "$severity_assessment"}}},
+                "condition": {"$toLower": {"$trim": {"input": "$primary_diagnosis"}}},
+            },
+            "total": {"$sum": 1},
+        }},
+        {"$project": {"_id": 0, "day": "$_id.day", "severity": "$_id.severity", "condition": "$_id.condition", "total": 1}},
+        {"$out": DiagnosisRollup.get_motor_collection().name},
+    ]
+    await Diagnosis.aggregate(pipeline, allowDiskUse=True).to_list()
+    logger.info("Diagnosis rollups rebuilt")
+
+
+async def diagnosis_counts(
+    start: datetime | None,
+    end: datetime | None,
+    group_by: list[str],
+    severity: str | None = None,
+    condition: str | None = None,
+) -> list[dict]:
+    """Sum the rollup buckets in a date range, grouped by the requested dimensions.
+
+    Args:
+        start (datetime | None): Inclusive start day.
+        end (datetime | None): Exclusive end day.
+        group_by (list[str]): Dimensions from `ROLLUP_DIMENSIONS` to group by.
+        severity (str | None): Only count this severity.
+        condition (str | None): Only count this condition.
+
+    Returns:
+        **list[dict]**: One entry per group with the dimension values and `count`.
+    """
+    match = {}
+    if start or end:
+        match["day"] = {}
+        if start:
+            match["day"]["$gte"] = start
+        if end:
+            match["day"]["$lt"] = end
+    if severity:
+        match["severity"] = severity.strip().lower()
+    if condition:
+        match["condition"] = condition.strip().lower()
+
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": {dimension: f"${dimension}" for dimension in group_by} or None, "count": {"$sum": "$total"}}},
+        {"$sort": {f"_id.{dimension}": 1 for dimension in group_by} or {"count": -1}},
+    ]
+    groups = await DiagnosisRollup.aggregate(pipeline).to_list()
+
+    return [{**(group["_id"] or {}), "count": group["count"]} for group in groups]
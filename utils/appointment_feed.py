@@ -0,0 +1,173 @@
+"""
+Live appointment feed driven by a MongoDB change stream.
+
+Each worker runs a single change-stream watcher on the `Appointment`
+collection and fans every insert or update out to the connections subscribed
+to the appointment's doctor or patient. Change streams need a replica set; a
+single-node replica set is enough for local development.
+
+Every event is identified by its change-stream resume token. The worker keeps
+the most recent events in memory, so a client that reconnects with the last
+event ID it received gets the events it missed replayed. If that ID is no
+longer buffered, the client is sent a `reset` event and should reload through
+the REST API.
+
+Every connection has a bounded queue. A consumer that falls that far behind is
+sent a `reset` event and disconnected instead of slowing down the watcher.
+"""
+
+import asyncio
+from collections import defaultdict, deque
+
+from pymongo.errors import OperationFailure
+
+from models.appointment import Appointment
+from schema.responses.appointment import AppointmentInDB
+
+from .api_logger import logger
+from .settings import get_settings
+
+
+RESET = {"type": "reset"}
+
+CHANGE_STREAM_HISTORY_LOST = 286
+
+OPERATION_TYPES = {"insert": "created", "update": "updated", "replace": "updated"}
+
+
+class FeedSubscription:
+    """The bounded queue of events for one connection"""
+
+    def __init__(self, topics: set[tuple[str, str]], queue_size: int):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def push(self, event: dict):
+        """Queue an event, or replace the backlog with a reset if the consumer is too slow"""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET)
+
+    async def next_event(self, timeout: float) -> dict | None:
+        """Return the next event, or None if nothing arrived within `timeout` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class AppointmentFeed:
+    """Watches the appointment collection and fans changes out to subscribers"""
+
+    def __init__(self):
+        self._subscribers: dict[tuple[str, str], set[FeedSubscription]] = defaultdict(set)
+        self._history: deque = deque(maxlen=get_settings().feed_history_size)
+        self._resume_token: dict | None = None
+        self._watcher: asyncio.Task | None = None
+
+    def start(self):
+        """Start this worker's change-stream watcher. Called once from the application lifespan."""
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def close(self):
+        """Stop the watcher"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+    def subscribe(self, topics: set[tuple[str, str]], last_event_id: str | None = None) -> FeedSubscription:
+        """Subscribe to the appointments of the given doctors and/or patients.
+
+        Args:
+            topics (set[tuple[str, str]]): `("doctor", doctor_id)` and/or `("patient", patient_id)` pairs.
+            last_event_id (str | None): The last event ID the client received, to replay missed events.
+
+        Returns:
+            **FeedSubscription**: The subscription; pass it to `unsubscribe` when the connection closes.
+        """
+        subscription = FeedSubscription(topics, get_settings().feed_queue_size)
+
+        if last_event_id:
+            event_ids = [event_id for event_id, _, _ in self._history]
+            if last_event_id in event_ids:
+                for _, event_topics, event in list(self._history)[event_ids.index(last_event_id) + 1:]:
+                    if event_topics & topics:
+                        subscription.push(event)
+            else:
+                subscription.push(RESET)
+
+        for topic in topics:
+            self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: FeedSubscription):
+        for topic in subscription.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def publish(self, event_id: str, topics: set[tuple[str, str]], event: dict):
+        """Record an event and queue it for every subscriber of its topics"""
+        self._history.append((event_id, topics, event))
+
+        recipients = set()
+        for topic in topics:
+            recipients.update(self._subscribers.get(topic, ()))
+        for subscription in recipients:
+            subscription.push(event)
+
+    @staticmethod
+    def _event(change: dict) -> tuple[str, set[tuple[str, str]], dict] | None:
+        document = change.get("fullDocument")
+        if document is None:
+            return None
+
+        event_id = change["_id"]["_data"]
+        appointment = AppointmentInDB(**Appointment.model_validate(document).model_dump())
+        topics = {("doctor", appointment.doctor), ("patient", appointment.patient)}
+        return event_id, topics, {
+            "id": event_id,
+            "type": OPERATION_TYPES[change["operationType"]],
+            "appointment": appointment.model_dump(mode="json", by_alias=True),
+        }
+
+    async def _watch(self):
+        pipeline = [{"$match": {"operationType": {"$in": list(OPERATION_TYPES)}}}]
+        while True:
+            try:
+                async with Appointment.get_motor_collection().watch(
+                    pipeline,
+                    full_document="updateLookup",
+                    resume_after=self._resume_token,
+                ) as stream:
+                    async for change in stream:
+                        self._resume_token = change["_id"]
+                        event = self._event(change)
+                        if event is not None:
+                            self.publish(*event)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAM_HISTORY_LOST:
+                    self._resume_token = None
+                logger.error(f"Appointment change stream failed: {e}")
+                await asyncio.sleep(get_settings().feed_retry_seconds)
+            except Exception as e:
+                logger.error(f"Appointment change stream failed: {e}")
+                await asyncio.sleep(get_settings().feed_retry_seconds)
+
+
+appointment_feed = AppointmentFeed()
@@ -1,8 +1,10 @@
 """
-Background tasks for the application.
+Background jobs of the application, run by `worker.py` through the job queue.
 """
 
-from .notification import send_sms_notification
+from .notification import send_bulk_sms_notifications
+from .jobs import job_handler
+from .tiering import archive_cold_records
 
 from .api_logger import logger
 
@@ -10,24 +12,29 @@ from models.appointment import Appointment
 from models.users import Patient, Doctor
 from beanie import PydanticObjectId
 
-async def notify_appointment_creation(appointment: Appointment):
+
+@job_handler("notify_appointment_creation")
+async def notify_appointment_creation(appointment_id: str):
     """Notify patient and doctor about the appointment creation via SMS.
 
     Args:
-        patient_id (str): The patient's ID.
-        doctor_id (str): The doctor's ID.
         appointment_id (str): The appointment ID.
     """
-    patient_in_db = await Patient.get(PydanticObjectId(appointment.patient))
-    doctor_in_db = await Doctor.get(PydanticObjectId(appointment.doctor))
-    appointment_in_db = await Appointment.get(PydanticObjectId(appointment.id))
+    appointment_in_db = await Appointment.get(PydanticObjectId(appointment_id))
+
+    if not appointment_in_db:
+        logger.error(f"Appointment with ID {appointment_id} not found.")
+        return
+
+    patient_in_db = await Patient.get(PydanticObjectId(appointment_in_db.patient))
+    doctor_in_db = await Doctor.get(PydanticObjectId(appointment_in_db.doctor))
 
     if not patient_in_db:
-        logger.error(f"Patient with ID {appointment.patient} not found.")
+        logger.error(f"Patient with ID {appointment_in_db.patient} not found.")
         return
 
-    if not appointment_in_db:
-        logger.error(f"Appointment with ID {appointment.id} not found.")
+    if not doctor_in_db:
+        logger.error(f"Doctor with ID {appointment_in_db.doctor} not found.")
         return
 
     patient_message = f"Your appointment has been scheduled for {appointment_in_db.appointment_date} with {doctor_in_db.first_name} {doctor_in_db.last_name}. Appointment ID: {appointment_in_db.id}"
@@ -36,5 +43,19 @@ async def notify_appointment_creation(appointment: Appointment):
     You have a new appointment scheduled for {appointment_in_db.appointment_date} with patient {patient_in_db.first_name} {patient_in_db.last_name}. Appointment ID: {appointment_in_db.id}
     """
 
-    send_sms_notification(to=patient_in_db.contact_info.phone, message=patient_message)
-    send_sms_notification(to=doctor_in_db.contact_info.phone, message=doctor_message)
\ No newline at end of file
+    messages = [
+        (patient_in_db.contact_info.phone, patient_message),
+        (doctor_in_db.contact_info.phone, doctor_message),
+    ]
+    sent = await send_bulk_sms_notifications(messages)
+
+    # * Failed sends are only logged, so raise to have the job retried (and dead-lettered in the end).
+    # * Delivery is at least once: a retry also resends the message that did go out.
+    if sent < len(messages):
+        raise RuntimeError(f"Sent {sent}/{len(messages)} notifications of appointment {appointment_id}")
+
+
+@job_handler("archive_cold_records")
+async def archive_old_records():
+    """Move records older than the archive horizons to the archive collections"""
+    await archive_cold_records()
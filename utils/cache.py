@@ -0,0 +1,393 @@
+"""
+Caches for rarely changing reference data.
+
+`TTLCache` is a plain in-process LRU. `ReferenceCache` builds a two-level cache
+on top of it: a worker-local L1 that keeps serving entries for a while after
+they go stale (refreshing them in the background), in front of an optional
+Redis L2 shared by every worker. Invalidations are broadcast over Redis pub/sub
+by `cache_bus`, so every worker drops the entry within milliseconds.
+"""
+
+import asyncio
+import json
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Awaitable, Callable, Hashable
+from uuid import uuid4
+
+from pydantic import TypeAdapter
+
+from .api_logger import logger
+from .settings import get_settings
+
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+L2_KEY_PREFIX = "cache:"
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire `ttl_seconds` after they are set.
+
+    With `stale_seconds`, expired entries are kept that much longer so `lookup`
+    can still return them, flagged as stale.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300, stale_seconds: float = 0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def lookup(self, key: Hashable) -> tuple[Any, bool] | None:
+        """Return `(value, fresh)` for `key`, or None if it is missing or past its stale window"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        fresh_until, value = entry
+        now = monotonic()
+        if fresh_until + self.stale_seconds <= now:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value, fresh_until > now
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for `key`, or `default` if it is missing or expired"""
+        entry = self.lookup(key)
+        if entry is None or not entry[1]:
+            return default
+        return entry[0]
+
+    def get_many(self, keys) -> dict:
+        """Return the cached values of those `keys` that are present"""
+        found = {}
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                found[key] = value
+        return found
+
+    def set(self, key: Hashable, value: Any):
+        """Cache `value` under `key`, evicting the least recently used entry if full"""
+        self._entries[key] = (monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Remove `key` from the cache"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry from the cache"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ReferenceCache:
+    """Worker-local L1 cache with stale-while-revalidate in front of an optional Redis L2.
+
+    Values are loaded in batches by the `load_many` callable passed to `get_many`
+    (or by `load` for `get`). Concurrent misses for the same key share one load.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        value_type: Any,
+        max_size: int = 1024,
+        ttl_seconds: float = 60,
+        stale_seconds: float = 300,
+        l2_ttl_seconds: int | None = 300,
+    ):
+        """
+        Args:
+            name (str): Unique name, used in Redis keys and invalidation messages.
+            value_type (Any): The type of the cached values, used to (de)serialize L2 entries.
+            max_size (int): Maximum number of L1 entries.
+            ttl_seconds (float): How long an L1 entry is fresh.
+            stale_seconds (float): How long a stale L1 entry is still served while it is refreshed.
+            l2_ttl_seconds (int | None): TTL of the Redis entries, or None to disable the L2.
+        """
+        self.name = name
+        self.l2_ttl_seconds = l2_ttl_seconds
+        self._adapter = TypeAdapter(value_type)
+        self._l1 = TTLCache(max_size, ttl_seconds, stale_seconds)
+        self._generation = 0
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._refreshing: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = {"hits": 0, "staleHits": 0, "l2Hits": 0, "misses": 0}
+        cache_bus.register(self)
+
+    @property
+    def _l2(self):
+        if self.l2_ttl_seconds is None or not get_settings().cache_l2_enabled:
+            return None
+        return cache_bus.redis
+
+    def _l2_key(self, key: str) -> str:
+        return f"{L2_KEY_PREFIX}{self.name}:{key}"
+
+    async def get(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the value for `key`, calling `load` on a miss. None values are not cached."""
+
+        async def load_one(keys: list[str]) -> dict:
+            value = await load()
+            return {} if value is None else {key: value}
+
+        return (await self.get_many([key], load_one)).get(key)
+
+    async def get_many(self, keys, load_many: Callable[[list[str]], Awaitable[dict]]) -> dict:
+        """Return the values for `keys`, loading the missing ones with one `load_many` call.
+
+        Args:
+            keys (Iterable[str]): The keys to look up.
+            load_many (Callable[[list[str]], Awaitable[dict]]): Loads many keys from
+                the source of truth and returns the found values keyed by key.
+
+        Returns:
+            **dict**: The found values keyed by key. Unknown keys are omitted.
+        """
+        found, stale, missing = {}, [], []
+        for key in dict.fromkeys(keys):
+            entry = self._l1.lookup(key)
+            if entry is None:
+                missing.append(key)
+                continue
+
+            found[key], fresh = entry
+            if fresh:
+                self.stats["hits"] += 1
+            else:
+                self.stats["staleHits"] += 1
+                stale.append(key)
+
+        if stale:
+            self._revalidate(stale, load_many)
+        if missing:
+            found.update(await self._fill(missing, load_many))
+        return found
+
+    async def _fill(self, keys: list[str], load_many) -> dict:
+        """Load missing keys, sharing loads that are already in flight"""
+        waiting = {key: self._inflight[key] for key in keys if key in self._inflight}
+        owned = [key for key in keys if key not in waiting]
+        found = {}
+
+        if owned:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in owned}
+            self._inflight.update(futures)
+            try:
+                loaded = await self._load(owned, load_many)
+            except Exception as e:
+                for future in futures.values():
+                    future.set_exception(e)
+                    future.exception()  # * Mark as retrieved in case nobody else is waiting
+                raise
+            else:
+                for key, future in futures.items():
+                    future.set_result(loaded.get(key))
+                found.update(loaded)
+            finally:
+                for key in owned:
+                    self._inflight.pop(key, None)
+
+        for key, future in waiting.items():
+            value = await future
+            if value is not None:
+                found[key] = value
+        return found
+
+    async def _load(self, keys: list[str], load_many) -> dict:
+        """Read keys from the L2, then from the source of truth, and store them"""
+        generation = self._generation
+        found = {}
+        redis = self._l2
+
+        if redis is not None:
+            try:
+                for key, raw in zip(keys, await redis.mget([self._l2_key(key) for key in keys])):
+                    if raw is not None:
+                        found[key] = self._adapter.validate_json(raw)
+            except Exception as e:
+                logger.error(f"Reading cache {self.name} from Redis failed: {e}")
+            self.stats["l2Hits"] += len(found)
+
+        remaining = [key for key in keys if key not in found]
+        if remaining:
+            self.stats["misses"] += len(remaining)
+            loaded = await load_many(remaining)
+            await self._store_l2(loaded)
+            found.update(loaded)
+
+        # * Drop results that raced with an invalidation
+        if generation == self._generation:
+            for key, value in found.items():
+                self._l1.set(key, value)
+        return found
+
+    async def _store_l2(self, values: dict):
+        redis = self._l2
+        if redis is None or not values:
+            return
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, value in values.items():
+                    pipe.set(self._l2_key(key), self._adapter.dump_json(value), ex=self.l2_ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Writing cache {self.name} to Redis failed: {e}")
+
+    def _revalidate(self, keys: list[str], load_many):
+        """Refresh stale keys in the background, at most one refresh per key at a time"""
+        keys = [key for key in keys if key not in self._refreshing]
+        if not keys:
+            return
+        self._refreshing.update(keys)
+        task = asyncio.create_task(self._refresh(keys, load_many))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, keys: list[str], load_many):
+        generation = self._generation
+        try:
+            loaded = await load_many(keys)
+            await self._store_l2(loaded)
+            if generation == self._generation:
+                for key, value in loaded.items():
+                    self._l1.set(key, value)
+        except Exception as e:
+            logger.error(f"Refreshing cache {self.name} failed: {e}")
+        finally:
+            self._refreshing.difference_update(keys)
+
+    def drop(self, keys: list[str] | None = None):
+        """Drop keys (or everything, if None) from this worker's L1 only"""
+        self._generation += 1
+        if keys is None:
+            self._l1.clear()
+        else:
+            for key in keys:
+                self._l1.invalidate(key)
+
+    async def invalidate(self, *keys: str):
+        """Remove keys from the L1 of every worker and from the L2"""
+        self.drop(list(keys))
+        redis = self._l2
+        if redis is not None and keys:
+            try:
+                await redis.delete(*(self._l2_key(key) for key in keys))
+            except Exception as e:
+                logger.error(f"Deleting cache {self.name} entries from Redis failed: {e}")
+        await cache_bus.publish(self.name, list(keys))
+
+    async def clear(self):
+        """Remove every entry from the L1 of every worker and from the L2"""
+        self.drop()
+        redis = self._l2
+        if redis is not None:
+            try:
+                stale_keys = [key async for key in redis.scan_iter(match=self._l2_key("*"), count=500)]
+                if stale_keys:
+                    await redis.delete(*stale_keys)
+            except Exception as e:
+                logger.error(f"Clearing cache {self.name} in Redis failed: {e}")
+        await cache_bus.publish(self.name, None)
+
+    def metrics(self) -> dict:
+        """Return this worker's hit counters and hit ratio for the cache"""
+        lookups = sum(self.stats.values())
+        served = self.stats["hits"] + self.stats["staleHits"] + self.stats["l2Hits"]
+        return {
+            **self.stats,
+            "size": len(self._l1),
+            "hitRatio": round(served / lookups, 4) if lookups else None,
+        }
+
+
+class CacheBus:
+    """Connects the reference caches to Redis and relays invalidations between workers"""
+
+    def __init__(self):
+        self.redis = None
+        self.worker_id = uuid4().hex
+        self._caches: dict[str, ReferenceCache] = {}
+        self._listener: asyncio.Task | None = None
+
+    def register(self, cache: ReferenceCache):
+        self._caches[cache.name] = cache
+
+    @property
+    def caches(self) -> dict[str, ReferenceCache]:
+        return dict(self._caches)
+
+    def init(self, redis_connection):
+        """Bind the caches to a Redis connection and start listening for invalidations.
+        Called once from the application lifespan.
+
+        Args:
+            redis_connection (redis.asyncio.Redis): The Redis connection to use.
+        """
+        self.redis = redis_connection
+        self._listener = asyncio.create_task(self._listen())
+
+    async def close(self):
+        """Stop listening for invalidations"""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def publish(self, name: str, keys: list[str] | None):
+        """Tell the other workers to drop keys (or everything, if None) from a cache"""
+        if self.redis is None:
+            return
+        message = json.dumps({"origin": self.worker_id, "cache": name, "keys": keys})
+        try:
+            await self.redis.publish(INVALIDATION_CHANNEL, message)
+        except Exception as e:
+            logger.error(f"Publishing invalidation of cache {name} failed: {e}")
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    # * Messages may have been missed while disconnected
+                    for cache in self._caches.values():
+                        cache.drop()
+
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._apply(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener disconnected: {e}")
+                await asyncio.sleep(1)
+
+    def _apply(self, data: str):
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        if message.get("origin") == self.worker_id:
+            return
+
+        cache = self._caches.get(message.get("cache"))
+        if cache is not None:
+            cache.drop(message.get("keys"))
+
+
+cache_bus = CacheBus()
+
+_MISSING = object()
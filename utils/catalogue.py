@@ -0,0 +1,48 @@
+"""
+Drug catalogue lookups.
+
+Treatments reference drugs by ID and drugs reference their manufacturer by ID.
+Responses resolve all the drugs they need with one `$in` query and all the
+manufacturers with another, and both are served from reference caches because
+the catalogue rarely changes.
+"""
+
+from beanie import PydanticObjectId
+from beanie.operators import In
+
+from models.pharmacy import Drug, DrugManufacturer
+
+from .cache import ReferenceCache
+
+
+drug_cache = ReferenceCache("drugs", Drug, max_size=2048, ttl_seconds=300)
+manufacturer_cache = ReferenceCache("manufacturers", DrugManufacturer, max_size=512, ttl_seconds=300)
+
+
+async def _load_missing(model, cache: ReferenceCache, ids: set[str]) -> dict:
+    async def load_many(missing: list[str]) -> dict:
+        object_ids = [PydanticObjectId(document_id) for document_id in missing if PydanticObjectId.is_valid(document_id)]
+        documents = await model.find(In(model.id, object_ids)).to_list() if object_ids else []
+        return {str(document.id): document for document in documents}
+
+    return await cache.get_many(ids, load_many)
+
+
+async def resolve_drugs(drug_ids) -> dict[str, tuple[Drug, DrugManufacturer | None]]:
+    """Resolve drugs and their manufacturers with at most one query per collection.
+
+    Args:
+        drug_ids (Iterable[str]): The IDs of the drugs to resolve.
+
+    Returns:
+        **dict[str, tuple[Drug, DrugManufacturer | None]]**: The found drugs and
+        their manufacturers, keyed by drug ID. Unknown IDs are omitted.
+    """
+    drugs = await _load_missing(Drug, drug_cache, set(drug_ids))
+    manufacturers = await _load_missing(
+        DrugManufacturer, manufacturer_cache, {drug.manufacturer_id for drug in drugs.values()}
+    )
+    return {
+        drug_id: (drug, manufacturers.get(drug.manufacturer_id))
+        for drug_id, drug in drugs.items()
+    }
@@ -0,0 +1,90 @@
+"""
+Per-request time budgets.
+
+`DeadlineMiddleware` gives every request a deadline and stores it in a context
+variable, so code called by the request can see how much time is left without
+the deadline being passed down explicitly. Inside `request_deadline`:
+
+* every MongoDB operation runs under `pymongo.timeout`, so queries are sent
+  with a `maxTimeMS` that covers only the remaining budget and the server
+  stops them when the client has given up;
+* every command sent through `DeadlineRedis` is cancelled when the budget runs
+  out.
+
+Outside a request (the lifespan, the reminder scheduler, the job worker) no
+deadline is set and nothing is time-limited.
+"""
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+
+import pymongo
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request ran out of time before the work could start"""
+
+
+def remaining() -> float | None:
+    """Seconds left until the current request's deadline.
+
+    Returns:
+        **float | None**: The remaining budget (0 once it has passed), or None outside a request deadline.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - monotonic())
+
+
+@contextmanager
+def request_deadline(budget: float):
+    """Run the enclosed code with a deadline `budget` seconds from now.
+
+    Args:
+        budget (float): The time budget in seconds.
+    """
+    token = _deadline.set(monotonic() + budget)
+    try:
+        with pymongo.timeout(budget):
+            yield
+    finally:
+        _deadline.reset(token)
+
+
+async def _within_deadline(awaitable):
+    budget = remaining()
+    if budget is None:
+        return await awaitable
+    if budget <= 0:
+        awaitable.close()
+        raise DeadlineExceeded("Request deadline exceeded")
+    async with asyncio.timeout(budget):
+        return await awaitable
+
+
+class DeadlinePipeline(Pipeline):
+    """Pipeline whose `execute` is bounded by the request deadline"""
+
+    async def execute(self, raise_on_error: bool = True):
+        return await _within_deadline(super().execute(raise_on_error))
+
+
+class DeadlineRedis(redis.Redis):
+    """Redis client whose commands are bounded by the request deadline.
+
+    Create it with `DeadlineRedis.from_url(...)` in place of `redis.from_url(...)`.
+    """
+
+    async def execute_command(self, *args, **options):
+        return await _within_deadline(super().execute_command(*args, **options))
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> DeadlinePipeline:
+        return DeadlinePipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
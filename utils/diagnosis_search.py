@@ -0,0 +1,104 @@
+"""
+Ranked diagnosis and symptom search.
+
+Free text is matched with the `diagnosis_text_search` text index and ranked by
+text score; symptom filters use the multikey `symptoms` index. The page of
+results, the symptom facet counts and the total are computed by one `$facet`
+aggregation, so a search is a single round trip to MongoDB.
+"""
+
+from models.diagnosis import Diagnosis, normalize_symptom
+
+from .pagination import encode_cursor, decode_cursor, cursor_object_id
+
+
+SYMPTOM_FACET_LIMIT = 20
+
+
+def build_search_pipeline(
+    query: str | None,
+    symptoms: list[str] | None,
+    cursor: str | None,
+    limit: int,
+) -> list[dict]:
+    """Build the search aggregation pipeline.
+
+    Args:
+        query (str | None): Free text matched against diagnoses, description and symptoms.
+        symptoms (list[str] | None): Symptoms that must all be present.
+        cursor (str | None): The `nextCursor` of the previous page.
+        limit (int): Maximum number of results to return.
+
+    Returns:
+        **list[dict]**: The aggregation pipeline.
+    """
+    match = {}
+    if query:
+        match["$text"] = {"$search": query}
+    if symptoms:
+        match["symptoms"] = {"$all": [normalize_symptom(symptom) for symptom in symptoms]}
+
+    pipeline = [{"$match": match}]
+    page = []
+
+    if query:
+        pipeline.append({"$addFields": {"score": {"$meta": "textScore"}}})
+        if cursor:
+            score, last_id = decode_cursor(cursor, 2)
+            page.append({"$match": {"$or": [
+                {"score": {"$lt": score}},
+                {"score": score, "_id": {"$lt": cursor_object_id(last_id)}},
+            ]}})
+        page.append({"$sort": {"score": -1, "_id": -1}})
+    else:
+        if cursor:
+            (last_id,) = decode_cursor(cursor, 1)
+            page.append({"$match": {"_id": {"$lt": cursor_object_id(last_id)}}})
+        page.append({"$sort": {"_id": -1}})
+
+    # * Fetch one extra result to know whether there is a next page
+    page.append({"$limit": limit + 1})
+
+    pipeline.append({"$facet": {
+        "results": page,
+        "symptoms": [
+            {"$unwind": "$symptoms"},
+            {"$sortByCount": "$symptoms"},
+            {"$limit": SYMPTOM_FACET_LIMIT},
+        ],
+        "total": [{"$count": "count"}],
+    }})
+    return pipeline
+
+
+async def search_diagnoses(
+    query: str | None,
+    symptoms: list[str] | None,
+    cursor: str | None,
+    limit: int,
+) -> dict:
+    """Run a diagnosis search.
+
+    Returns:
+        **dict**: `results` (list of `Diagnosis`), `facets`, `total` and `next_cursor`.
+    """
+    pipeline = build_search_pipeline(query, symptoms, cursor, limit)
+    [facets] = await Diagnosis.aggregate(pipeline).to_list()
+
+    documents = facets["results"]
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        last = documents[-1]
+        next_cursor = encode_cursor(last["score"], last["_id"]) if query else encode_cursor(last["_id"])
+
+    for document in documents:
+        document.pop("score", None)
+
+    return {
+        "results": [Diagnosis.model_validate(document) for document in documents],
+        "facets": [{"symptom": facet["_id"], "count": facet["count"]} for facet in facets["symptoms"]],
+        "total": facets["total"][0]["count"] if facets["total"] else 0,
+        "next_cursor": next_cursor,
+    }
+
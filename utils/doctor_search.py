@@ -0,0 +1,145 @@
+"""
+Faceted doctor search.
+
+Filters on specialty, facility and years of experience are answered from the
+compound indexes on `Doctor`. The matches are sorted by rating at the start of
+the pipeline, so the `specialty_rating_id` or `rating` index serves the filter
+and the order together. One `$facet` then takes the page of results and the
+specialty, facility and experience facet counts and the total, so a search is a
+single round trip to MongoDB. Each facet is counted among all matches,
+including that facet's own filter.
+"""
+
+from models.users import Doctor
+from schema.responses.users import DoctorInDB
+
+from .cache import ReferenceCache
+from .pagination import encode_cursor, decode_cursor, cursor_object_id
+
+
+FACET_LIMIT = 20
+EXPERIENCE_BUCKETS = [0, 5, 10, 20, 30]
+
+# * Directory pages keyed by "skip:limit", cleared when a doctor is created or reviewed;
+# * appointment counters on a page may lag by up to the TTL
+doctor_directory = ReferenceCache("doctor-directory", list[DoctorInDB], max_size=256, ttl_seconds=60)
+
+
+def build_doctor_search_filter(
+    specialties: list[str] | None,
+    facilities: list[str] | None,
+    min_experience: int | None,
+    max_experience: int | None,
+) -> dict:
+    """Build the query matching the doctors of a search.
+
+    Args:
+        specialties (list[str] | None): Doctors with any of these specialties.
+        facilities (list[str] | None): Doctors working at any of these facilities.
+        min_experience (int | None): Minimum years of experience.
+        max_experience (int | None): Maximum years of experience.
+
+    Returns:
+        **dict**: A MongoDB query.
+    """
+    match = {}
+    if specialties:
+        match["specialty"] = {"$in": specialties}
+    if facilities:
+        match["medical_facility"] = {"$in": facilities}
+    if min_experience is not None or max_experience is not None:
+        match["years_of_experience"] = {}
+        if min_experience is not None:
+            match["years_of_experience"]["$gte"] = min_experience
+        if max_experience is not None:
+            match["years_of_experience"]["$lte"] = max_experience
+    return match
+
+
+def build_doctor_search_pipeline(match: dict, cursor: str | None, limit: int) -> list[dict]:
+    """Build the doctor search aggregation pipeline.
+
+    Args:
+        match (dict): The query returned by `build_doctor_search_filter`.
+        cursor (str | None): The `nextCursor` of the previous page.
+        limit (int): Maximum number of results to return.
+
+    Returns:
+        **list[dict]**: The aggregation pipeline.
+    """
+    page = []
+    if cursor:
+        rating, last_id = decode_cursor(cursor, 2)
+        page.append({"$match": {"$or": [
+            {"rating_average": {"$lt": rating}},
+            {"rating_average": rating, "_id": {"$lt": cursor_object_id(last_id)}},
+        ]}})
+    # * Fetch one extra result to know whether there is a next page
+    page.append({"$limit": limit + 1})
+
+    return [
+        # * $match and $sort lead the pipeline so an index serves both; the page then stops after limit + 1
+        {"$match": match},
+        {"$sort": {"rating_average": -1, "_id": -1}},
+        {"$facet": {
+            "results": page,
+            "specialties": [
+                {"$unwind": "$specialty"},
+                {"$sortByCount": "$specialty"},
+                {"$limit": FACET_LIMIT},
+            ],
+            "facilities": [
+                {"$sortByCount": "$medical_facility"},
+                {"$limit": FACET_LIMIT},
+            ],
+            "experience": [
+                {"$bucket": {
+                    "groupBy": "$years_of_experience",
+                    "boundaries": EXPERIENCE_BUCKETS,
+                    "default": EXPERIENCE_BUCKETS[-1],
+                }},
+            ],
+            "total": [{"$count": "count"}],
+        }},
+    ]
+
+
+async def search_doctors(
+    specialties: list[str] | None,
+    facilities: list[str] | None,
+    min_experience: int | None,
+    max_experience: int | None,
+    cursor: str | None,
+    limit: int,
+) -> dict:
+    """Run a doctor search, best rated first.
+
+    Returns:
+        **dict**: `results` (list of `Doctor`), `facets`, `total` and `next_cursor`.
+    """
+    match = build_doctor_search_filter(specialties, facilities, min_experience, max_experience)
+    [facets] = await Doctor.aggregate(build_doctor_search_pipeline(match, cursor, limit)).to_list()
+
+    doctors = [Doctor.model_validate(document) for document in facets["results"]]
+    next_cursor = None
+    if len(doctors) > limit:
+        doctors = doctors[:limit]
+        last = doctors[-1]
+        next_cursor = encode_cursor(last.rating_average, last.id)
+
+    # * The last bucket collects everything from its lower bound up
+    upper_bounds = dict(zip(EXPERIENCE_BUCKETS, EXPERIENCE_BUCKETS[1:]))
+
+    return {
+        "results": doctors,
+        "facets": {
+            "specialties": [{"value": facet["_id"], "count": facet["count"]} for facet in facets["specialties"]],
+            "facilities": [{"value": facet["_id"], "count": facet["count"]} for facet in facets["facilities"]],
+            "experience": [
+                {"min_years": bucket["_id"], "max_years": upper_bounds.get(bucket["_id"]), "count": bucket["count"]}
+                for bucket in facets["experience"]
+            ],
+        },
+        "total": facets["total"][0]["count"] if facets["total"] else 0,
+        "next_cursor": next_cursor,
+    }
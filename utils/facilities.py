@@ -0,0 +1,103 @@
+"""
+Nearest-facility search.
+
+Each facility collection has a 2dsphere index on `location`, so `$geoNear`
+returns facilities in distance order without scanning the collection. The
+specialty and "open now" filters are pushed into the `$geoNear` query; "open
+now" compares the precomputed minute-of-day ranges of `OperationalHours`.
+"""
+
+import asyncio
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from models.medical_facilities import Hospital, Clinic, Pharmacy
+from schema.responses.medical_facilities import FacilityInDB
+
+from .cache import ReferenceCache
+from .settings import get_settings
+
+
+FACILITY_MODELS = {
+    "hospitals": Hospital,
+    "clinics": Clinic,
+    "pharmacies": Pharmacy,
+}
+
+# * Facilities keyed by "<facility_type>:<facility_id>"
+facility_cache = ReferenceCache("facilities", FacilityInDB, max_size=2048, ttl_seconds=300)
+
+
+def current_minute_of_day() -> int:
+    """Return the current minute of the day in the facilities' time zone"""
+    now = datetime.now(ZoneInfo(get_settings().facility_timezone))
+    return now.hour * 60 + now.minute
+
+
+def open_now_filter(minute: int) -> dict:
+    """Query matching facilities whose operational hours contain `minute`.
+
+    Args:
+        minute (int): Minute of the day.
+
+    Returns:
+        **dict**: A MongoDB query.
+    """
+    return {"$or": [
+        {
+            "operational_hours.overnight": False,
+            "operational_hours.open_minute": {"$lte": minute},
+            "operational_hours.close_minute": {"$gt": minute},
+        },
+        {
+            "operational_hours.overnight": True,
+            "$or": [
+                {"operational_hours.open_minute": {"$lte": minute}},
+                {"operational_hours.close_minute": {"$gt": minute}},
+            ],
+        },
+    ]}
+
+
+async def nearby_facilities(
+    longitude: float,
+    latitude: float,
+    max_distance_meters: float,
+    facility_types: list[str],
+    specialty: str | None,
+    open_now: bool,
+    limit: int,
+) -> list[tuple[str, float, object]]:
+    """Find the facilities closest to a point.
+
+    Every requested facility type is queried concurrently with `$geoNear` and
+    the results are merged by distance.
+
+    Returns:
+        **list[tuple[str, float, object]]**: `(facility type, distance in meters, facility)` entries, nearest first.
+    """
+    query = {}
+    if specialty:
+        query["specialties"] = specialty
+        # * Pharmacies have no specialties
+        facility_types = [facility_type for facility_type in facility_types if facility_type != "pharmacies"]
+    if open_now:
+        query.update(open_now_filter(current_minute_of_day()))
+
+    async def search(facility_type: str):
+        model = FACILITY_MODELS[facility_type]
+        pipeline = [
+            {"$geoNear": {
+                "near": {"type": "Point", "coordinates": [longitude, latitude]},
+                "distanceField": "distance",
+                "maxDistance": max_distance_meters,
+                "spherical": True,
+                "query": query,
+            }},
+            {"$limit": limit},
+        ]
+        documents = await model.aggregate(pipeline).to_list()
+        return [(facility_type, document.pop("distance"), model.model_validate(document)) for document in documents]
+
+    results = await asyncio.gather(*(search(facility_type) for facility_type in facility_types))
+    return sorted((entry for entries in results for entry in entries), key=lambda entry: entry[1])[:limit]
@@ -0,0 +1,80 @@
+"""
+Pharmacy inventory operations.
+
+`DrugInventory` is the only record of stock. Every change is a single atomic
+update on one inventory document, so concurrent dispenses against the same
+SKU can never oversell: the stock guard and the decrement happen in the same
+`findAndModify` on the server.
+"""
+
+from pymongo import ReturnDocument, UpdateOne
+
+from models.pharmacy import DrugInventory
+
+
+async def dispense(drug_id: str, pharmacy_id: str, quantity: int) -> DrugInventory | None:
+    """Atomically take `quantity` units of a drug from a pharmacy's stock.
+
+    Args:
+        drug_id (str): The ID of the drug.
+        pharmacy_id (str): The ID of the pharmacy.
+        quantity (int): The number of units to dispense.
+
+    Returns:
+        **DrugInventory | None**: The updated inventory, or None if the pharmacy
+        does not stock the drug or has fewer than `quantity` units.
+    """
+    document = await DrugInventory.get_motor_collection().find_one_and_update(
+        {"drug_id": drug_id, "pharmacy_id": pharmacy_id, "quantity": {"$gte": quantity}},
+        {"$inc": {"quantity": -quantity}},
+        return_document=ReturnDocument.AFTER,
+    )
+    return DrugInventory.model_validate(document) if document else None
+
+
+async def restock(items: list[dict]) -> dict:
+    """Add stock for many drug/pharmacy pairs in one unordered bulk write.
+
+    Missing inventory rows are created. A `price`, when given, replaces the current price.
+
+    Args:
+        items (list[dict]): Entries with `drug_id`, `pharmacy_id`, `quantity` and optional `price`.
+
+    Returns:
+        **dict**: The number of matched, modified and newly created inventory rows.
+    """
+    operations = []
+    for item in items:
+        update = {"$inc": {"quantity": item["quantity"]}}
+        if item.get("price") is not None:
+            update["$set"] = {"price": item["price"]}
+        else:
+            update["$setOnInsert"] = {"price": 0.0}
+
+        operations.append(UpdateOne(
+            {"drug_id": item["drug_id"], "pharmacy_id": item["pharmacy_id"]},
+            update,
+            upsert=True,
+        ))
+
+    result = await DrugInventory.get_motor_collection().bulk_write(operations, ordered=False)
+    return {
+        "matched": result.matched_count,
+        "modified": result.modified_count,
+        "created": result.upserted_count,
+    }
+
+
+async def stockists(drug_id: str, min_quantity: int, skip: int, limit: int) -> list[DrugInventory]:
+    """Return the inventory rows of pharmacies holding at least `min_quantity` units of a drug"""
+    return await DrugInventory.find(
+        DrugInventory.drug_id == drug_id,
+        DrugInventory.quantity >= min_quantity,
+    ).sort(-DrugInventory.quantity).skip(skip).limit(limit).to_list()
+
+
+async def pharmacy_stock(pharmacy_id: str, skip: int, limit: int) -> list[DrugInventory]:
+    """Return a pharmacy's inventory rows"""
+    return await DrugInventory.find(
+        DrugInventory.pharmacy_id == pharmacy_id,
+    ).sort(+DrugInventory.drug_id).skip(skip).limit(limit).to_list()
@@ -0,0 +1,249 @@
+"""
+Durable background jobs on Redis Streams.
+
+Jobs are appended to a stream and consumed by `worker.py` processes through a
+consumer group, so they survive restarts of both the API and the workers and
+never run inside a request worker. A job is acknowledged and deleted from the
+stream only after its handler succeeds. Failed jobs are retried with
+exponential backoff through a sorted set, and moved to a dead-letter stream
+after `JOB_MAX_ATTEMPTS`. Jobs left pending by a crashed worker are claimed by
+another one after `JOB_VISIBILITY_SECONDS`.
+
+Every job has an ID. Enqueueing the same ID again within
+`JOB_IDEMPOTENCY_TTL_SECONDS` is a no-op, so retried requests do not send the
+same notification twice. Delivery is at least once, so handlers must tolerate
+running again after a crash.
+
+Jobs carry the `traceparent` of the request that enqueued them, so their spans
+join the request's trace.
+"""
+
+import asyncio
+import json
+import os
+import socket
+from time import time
+from typing import Any, Awaitable, Callable
+from uuid import uuid4
+
+from redis.exceptions import ResponseError
+
+from .api_logger import logger
+from .settings import get_settings
+from .tracing import current_traceparent, tracer
+
+
+JOB_HANDLERS: dict[str, Callable[..., Awaitable[Any]]] = {}
+
+ENQUEUE_SCRIPT = """
+if redis.call('SET', KEYS[2], '1', 'NX', 'EX', ARGV[1]) then
+    return redis.call('XADD', KEYS[1], '*', 'id', ARGV[2], 'name', ARGV[3], 'payload', ARGV[4], 'attempt', '0', 'traceparent', ARGV[5])
+end
+return false
+"""
+
+PROMOTE_RETRIES_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, entry in ipairs(due) do
+    local job = cjson.decode(entry)
+    redis.call('XADD', KEYS[2], '*', 'id', job.id, 'name', job.name, 'payload', job.payload, 'attempt', job.attempt, 'traceparent', job.traceparent or '')
+    redis.call('ZREM', KEYS[1], entry)
+end
+return #due
+"""
+
+
+def job_handler(name: str):
+    """Register an async function as the handler of jobs called `name`.
+
+    The job payload is passed to the handler as keyword arguments.
+    """
+
+    def register(function):
+        JOB_HANDLERS[name] = function
+        return function
+
+    return register
+
+
+class JobQueue:
+    """Enqueues jobs and manages their lifecycle in Redis"""
+
+    def __init__(self, prefix: str = "{jobs}"):
+        """
+        Args:
+            prefix (str): Key prefix. The hash tag keeps every key on one Redis Cluster slot.
+        """
+        self.stream_key = f"{prefix}:stream"
+        self.retry_key = f"{prefix}:retry"
+        self.dead_key = f"{prefix}:dead"
+        self.id_key_prefix = f"{prefix}:id:"
+        self.group = "workers"
+        self.redis = None
+        self._enqueue = None
+        self._promote_retries = None
+
+    def init(self, redis_connection):
+        """Bind the queue to a Redis connection. Called once from the application lifespan.
+
+        Args:
+            redis_connection (redis.asyncio.Redis): The Redis connection to use.
+        """
+        self.redis = redis_connection
+        self._enqueue = redis_connection.register_script(ENQUEUE_SCRIPT)
+        self._promote_retries = redis_connection.register_script(PROMOTE_RETRIES_SCRIPT)
+
+    async def enqueue(self, name: str, payload: dict, job_id: str | None = None, pipe=None) -> str:
+        """Enqueue a job, unless a job with the same ID was enqueued recently.
+
+        Args:
+            name (str): The registered job name.
+            payload (dict): JSON-serializable keyword arguments for the handler.
+            job_id (str | None): Idempotency key; a random ID is used if omitted.
+            pipe (redis.asyncio.client.Pipeline | None): Add the enqueue to this pipeline
+                instead of sending it immediately, so it rides on the caller's round trip.
+
+        Returns:
+            **str**: The job ID.
+        """
+        job_id = job_id or uuid4().hex
+        await self._enqueue(
+            keys=[self.stream_key, f"{self.id_key_prefix}{job_id}"],
+            args=[get_settings().job_idempotency_ttl_seconds, job_id, name, json.dumps(payload), current_traceparent() or ""],
+            client=pipe,
+        )
+        return job_id
+
+    async def ensure_group(self):
+        """Create the consumer group (and the stream) if they do not exist yet"""
+        try:
+            await self.redis.xgroup_create(self.stream_key, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def read(self, consumer: str, count: int, block_ms: int) -> list[tuple[str, dict]]:
+        """Read up to `count` new jobs for `consumer`, blocking up to `block_ms`"""
+        response = await self.redis.xreadgroup(self.group, consumer, {self.stream_key: ">"}, count=count, block=block_ms)
+        return [message for _, messages in response or [] for message in messages]
+
+    async def reclaim(self, consumer: str, count: int) -> list[tuple[str, dict]]:
+        """Take over jobs that another consumer has held for longer than the visibility timeout"""
+        idle_ms = int(get_settings().job_visibility_seconds * 1000)
+        response = await self.redis.xautoclaim(self.stream_key, self.group, consumer, idle_ms, start_id="0-0", count=count)
+        return [(message_id, fields) for message_id, fields in response[1] if fields]
+
+    async def promote_due_retries(self, limit: int = 100) -> int:
+        """Move retries whose backoff has elapsed back onto the stream"""
+        return await self._promote_retries(keys=[self.retry_key, self.stream_key], args=[time(), limit])
+
+    async def complete(self, message_id: str):
+        """Acknowledge a finished job and remove it from the stream"""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream_key, self.group, message_id)
+            pipe.xdel(self.stream_key, message_id)
+            await pipe.execute()
+
+    async def fail(self, message_id: str, fields: dict, error: Exception):
+        """Schedule a retry with exponential backoff, or dead-letter the job after the last attempt"""
+        settings = get_settings()
+        attempt = int(fields["attempt"]) + 1
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if attempt >= settings.job_max_attempts:
+                logger.error(f"Job {fields['id']} ({fields['name']}) failed {attempt} times, dead-lettering: {error}")
+                pipe.xadd(self.dead_key, {**fields, "attempt": attempt, "error": str(error), "failed_at": time()})
+            else:
+                delay = min(settings.job_retry_base_seconds * 2 ** (attempt - 1), settings.job_retry_max_seconds)
+                logger.error(f"Job {fields['id']} ({fields['name']}) failed, retrying in {delay}s: {error}")
+                retry = {
+                    "id": fields["id"],
+                    "name": fields["name"],
+                    "payload": fields["payload"],
+                    "attempt": str(attempt),
+                    "traceparent": fields.get("traceparent", ""),
+                }
+                pipe.zadd(self.retry_key, {json.dumps(retry): time() + delay})
+            pipe.xack(self.stream_key, self.group, message_id)
+            pipe.xdel(self.stream_key, message_id)
+            await pipe.execute()
+
+
+job_queue = JobQueue()
+
+
+class JobWorker:
+    """Consumes jobs from a queue with bounded concurrency"""
+
+    def __init__(self, queue: JobQueue, concurrency: int, consumer: str | None = None):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.processed = 0
+        self.failed = 0
+        self._running = False
+        self._inflight: set[asyncio.Task] = set()
+
+    def stop(self):
+        """Stop reading new jobs; `run` returns once the jobs in flight have finished"""
+        self._running = False
+
+    async def run(self, block_ms: int = 1000):
+        await self.queue.ensure_group()
+        self._running = True
+        reclaim_every = get_settings().job_visibility_seconds / 2
+        next_reclaim = 0.0
+
+        while self._running:
+            free = self.concurrency - len(self._inflight)
+            if free <= 0:
+                await asyncio.wait(self._inflight, return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            try:
+                await self.queue.promote_due_retries()
+                messages = []
+                if time() >= next_reclaim:
+                    messages = await self.queue.reclaim(self.consumer, free)
+                    next_reclaim = time() + reclaim_every
+                if not messages:
+                    messages = await self.queue.read(self.consumer, free, block_ms)
+            except Exception as e:
+                logger.error(f"Reading jobs failed: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            for message_id, fields in messages:
+                task = asyncio.create_task(self._handle(message_id, fields))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+        if self._inflight:
+            await asyncio.wait(self._inflight)
+
+    async def _handle(self, message_id: str, fields: dict):
+        span = tracer.start_trace(f"job {fields['name']}", fields.get("traceparent"), kind="consumer")
+        try:
+            with tracer.activate(span):
+                handler = JOB_HANDLERS.get(fields["name"])
+                if handler is None:
+                    raise LookupError(f"No handler registered for job {fields['name']}")
+                await handler(**json.loads(fields["payload"]))
+        except Exception as e:
+            self.failed += 1
+            if span is not None:
+                span.record_error(repr(e))
+            outcome = self.queue.fail(message_id, fields, e)
+        else:
+            self.processed += 1
+            outcome = self.queue.complete(message_id)
+        finally:
+            if span is not None:
+                span.attributes.update({"job.id": fields["id"], "job.attempt": int(fields["attempt"])})
+                tracer.end(span)
+
+        try:
+            await outcome
+        except Exception as e:
+            # * The job stays pending and is reclaimed after the visibility timeout
+            logger.error(f"Recording the outcome of job {fields['id']} failed: {e}")
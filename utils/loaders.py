@@ -0,0 +1,152 @@
+"""
+Per-request batch loading of related documents.
+
+`BatchLoader` works like a DataLoader: every `load` issued during the same
+event loop iteration is collected and fetched with one batch call, and repeated
+keys are served from the loader's own cache. A fresh set of loaders is created
+for every request, so nothing is shared between requests.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+from fastapi import HTTPException, status
+
+from models.appointment import Appointment
+from models.diagnosis import Diagnosis
+
+
+class BatchLoader:
+    """Coalesces individual key lookups into one batched fetch per event loop iteration"""
+
+    def __init__(self, batch_fn: Callable[[list], Awaitable[dict]]):
+        """
+        Args:
+            batch_fn (Callable[[list], Awaitable[dict]]): Fetches many keys at once
+                and returns the found values keyed by key.
+        """
+        self._batch_fn = batch_fn
+        self._futures: dict[Hashable, asyncio.Future] = {}
+        self._pending: list[Hashable] = []
+        # * The event loop only keeps weak references to tasks
+        self._tasks: set[asyncio.Task] = set()
+
+    def load(self, key: Hashable) -> asyncio.Future:
+        """Return a future resolving to the value for `key`, or None if it does not exist"""
+        # * A future cancelled by its awaiter is loaded again rather than handed out
+        if key in self._futures and not self._futures[key].cancelled():
+            return self._futures[key]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[key] = future
+        self._pending.append(key)
+
+        if len(self._pending) == 1:
+            loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> list[Any]:
+        """Load many keys, returning the found values in key order"""
+        values = await asyncio.gather(*(self.load(key) for key in keys))
+        return [value for value in values if value is not None]
+
+    def _dispatch(self):
+        keys, self._pending = self._pending, []
+        task = asyncio.create_task(self._fetch(keys))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, keys: list):
+        try:
+            found = await self._batch_fn(keys)
+        except Exception as e:
+            for key in keys:
+                if not self._futures[key].done():
+                    self._futures[key].set_exception(e)
+            return
+
+        for key in keys:
+            if not self._futures[key].done():
+                self._futures[key].set_result(found.get(key))
+
+
+def documents_by_foreign_key(model, field: str, sort_field: str, limit: int) -> Callable[[list[str]], Awaitable[dict]]:
+    """Build a batch function that loads the newest `limit` `model` documents referencing each key.
+
+    A single key is served by an indexed, limited `find` on `field`. Several keys
+    are fetched together with one `$in` on `field` and grouped with `$topN`.
+
+    Args:
+        model: The child document model.
+        field (str): The foreign key field holding the parent ID.
+        sort_field (str): The field to order children by, newest first.
+        limit (int): Maximum number of children per key.
+    """
+    sort = {sort_field: -1, "_id": -1}
+
+    async def fetch(keys: list[str]) -> dict:
+        if len(keys) == 1:
+            documents = await model.find({field: keys[0]}).sort([(sort_field, -1), ("_id", -1)]).limit(limit).to_list()
+            return {keys[0]: documents}
+
+        groups = await model.aggregate([
+            {"$match": {field: {"$in": keys}}},
+            {"$group": {"_id": f"${field}", "documents": {"$topN": {"n": limit, "sortBy": sort, "output": "$$ROOT"}}}},
+        ]).to_list()
+        return {group["_id"]: [model.model_validate(document) for document in group["documents"]] for group in groups}
+
+    return fetch
+
+
+class RequestLoaders:
+    """The batch loaders available to a single request, created on first use"""
+
+    def __init__(self):
+        self._loaders: dict[tuple, BatchLoader] = {}
+
+    def _children(self, model, field: str, sort_field: str, limit: int) -> BatchLoader:
+        key = (model.__name__, field, limit)
+        if key not in self._loaders:
+            self._loaders[key] = BatchLoader(documents_by_foreign_key(model, field, sort_field, limit))
+        return self._loaders[key]
+
+    def patient_appointments(self, limit: int) -> BatchLoader:
+        return self._children(Appointment, "patient", "appointment_date", limit)
+
+    def patient_diagnoses(self, limit: int) -> BatchLoader:
+        return self._children(Diagnosis, "diagnosed_user_id", "created_at", limit)
+
+    def doctor_appointments(self, limit: int) -> BatchLoader:
+        return self._children(Appointment, "doctor", "appointment_date", limit)
+
+
+def get_loaders() -> RequestLoaders:
+    """FastAPI dependency returning a fresh set of loaders for the request"""
+    return RequestLoaders()
+
+
+def parse_expand(expand: str | None, allowed: set[str]) -> set[str]:
+    """Parse a comma-separated `expand` query parameter.
+
+    Args:
+        expand (str | None): The raw query parameter.
+        allowed (set[str]): The expansions the endpoint supports.
+
+    Raises:
+        HTTPException: 400 if an unsupported expansion is requested.
+
+    Returns:
+        **set[str]**: The requested expansions.
+    """
+    if not expand:
+        return set()
+
+    requested = {part.strip() for part in expand.split(",") if part.strip()}
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot expand {', '.join(sorted(unknown))}; supported: {', '.join(sorted(allowed))}",
+        )
+    return requested
@@ -1,15 +1,27 @@
 """Send a notification to the user. through SMS or Email
 """
 
-import vonage
-import os
-import httpx
-
-from dotenv import load_dotenv
+import asyncio
 
 from .api_logger import logger
+from .settings import get_settings
+from .tracing import tracer
+
+
+SMS_URL = "https://rest.nexmo.com/sms/json"
+
 
-load_dotenv()
+def _sms_payload(to: str, message: str) -> dict:
+    """Build the Vonage SMS request payload"""
+    settings = get_settings()
+
+    return {
+        "from": "Vonage APIs",
+        "text": message,
+        "to": to,
+        "api_key": f"{settings.vonage_api_key}",
+        "api_secret": f"{settings.vonage_api_secret}",
+    }
 
 
 def send_sms_notification(to: str, message: str) -> bool:
@@ -22,22 +34,70 @@ def send_sms_notification(to: str, message: str) -> bool:
     Returns:
         **bool**: True if the SMS was sent successfully, False otherwise.
     """
-    url = "https://rest.nexmo.com/sms/json"
+    # Imported lazily so the HTTP client is only loaded once a notification is actually sent
+    import httpx
 
-    payload = {
-        "from": "Vonage APIs",
-        "text": message,
-        "to": to,
-        "api_key": f"{os.getenv('VONAGE_API_KEY')}",
-        "api_secret": f"{os.getenv('VONAGE_API_SECRET')}",
-    }
+    with tracer.span("sms send", kind="client", attributes={"messaging.system": "vonage"}) as span:
+        # Synchronous request
+        response = httpx.post(SMS_URL, data=_sms_payload(to, message))
+        span.set_attribute("http.status_code", response.status_code)
+
+        if response.status_code == 200:
+            logger.info(f"SMS sent successfully to {to}")
+            return True
+        else:
+            logger.error(f"Failed to send SMS to {to}: {response.text}")
+            span.record_error(response.text)
+            return False
+
+
+async def send_bulk_sms_notifications(messages: list[tuple[str, str]], concurrency: int = 10) -> int:
+    """Send many SMS messages over a single pooled HTTP client.
+
+    Args:
+        messages (list[tuple[str, str]]): `(phone number, message)` pairs to send.
+        concurrency (int): Maximum number of requests in flight at once.
+
+    Returns:
+        **int**: The number of messages that were sent successfully.
+    """
+    return sum(await send_sms_batch(messages, concurrency))
+
+
+async def send_sms_batch(messages: list[tuple[str, str]], concurrency: int = 10) -> list[bool]:
+    """Send many SMS messages over a single pooled HTTP client.
+
+    Args:
+        messages (list[tuple[str, str]]): `(phone number, message)` pairs to send.
+        concurrency (int): Maximum number of requests in flight at once.
+
+    Returns:
+        **list[bool]**: Whether each message was sent, in the order of `messages`.
+    """
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(timeout=10) as client:
+
+        async def send(to: str, message: str) -> bool:
+            async with semaphore:
+                with tracer.span("sms send", kind="client", attributes={"messaging.system": "vonage"}) as span:
+                    try:
+                        response = await client.post(SMS_URL, data=_sms_payload(to, message))
+                    except httpx.HTTPError as e:
+                        logger.error(f"Failed to send SMS to {to}: {e}")
+                        span.record_error(e)
+                        return False
+
+                    span.set_attribute("http.status_code", response.status_code)
+                    if response.status_code == 200:
+                        return True
+                    logger.error(f"Failed to send SMS to {to}: {response.text}")
+                    span.record_error(response.text)
+                    return False
 
-    # Synchronous request
-    response = httpx.post(url, data=payload)
+        results = await asyncio.gather(*(send(to, message) for to, message in messages))
 
-    if response.status_code == 200:
-        logger.info(f"SMS sent successfully to {to}")
-        return True
-    else:
-        logger.error(f"Failed to send SMS to {to}: {response.text}")
-        return False
+    logger.info(f"Sent {sum(results)}/{len(messages)} SMS notifications")
+    return results
@@ -0,0 +1,64 @@
+"""Opaque cursors for keyset (cursor) pagination.
+"""
+
+import base64
+import json
+
+from beanie import PydanticObjectId
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last returned item as an opaque, URL-safe cursor.
+
+    Args:
+        *values: JSON-serializable sort key values (e.g. score and ID).
+
+    Returns:
+        **str**: The cursor.
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor sent by the client.
+        size (int): The expected number of sort key values.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+
+    Returns:
+        **list**: The sort key values.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+    return values
+
+
+def cursor_object_id(value) -> PydanticObjectId:
+    """Convert the ID held by a decoded cursor.
+
+    Raises:
+        HTTPException: 400 if `value` is not a valid ObjectId.
+
+    Returns:
+        **PydanticObjectId**: The ID.
+    """
+    if not isinstance(value, str) or not PydanticObjectId.is_valid(value):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+    return PydanticObjectId(value)
@@ -0,0 +1,96 @@
+"""
+Sampling profiler for individual requests.
+
+A background thread samples the event loop thread's stack every
+`PROFILING_INTERVAL_SECONDS` while at least one request is being profiled.
+A sample is counted for a request only if the request's task is the one running
+on the loop at that moment, so other requests that interleave with it do not
+show up in its profile. Time the request spends awaiting I/O or the threadpool
+is not sampled; the profile shows where it spends the loop's CPU.
+
+Profiles are written as collapsed stacks (one `frame;frame;frame count` line
+per stack), which flamegraph.pl, speedscope and inferno read directly. The
+thread only runs while profiles are active, so there is no overhead otherwise.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if "site-packages" in filename:
+        filename = filename.rsplit("site-packages" + os.sep, 1)[-1]
+    elif filename.startswith(os.getcwd()):
+        filename = os.path.relpath(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def collapse(frame) -> str:
+    """Return the stack ending at `frame` as a collapsed, root-first `;`-separated string"""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Samples the stacks of the event loop thread on behalf of profiled tasks"""
+
+    def __init__(self, interval: float):
+        """
+        Args:
+            interval (float): Seconds between samples.
+        """
+        self.interval = interval
+        self._active: dict[asyncio.Task, Counter] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._loop = None
+        self._loop_thread_id = None
+
+    @property
+    def active(self) -> int:
+        return len(self._active)
+
+    def start(self, task: asyncio.Task):
+        """Start collecting samples for `task`. Must be called from the event loop thread."""
+        with self._lock:
+            self._active[task] = Counter()
+            if self._thread is None:
+                self._loop = task.get_loop()
+                self._loop_thread_id = threading.get_ident()
+                self._thread = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+                self._thread.start()
+
+    def stop(self, task: asyncio.Task) -> Counter:
+        """Stop collecting samples for `task` and return its stack counts"""
+        with self._lock:
+            return self._active.pop(task, Counter())
+
+    def _sample(self):
+        while True:
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                frame = sys._current_frames().get(self._loop_thread_id)
+                # * The loop's running task; current_task looks it up for a loop running in another thread
+                counts = self._active.get(asyncio.current_task(self._loop))
+                if frame is not None and counts is not None:
+                    counts[collapse(frame)] += 1
+            del frame
+            time.sleep(self.interval)
+
+
+def write_collapsed(path: Path, counts: Counter):
+    """Write stack counts in collapsed-stack format"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(f"{stack} {count}\n" for stack, count in counts.most_common()))
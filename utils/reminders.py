@@ -0,0 +1,254 @@
+"""
+Appointment reminders backed by time-bucketed Redis sorted sets.
+
+Every reminder is a member of the sorted set of the time bucket it falls into,
+scored by its due timestamp, and every non-empty bucket is a member of an index
+sorted set. Scheduling is therefore two `ZADD`s (O(log n)), and polling only
+looks at the handful of buckets that are already due, no matter how many future
+reminders are stored.
+
+Due reminders are claimed atomically with a lease, so any number of workers can
+poll at the same time without sending a reminder twice. Claimed reminders whose
+lease expires (e.g. the worker died mid-batch) are handed out again.
+"""
+
+from datetime import datetime, timedelta, timezone
+from time import time
+from typing import Annotated
+
+from beanie import PydanticObjectId
+from beanie.operators import In
+from pydantic import BaseModel, Field
+
+from models.appointment import Appointment
+from models.helpers import ContactInfo
+from models.users import Patient, Doctor
+
+from .api_logger import logger
+from .notification import send_sms_batch
+from .settings import get_settings
+
+
+# * All keys share the {reminders} hash tag so the claim script stays on one Redis Cluster slot
+BUCKET_KEY_PREFIX = "{reminders}:bucket:"
+BUCKET_INDEX_KEY = "{reminders}:buckets"
+LEASES_KEY = "{reminders}:leases"
+
+CLAIM_DUE_SCRIPT = """
+local index_key, leases_key = KEYS[1], KEYS[2]
+local now = tonumber(ARGV[1])
+local lease_until = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local prefix = ARGV[4]
+local due_bucket = math.floor(now / tonumber(ARGV[5]))
+local claimed = {}
+
+local expired = redis.call('ZRANGEBYSCORE', leases_key, '-inf', now, 'LIMIT', 0, limit)
+for _, member in ipairs(expired) do
+    redis.call('ZADD', leases_key, lease_until, member)
+    table.insert(claimed, member)
+end
+
+local buckets = redis.call('ZRANGEBYSCORE', index_key, '-inf', due_bucket, 'LIMIT', 0, limit)
+for _, bucket in ipairs(buckets) do
+    if #claimed >= limit then break end
+    local bucket_key = prefix .. bucket
+    local members = redis.call('ZRANGEBYSCORE', bucket_key, '-inf', now, 'LIMIT', 0, limit - #claimed)
+    for _, member in ipairs(members) do
+        redis.call('ZREM', bucket_key, member)
+        redis.call('ZADD', leases_key, lease_until, member)
+        table.insert(claimed, member)
+    end
+    if redis.call('ZCARD', bucket_key) == 0 then
+        redis.call('ZREM', index_key, bucket)
+    end
+end
+
+return claimed
+"""
+
+
+class ReminderRecipient(BaseModel):
+    """Projection of the user fields needed to send a reminder"""
+    id: Annotated[PydanticObjectId, Field(alias="_id")]
+    first_name: Annotated[str, Field()]
+    last_name: Annotated[str, Field()]
+    contact_info: Annotated[ContactInfo, Field()]
+
+
+def _timestamp(value: datetime) -> float:
+    """Return the POSIX timestamp of `value`, treating naive datetimes as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class ReminderQueue:
+    """Schedules appointment reminders and sends the ones that are due"""
+
+    def __init__(self):
+        self.redis = None
+        self._claim_due = None
+
+    def init(self, redis_connection):
+        """Bind the queue to a Redis connection. Called once from the application lifespan.
+
+        Args:
+            redis_connection (redis.asyncio.Redis): The Redis connection to use.
+        """
+        self.redis = redis_connection
+        self._claim_due = redis_connection.register_script(CLAIM_DUE_SCRIPT)
+
+    def _bucket(self, due_at: float) -> int:
+        return int(due_at // get_settings().reminder_bucket_seconds)
+
+    async def schedule(self, appointment: Appointment, pipe=None) -> bool:
+        """Schedule a reminder `REMINDER_LEAD_MINUTES` before the appointment.
+
+        Appointments that have already started are not scheduled. If the reminder
+        time has already passed, the reminder is due immediately.
+
+        Args:
+            appointment (Appointment): The appointment to remind the patient and doctor about.
+            pipe (redis.asyncio.client.Pipeline | None): Add the commands to this transaction
+                instead of sending them immediately.
+
+        Returns:
+            **bool**: True if a reminder was scheduled, False otherwise.
+        """
+        appointment_at = _timestamp(appointment.appointment_date)
+        now = time()
+        if appointment_at <= now:
+            return False
+
+        lead = timedelta(minutes=get_settings().reminder_lead_minutes).total_seconds()
+        due_at = max(appointment_at - lead, now)
+        bucket = self._bucket(due_at)
+
+        if pipe is not None:
+            pipe.zadd(f"{BUCKET_KEY_PREFIX}{bucket}", {str(appointment.id): due_at})
+            pipe.zadd(BUCKET_INDEX_KEY, {bucket: bucket})
+            return True
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(f"{BUCKET_KEY_PREFIX}{bucket}", {str(appointment.id): due_at})
+            pipe.zadd(BUCKET_INDEX_KEY, {bucket: bucket})
+            await pipe.execute()
+        return True
+
+    async def claim_due(self) -> list[str]:
+        """Atomically lease a batch of due reminders.
+
+        Returns:
+            **list[str]**: The IDs of the appointments whose reminders were claimed.
+        """
+        settings = get_settings()
+        now = time()
+
+        return await self._claim_due(
+            keys=[BUCKET_INDEX_KEY, LEASES_KEY],
+            args=[
+                now,
+                now + settings.reminder_lease_seconds,
+                settings.reminder_batch_size,
+                BUCKET_KEY_PREFIX,
+                settings.reminder_bucket_seconds,
+            ],
+        )
+
+    async def complete(self, appointment_ids: list[str]):
+        """Release the leases of reminders that have been handled"""
+        if appointment_ids:
+            await self.redis.zrem(LEASES_KEY, *appointment_ids)
+
+    async def send_due_reminders(self) -> int:
+        """Claim a batch of due reminders and send them in bulk.
+
+        Appointments, patients and doctors are each loaded with a single `$in` query.
+        Reminders for appointments that are no longer scheduled are dropped. A
+        reminder whose messages were not all sent is retried after its lease expires.
+
+        Returns:
+            **int**: The number of SMS messages sent.
+        """
+        appointment_ids = await self.claim_due()
+        if not appointment_ids:
+            return 0
+
+        appointments = await Appointment.find(
+            In(Appointment.id, [PydanticObjectId(appointment_id) for appointment_id in appointment_ids]),
+            Appointment.status == "scheduled",
+        ).to_list()
+
+        patients = await Patient.find(
+            In(Patient.id, list({PydanticObjectId(appointment.patient) for appointment in appointments}))
+        ).project(ReminderRecipient).to_list()
+        doctors = await Doctor.find(
+            In(Doctor.id, list({PydanticObjectId(appointment.doctor) for appointment in appointments}))
+        ).project(ReminderRecipient).to_list()
+
+        patients_by_id = {str(patient.id): patient for patient in patients}
+        doctors_by_id = {str(doctor.id): doctor for doctor in doctors}
+
+        messages, senders = [], []
+        for appointment in appointments:
+            patient = patients_by_id.get(appointment.patient)
+            doctor = doctors_by_id.get(appointment.doctor)
+            if not patient or not doctor:
+                logger.error(f"Skipping reminder for appointment {appointment.id}: patient or doctor not found.")
+                continue
+
+            messages.append((
+                patient.contact_info.phone,
+                f"Reminder: you have an appointment on {appointment.appointment_date} with {doctor.first_name} {doctor.last_name}. Appointment ID: {appointment.id}",
+            ))
+            messages.append((
+                doctor.contact_info.phone,
+                f"Reminder: you have an appointment on {appointment.appointment_date} with patient {patient.first_name} {patient.last_name}. Appointment ID: {appointment.id}",
+            ))
+            senders += [appointment, appointment]
+
+        results = await send_sms_batch(messages) if messages else []
+
+        # * A reminder with a failed message keeps its lease and is claimed again once the lease
+        # * expires (resending both messages), until its appointment has started
+        now = time()
+        failed = {
+            str(appointment.id) for appointment, sent in zip(senders, results)
+            if not sent and _timestamp(appointment.appointment_date) > now
+        }
+        if failed:
+            logger.error(f"Reminders of {len(failed)} appointments failed; retrying after the lease expires")
+        await self.complete([appointment_id for appointment_id in appointment_ids if appointment_id not in failed])
+        return sum(results)
+
+
+reminder_queue = ReminderQueue()
+
+
+def start_reminder_scheduler():
+    """Start the APScheduler job that polls for due reminders in this worker.
+
+    Returns:
+        **AsyncIOScheduler**: The running scheduler; shut it down on application exit.
+    """
+    # Imported lazily to keep APScheduler out of the application import path
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    scheduler = AsyncIOScheduler(timezone="UTC")
+    scheduler.add_job(
+        _poll_reminders,
+        "interval",
+        seconds=get_settings().reminder_poll_seconds,
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.start()
+    return scheduler
+
+
+async def _poll_reminders():
+    try:
+        await reminder_queue.send_due_reminders()
+    except Exception as e:
+        logger.error(f"An error occurred while sending appointment reminders: {e}")
@@ -0,0 +1,190 @@
+"""
+Secondary reads with read-your-writes consistency tokens.
+
+Read-only routes can run their queries through `ReplicaReads`, which sends
+them to a secondary (`secondaryPreferred` with `maxStalenessSeconds`) when
+`SECONDARY_READS_ENABLED` is set, and to the primary otherwise.
+
+A secondary may not have replicated a write the same client has just made. To
+cover that, `ConsistencyTokenMiddleware` returns a consistency token after
+every write request, in the `X-Consistency-Token` header and a cookie. The
+token holds the operation and cluster time of the request's last write, as
+recorded by `CausalTokenListener`. A read that sends the token back runs in a
+causally consistent session advanced to that time with `majority` read
+concern, so the secondary waits until it has the write before it answers.
+Tokens are signed with `SECRET_KEY`, so clients cannot make the servers wait
+for a time that never happened.
+"""
+
+import base64
+import hashlib
+import hmac
+from contextvars import ContextVar
+from typing import Annotated
+
+import bson
+from bson.errors import BSONError
+from beanie.odm.queries.find import FindMany
+from beanie.odm.utils.parsing import parse_obj
+from beanie.odm.utils.projection import get_projection
+from fastapi import Cookie, Header
+from pymongo import monitoring
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import SecondaryPreferred
+
+from .api_logger import logger
+from .settings import get_settings
+
+
+TOKEN_HEADER = "X-Consistency-Token"
+TOKEN_COOKIE = "consistency_token"
+
+WRITE_COMMANDS = {"insert", "update", "delete", "findAndModify", "bulkWrite"}
+
+# * Operation and cluster time of the writes made by the current request, filled in by the listener
+_write_times: ContextVar[dict | None] = ContextVar("write_times", default=None)
+
+
+def _signature(payload: bytes) -> bytes:
+    return hmac.new(get_settings().secret_key.encode(), payload, hashlib.sha256).digest()[:16]
+
+
+def encode_token(times: dict) -> str:
+    """Encode and sign the operation and cluster time of a write"""
+    payload = bson.encode(times)
+    return base64.urlsafe_b64encode(_signature(payload) + payload).decode().rstrip("=")
+
+
+def decode_token(token: str) -> dict | None:
+    """Return the times in a consistency token, or None if it is malformed or not signed by us"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        signature, payload = raw[:16], raw[16:]
+        if not hmac.compare_digest(signature, _signature(payload)):
+            return None
+        times = bson.decode(payload)
+    except (ValueError, TypeError, BSONError):
+        return None
+    if "operationTime" not in times or "clusterTime" not in times:
+        return None
+    return times
+
+
+def track_writes() -> dict:
+    """Start recording the times of the writes made by the current request.
+
+    Returns:
+        **dict**: Filled in with `operationTime` and `clusterTime` once the request writes.
+    """
+    times = {}
+    _write_times.set(times)
+    return times
+
+
+class CausalTokenListener(monitoring.CommandListener):
+    """Records the operation and cluster time of writes made within `track_writes`.
+
+    Motor runs pymongo in executor threads with a copy of the caller's context,
+    so the listener sees the dict of the request that issued the command.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        times = _write_times.get()
+        if times is None or event.command_name not in WRITE_COMMANDS:
+            return
+        operation_time = event.reply.get("operationTime")
+        cluster_time = event.reply.get("$clusterTime")
+        if operation_time is None or cluster_time is None:
+            return  # * Standalone servers have no cluster time
+        if "operationTime" not in times or operation_time > times["operationTime"]:
+            times["operationTime"] = operation_time
+        if "clusterTime" not in times or cluster_time["clusterTime"] > times["clusterTime"]["clusterTime"]:
+            times["clusterTime"] = cluster_time
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        pass
+
+
+class ReplicaReads:
+    """Runs read queries on a secondary, after the client's last write if it sent a token"""
+
+    def __init__(self, token: dict | None = None):
+        self.token = token
+
+    def _collection(self, model):
+        return model.get_motor_collection().with_options(
+            read_preference=SecondaryPreferred(max_staleness=get_settings().secondary_max_staleness_seconds),
+            read_concern=ReadConcern("majority") if self.token else None,
+        )
+
+    async def _run(self, collection, read):
+        if self.token is None or not get_settings().secondary_reads_enabled:
+            return await read(None)
+
+        async with await collection.database.client.start_session(causal_consistency=True) as session:
+            session.advance_cluster_time(self.token["clusterTime"])
+            session.advance_operation_time(self.token["operationTime"])
+            return await read(session)
+
+    async def to_list(self, query: FindMany) -> list:
+        """Run a Beanie find query and return its documents.
+
+        Args:
+            query (FindMany): The query, built as usual (`Model.find(...).sort(...).skip(...).limit(...)`).
+
+        Returns:
+            **list**: The documents, parsed into the query's projection model.
+        """
+        if not get_settings().secondary_reads_enabled:
+            return await query.to_list()
+
+        collection = self._collection(query.document_model)
+
+        async def read(session) -> list:
+            cursor = collection.find(
+                filter=query.get_filter_query(),
+                sort=query.sort_expressions or None,
+                projection=get_projection(query.projection_model),
+                skip=query.skip_number,
+                limit=query.limit_number,
+                session=session,
+            )
+            return [parse_obj(query.get_projection_model(), document) for document in await cursor.to_list(None)]
+
+        return await self._run(collection, read)
+
+    async def aggregate(self, model, pipeline: list[dict]) -> list:
+        """Run an aggregation on `model`'s collection and parse the results into `model`.
+
+        Args:
+            model: The document model.
+            pipeline (list[dict]): The aggregation pipeline.
+
+        Returns:
+            **list**: The documents.
+        """
+        if not get_settings().secondary_reads_enabled:
+            collection = model.get_motor_collection()
+        else:
+            collection = self._collection(model)
+
+        async def read(session) -> list:
+            documents = await collection.aggregate(pipeline, session=session).to_list(None)
+            return [model.model_validate(document) for document in documents]
+
+        return await self._run(collection, read)
+
+
+async def get_replica_reads(
+    x_consistency_token: Annotated[str | None, Header(description="Token returned by the client's last write")] = None,
+    consistency_token: Annotated[str | None, Cookie()] = None,
+) -> ReplicaReads:
+    """FastAPI dependency routing a request's reads, honouring the client's consistency token"""
+    raw = x_consistency_token or consistency_token
+    token = decode_token(raw) if raw else None
+    if raw and token is None:
+        logger.info("Ignoring an invalid consistency token")
+    return ReplicaReads(token)
@@ -0,0 +1,117 @@
+"""
+Reviews of doctors, facilities and drugs.
+
+Reviews are appended to the `Review` collection and never embedded in the
+reviewed document, which only keeps `rating_sum`, `rating_count` and
+`rating_average`. The three are updated together by one atomic pipeline
+update, so concurrent reviews never lose an increment and the average is
+always consistent with the sum and count. Doctors are ranked by specialty
+from the `specialty_rating` index, without loading any reviews.
+"""
+
+from beanie import PydanticObjectId
+
+from models.medical_facilities import Hospital, Clinic, Pharmacy
+from models.pharmacy import Drug
+from models.review import Review
+from models.users import Doctor
+
+from .pagination import encode_cursor, decode_cursor, cursor_object_id
+
+
+REVIEW_TARGETS = {
+    "doctor": Doctor,
+    "hospital": Hospital,
+    "clinic": Clinic,
+    "pharmacy": Pharmacy,
+    "drug": Drug,
+}
+
+
+def rating_update(rating: float, count: int = 1) -> list[dict]:
+    """Build the update pipeline adding `count` ratings totalling `rating` to a reviewed document.
+
+    Documents created before the rating fields existed start from zero.
+    """
+    return [
+        {"$set": {
+            "rating_sum": {"$add": [{"$ifNull": ["$rating_sum", 0]}, rating]},
+            "rating_count": {"$add": [{"$ifNull": ["$rating_count", 0]}, count]},
+        }},
+        {"$set": {
+            "rating_average": {
+                "$cond": [{"$gt": ["$rating_count", 0]}, {"$divide": ["$rating_sum", "$rating_count"]}, 0],
+            },
+        }},
+    ]
+
+
+async def submit_review(review: Review) -> Review | None:
+    """Store a review and fold its rating into the reviewed document.
+
+    Args:
+        review (Review): The new review.
+
+    Returns:
+        **Review | None**: The stored review, or None if the reviewed document does not exist.
+    """
+    if not PydanticObjectId.is_valid(review.target_id):
+        return None
+
+    # * The update doubles as the existence check, so a review costs two writes and no reads
+    result = await REVIEW_TARGETS[review.target_type].get_motor_collection().update_one(
+        {"_id": PydanticObjectId(review.target_id)},
+        rating_update(review.rating),
+    )
+    if not result.matched_count:
+        return None
+
+    return await review.insert()
+
+
+async def get_reviews(target_type: str, target_id: str, cursor: str | None, limit: int) -> dict:
+    """Get a page of a document's reviews, newest first.
+
+    Pages are keyset-paginated on `_id` through the `target_newest` index, so a
+    page costs the same with 10 or 100k reviews.
+
+    Args:
+        target_type (str): The kind of the reviewed document.
+        target_id (str): The ID of the reviewed document.
+        cursor (str | None): The `nextCursor` of the previous page.
+        limit (int): Maximum number of reviews to return.
+
+    Returns:
+        **dict**: `results` (list of `Review`) and `next_cursor`.
+    """
+    query = {"target_type": target_type, "target_id": target_id}
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        query["_id"] = {"$lt": cursor_object_id(last_id)}
+
+    # * Fetch one extra review to know whether there is a next page
+    reviews = await Review.find(query).sort(-Review.id).limit(limit + 1).to_list()
+
+    next_cursor = None
+    if len(reviews) > limit:
+        reviews = reviews[:limit]
+        next_cursor = encode_cursor(reviews[-1].id)
+
+    return {"results": reviews, "next_cursor": next_cursor}
+
+
+async def top_rated_doctors(specialty: str, min_reviews: int, limit: int) -> list[Doctor]:
+    """Get the best rated doctors of a specialty.
+
+    Args:
+        specialty (str): The specialty to rank.
+        min_reviews (int): Doctors with fewer reviews are left out.
+        limit (int): Maximum number of doctors to return.
+
+    Returns:
+        **list[Doctor]**: The doctors, highest average rating first, then most reviewed.
+    """
+    return await Doctor.find(
+        Doctor.specialty == specialty,
+        Doctor.rating_count >= min_reviews,
+    ).sort(-Doctor.rating_average, -Doctor.rating_count).limit(limit).to_list()
@@ -0,0 +1,85 @@
+"""Typed application settings.
+
+The environment (and the `.env` file) is parsed exactly once, the first time
+`get_settings` is called, and the resulting object is shared by every module.
+"""
+
+import os
+from functools import lru_cache
+from typing import Annotated, Literal, Optional
+
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field
+
+
+class Settings(BaseModel):
+    """Application settings read from environment variables of the same name (upper case)"""
+    database_connection_string: Annotated[str, Field(default="mongodb://localhost:27017")]
+    database_name: Annotated[str, Field(default="healthcare_api")]
+    redis_url: Annotated[str, Field(default="redis://localhost:6379/0")]
+    secret_key: Annotated[Optional[str], Field(default=None)]
+    access_token_expire_minutes: Annotated[int, Field(default=30, ge=1)]
+    vonage_api_key: Annotated[Optional[str], Field(default=None)]
+    vonage_api_secret: Annotated[Optional[str], Field(default=None)]
+    mongo_min_pool_size: Annotated[int, Field(default=5, ge=0)]
+    redis_min_connections: Annotated[int, Field(default=5, ge=0)]
+    readiness_timeout_seconds: Annotated[float, Field(default=2.0, gt=0)]
+    reminder_lead_minutes: Annotated[int, Field(default=24 * 60, ge=0)]
+    reminder_bucket_seconds: Annotated[int, Field(default=300, ge=1)]
+    reminder_poll_seconds: Annotated[int, Field(default=30, ge=1)]
+    reminder_lease_seconds: Annotated[int, Field(default=300, ge=1)]
+    reminder_batch_size: Annotated[int, Field(default=500, ge=1)]
+    facility_timezone: Annotated[str, Field(default="UTC", description="Time zone of facility operational hours")]
+    job_max_attempts: Annotated[int, Field(default=5, ge=1)]
+    job_retry_base_seconds: Annotated[float, Field(default=5, gt=0)]
+    job_retry_max_seconds: Annotated[float, Field(default=600, gt=0)]
+    job_visibility_seconds: Annotated[float, Field(default=60, gt=0, description="Idle time after which a pending job is taken over")]
+    job_idempotency_ttl_seconds: Annotated[int, Field(default=24 * 60 * 60, ge=1)]
+    worker_concurrency: Annotated[int, Field(default=10, ge=1)]
+    feed_enabled: Annotated[bool, Field(default=True, description="Watch the appointment change stream (needs a replica set)")]
+    feed_queue_size: Annotated[int, Field(default=100, ge=1, description="Events buffered per live feed connection")]
+    feed_history_size: Annotated[int, Field(default=1000, ge=0, description="Recent events kept per worker for reconnects")]
+    feed_keepalive_seconds: Annotated[float, Field(default=15, gt=0)]
+    feed_retry_seconds: Annotated[float, Field(default=5, gt=0)]
+    compression_min_bytes: Annotated[int, Field(default=1024, ge=0, description="Smallest streamed body that is compressed")]
+    admission_enabled: Annotated[bool, Field(default=True, description="Apply per-route admission control and load shedding")]
+    cache_l2_enabled: Annotated[bool, Field(default=True, description="Share reference caches between workers through Redis")]
+    request_deadlines_enabled: Annotated[bool, Field(default=True, description="Bound every request by a time budget")]
+    request_timeout_seconds: Annotated[float, Field(default=10, gt=0, description="Budget of requests without X-Request-Timeout")]
+    request_timeout_max_seconds: Annotated[float, Field(default=30, gt=0, description="Largest budget a client may ask for")]
+    profiling_enabled: Annotated[bool, Field(default=False, description="Register the on-demand request profiler")]
+    profiling_sample_rate: Annotated[float, Field(default=0.0, ge=0, le=1, description="Share of requests profiled without an X-Profile header")]
+    profiling_max_concurrent: Annotated[int, Field(default=2, ge=1)]
+    profiling_interval_seconds: Annotated[float, Field(default=0.005, gt=0)]
+    profiling_dir: Annotated[str, Field(default="profiles")]
+    tracing_enabled: Annotated[bool, Field(default=False, description="Record distributed tracing spans")]
+    tracing_sample_ratio: Annotated[float, Field(default=0.01, ge=0, le=1, description="Share of new traces that are recorded")]
+    tracing_exporter: Annotated[Literal["file", "memory"], Field(default="file")]
+    tracing_file: Annotated[str, Field(default="traces/spans-{pid}.jsonl", description="Span file of the file exporter")]
+    secondary_reads_enabled: Annotated[bool, Field(default=False, description="Send opted-in reads to secondaries (needs a replica set)")]
+    secondary_max_staleness_seconds: Annotated[int, Field(default=90, ge=90, description="maxStalenessSeconds of secondary reads")]
+    archive_appointments_after_days: Annotated[int, Field(default=365, ge=1, description="Age of completed and canceled appointments that are archived")]
+    archive_diagnoses_after_days: Annotated[int, Field(default=730, ge=1, description="Age of diagnoses that are archived")]
+    archive_batch_size: Annotated[int, Field(default=1000, ge=1)]
+    archive_max_batches: Annotated[int, Field(default=100, ge=1, description="Batches per collection and archiving run")]
+    archive_interval_seconds: Annotated[int, Field(default=60 * 60, ge=60, description="How often the workers queue an archiving run")]
+    typeahead_trie_enabled: Annotated[bool, Field(default=True, description="Serve short typeahead prefixes from an in-process trie")]
+    typeahead_trie_max_depth: Annotated[int, Field(default=3, ge=1, le=8, description="Longest prefix served from the trie")]
+    typeahead_trie_ttl_seconds: Annotated[float, Field(default=300, gt=0, description="How long a trie page is served before it is reloaded")]
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Parse the environment once and return the cached settings.
+
+    Returns:
+        **Settings**: The application settings.
+    """
+    load_dotenv()
+
+    values = {
+        name: os.environ[name.upper()]
+        for name in Settings.model_fields
+        if name.upper() in os.environ
+    }
+    return Settings(**values)
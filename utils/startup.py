@@ -0,0 +1,61 @@
+"""Timing of the application start-up steps.
+"""
+
+import asyncio
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class StartupProfile:
+    """Records how long each step of the application lifespan start-up takes"""
+
+    def __init__(self):
+        self.steps: list[tuple[str, float]] = []
+
+    @contextmanager
+    def step(self, name: str):
+        """Time the enclosed block and record it under `name`.
+
+        Args:
+            name (str): The name of the start-up step.
+        """
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, (perf_counter() - started) * 1000))
+
+    @property
+    def total_ms(self) -> float:
+        """Total time spent in all recorded steps, in milliseconds"""
+        return sum(duration for _, duration in self.steps)
+
+    def report(self) -> str:
+        """Return a one-line, human readable summary of the recorded steps"""
+        steps = ", ".join(f"{name}={duration:.1f}ms" for name, duration in self.steps)
+        return f"Startup completed in {self.total_ms:.1f}ms ({steps})"
+
+
+async def warm_up_mongo(client, connections: int):
+    """Open `connections` pooled connections to MongoDB by issuing concurrent pings.
+
+    The first ping also completes server selection, so the first real request
+    does not pay for the TCP/TLS handshake.
+
+    Args:
+        client (AsyncIOMotorClient): The Motor client to warm up.
+        connections (int): The number of connections to establish.
+    """
+    await client.admin.command("ping")
+    if connections > 1:
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(connections - 1)))
+
+
+async def warm_up_redis(connection, connections: int):
+    """Open `connections` pooled connections to Redis by issuing concurrent pings.
+
+    Args:
+        connection (redis.asyncio.Redis): The Redis client to warm up.
+        connections (int): The number of connections to establish.
+    """
+    await asyncio.gather(*(connection.ping() for _ in range(max(connections, 1))))
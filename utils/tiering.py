@@ -0,0 +1,153 @@
+"""
+Hot/cold tiering of appointments and diagnoses.
+
+The `archive_cold_records` job moves completed and canceled appointments whose
+date is older than `ARCHIVE_APPOINTMENTS_AFTER_DAYS`, and diagnoses older than
+`ARCHIVE_DIAGNOSES_AFTER_DAYS`, into the archive collections in batches. Each
+batch is copied with idempotent upserts and only then deleted from the hot
+collection, so a run that stops halfway is completed by the next one.
+
+Reads that can reach archived records fall through to the archive: lookups by
+ID, the patient timeline, and appointment lists whose date range reaches past
+the horizon (through `archive_union`).
+"""
+
+from datetime import datetime, timedelta
+from time import time
+
+from beanie import PydanticObjectId
+from beanie.odm.queries.find import FindMany
+from pymongo import ReplaceOne
+
+from models.appointment import Appointment
+from models.archive import ArchivedAppointment, ArchivedDiagnosis
+from models.diagnosis import Diagnosis
+
+from .api_logger import logger
+from .settings import get_settings
+
+
+ARCHIVE_OF = {Appointment: ArchivedAppointment, Diagnosis: ArchivedDiagnosis}
+
+
+def appointment_horizon() -> datetime:
+    return datetime.now() - timedelta(days=get_settings().archive_appointments_after_days)
+
+
+def diagnosis_horizon() -> datetime:
+    return datetime.now() - timedelta(days=get_settings().archive_diagnoses_after_days)
+
+
+def cold_filters() -> dict:
+    """Return the filter selecting the records to archive, per hot model"""
+    return {
+        Appointment: {"status": {"$in": ["completed", "canceled"]}, "appointment_date": {"$lt": appointment_horizon()}},
+        Diagnosis: {"created_at": {"$lt": diagnosis_horizon()}},
+    }
+
+
+async def archive_batch(model, cold_filter: dict, batch_size: int) -> int:
+    """Move one batch of matching records from `model`'s collection to its archive.
+
+    Args:
+        model: The hot document model.
+        cold_filter (dict): Selects the records to move.
+        batch_size (int): Maximum number of records to move.
+
+    Returns:
+        **int**: The number of records found for the batch.
+    """
+    hot = model.get_motor_collection()
+    cold = ARCHIVE_OF[model].get_motor_collection()
+
+    documents = await hot.find(cold_filter, sort=[("_id", 1)], limit=batch_size).to_list(None)
+    if not documents:
+        return 0
+
+    archived_at = datetime.now()
+    # * Upserts keep the copy idempotent if a previous run stopped between copying and deleting
+    await cold.bulk_write(
+        [ReplaceOne({"_id": document["_id"]}, {**document, "archived_at": archived_at}, upsert=True) for document in documents],
+        ordered=False,
+    )
+    # * Records that changed since they were read and no longer match stay hot
+    await hot.delete_many({"_id": {"$in": [document["_id"] for document in documents]}, **cold_filter})
+    return len(documents)
+
+
+async def archive_cold_records(batch_size: int | None = None, max_batches: int | None = None) -> dict[str, int]:
+    """Move every record older than its horizon to the archive, in batches.
+
+    Args:
+        batch_size (int | None): Records per batch; `ARCHIVE_BATCH_SIZE` if omitted.
+        max_batches (int | None): Batches per collection and run; `ARCHIVE_MAX_BATCHES` if omitted.
+
+    Returns:
+        **dict[str, int]**: The number of records archived, per hot collection.
+    """
+    settings = get_settings()
+    batch_size = batch_size or settings.archive_batch_size
+    max_batches = max_batches or settings.archive_max_batches
+
+    archived = {}
+    for model, cold_filter in cold_filters().items():
+        name = model.get_motor_collection().name
+        archived[name] = 0
+        for _ in range(max_batches):
+            found = await archive_batch(model, cold_filter, batch_size)
+            archived[name] += found
+            if found < batch_size:
+                break
+        logger.info(f"Archived {archived[name]} records from {name}")
+    return archived
+
+
+async def enqueue_archiving(queue) -> str:
+    """Queue an archiving run for the current interval.
+
+    The job ID is derived from the interval, so however many workers call this,
+    one run is queued per `ARCHIVE_INTERVAL_SECONDS`.
+    """
+    period = int(time() // get_settings().archive_interval_seconds)
+    return await queue.enqueue("archive_cold_records", {}, job_id=f"archive-cold-records:{period}")
+
+
+async def get_with_archive(model, document_id: PydanticObjectId):
+    """Get a document by ID from the hot collection, falling through to its archive"""
+    return await model.get(document_id) or await ARCHIVE_OF[model].get(document_id)
+
+
+def spans_archive(from_date: datetime | None, to_date: datetime | None) -> bool:
+    """Whether an appointment date range can reach archived appointments.
+
+    Unbounded lists cover the hot collection only; a range has to be asked for
+    to reach the archive.
+    """
+    if from_date is None and to_date is None:
+        return False
+    return from_date is None or from_date < appointment_horizon()
+
+
+def archive_union(query: FindMany, sort: dict, skip: int, limit: int) -> list[dict]:
+    """Build an aggregation running a find query over a hot collection and its archive.
+
+    Each side is sorted and limited on its own before the union, so the merge
+    only sees `2 * (skip + limit)` records.
+
+    Args:
+        query (FindMany): The Beanie query on the hot model.
+        sort (dict): The sort order, which must be total (end with `_id`).
+        skip (int): Records to skip.
+        limit (int): Maximum number of records to return.
+
+    Returns:
+        **list[dict]**: The pipeline, to be run on the hot collection.
+    """
+    branch = [{"$match": query.get_filter_query()}, {"$sort": sort}, {"$limit": skip + limit}]
+    return [
+        *branch,
+        {"$unionWith": {"coll": ARCHIVE_OF[query.document_model].get_motor_collection().name, "pipeline": branch}},
+        {"$sort": sort},
+        {"$skip": skip},
+        {"$limit": limit},
+    ]
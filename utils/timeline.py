@@ -0,0 +1,119 @@
+"""
+Patient timeline across appointments, diagnoses and treatments.
+
+A single aggregation starts on the `Appointment` collection and `$unionWith`s
+`Diagnosis` and `Treatment`. Every branch is matched, sorted and limited on its
+own (patient, date) index before the union, so the final merge sort only sees
+at most `5 * (limit + 1)` records regardless of how long the history is.
+Archived appointments and diagnoses are included through two more branches on
+the archive collections.
+"""
+
+import json
+from datetime import datetime
+
+from beanie import PydanticObjectId
+
+from models.appointment import Appointment
+from models.diagnosis import Diagnosis
+from models.treatment import Treatment
+from schema.responses.appointment import AppointmentInDB
+from schema.responses.timeline import TimelineEntry
+from schema.responses.treatment import TreatmentInDB
+
+from .pagination import encode_cursor, decode_cursor, cursor_object_id
+from .tiering import ARCHIVE_OF
+
+
+# * kind -> (model, patient field, date field)
+TIMELINE_SOURCES = {
+    "appointment": (Appointment, "patient", "appointment_date"),
+    "diagnosis": (Diagnosis, "diagnosed_user_id", "created_at"),
+    "treatment": (Treatment, "patient_id", "start_date"),
+}
+
+
+def _branch(kind: str, patient_id: str, before: tuple[datetime, PydanticObjectId] | None, limit: int) -> list[dict]:
+    _, patient_field, date_field = TIMELINE_SOURCES[kind]
+
+    match = {patient_field: patient_id}
+    if before:
+        date, last_id = before
+        match["$or"] = [
+            {date_field: {"$lt": date}},
+            {date_field: date, "_id": {"$lt": last_id}},
+        ]
+
+    return [
+        {"$match": match},
+        {"$sort": {date_field: -1, "_id": -1}},
+        {"$limit": limit},
+        {"$project": {"_id": 1, "kind": {"$literal": kind}, "date": f"${date_field}", "record": "$$ROOT"}},
+    ]
+
+
+def build_timeline_pipeline(patient_id: str, cursor: str | None, limit: int) -> list[dict]:
+    """Build the timeline aggregation, to be run on the `Appointment` collection.
+
+    Args:
+        patient_id (str): The ID of the patient.
+        cursor (str | None): The `nextCursor` of the previous page.
+        limit (int): The page size; one extra record is fetched to detect a next page.
+
+    Returns:
+        **list[dict]**: The aggregation pipeline.
+    """
+    before = None
+    if cursor:
+        date, last_id = decode_cursor(cursor, 2)
+        before = (datetime.fromisoformat(date), cursor_object_id(last_id))
+
+    pipeline = _branch("appointment", patient_id, before, limit + 1)
+    branches = [(kind, TIMELINE_SOURCES[kind][0]) for kind in ("diagnosis", "treatment")]
+    branches += [(kind, ARCHIVE_OF[TIMELINE_SOURCES[kind][0]]) for kind in ("appointment", "diagnosis")]
+    for kind, model in branches:
+        pipeline.append({"$unionWith": {
+            "coll": model.get_motor_collection().name,
+            "pipeline": _branch(kind, patient_id, before, limit + 1),
+        }})
+
+    pipeline += [
+        {"$sort": {"date": -1, "_id": -1}},
+        {"$limit": limit + 1},
+    ]
+    return pipeline
+
+
+def _entry(document: dict) -> TimelineEntry:
+    kind = document["kind"]
+    record = TIMELINE_SOURCES[kind][0].model_validate(document["record"])
+
+    if kind == "appointment":
+        return TimelineEntry(kind=kind, date=document["date"], appointment=AppointmentInDB(**record.model_dump()))
+    if kind == "diagnosis":
+        return TimelineEntry(kind=kind, date=document["date"], diagnosis=record)
+    return TimelineEntry(kind=kind, date=document["date"], treatment=TreatmentInDB(**record.model_dump()))
+
+
+async def stream_timeline(pipeline: list[dict], limit: int):
+    """Yield a `TimelinePage` as JSON chunks, one chunk per entry, as the cursor produces them.
+
+    Args:
+        pipeline (list[dict]): The pipeline returned by `build_timeline_pipeline`, built
+            before the response starts so that a bad cursor can still get a 400.
+        limit (int): The page size.
+    """
+    yield '{"items":['
+    sent = 0
+    last = None
+    next_cursor = None
+    async for document in Appointment.aggregate(pipeline):
+        if sent == limit:
+            next_cursor = encode_cursor(last["date"].isoformat(), last["_id"])
+            break
+
+        yield ("," if sent else "") + _entry(document).model_dump_json(by_alias=True)
+        sent += 1
+        last = document
+
+    yield f'],"nextCursor":{json.dumps(next_cursor)}}}'
@@ -0,0 +1,298 @@
+"""
+Distributed tracing with W3C trace context.
+
+`TracingMiddleware` starts a server span per request, continuing the trace of
+an incoming `traceparent` header. Code running inside the request adds child
+spans through `tracer.span(...)`, and the current span is kept in a context
+variable, so Motor commands (`MongoCommandTracer`), Redis commands
+(`TracedRedis`), notification sends and jobs enqueued by the request all join
+the same trace. Jobs carry the `traceparent` of the request that enqueued them.
+
+Sampling is decided once per trace, at its root: an incoming `traceparent`'s
+sampled flag is honoured, and new traces are sampled at `TRACING_SAMPLE_RATIO`
+based on the trace ID. In an unsampled request there is no current span, so
+instrumentation costs one context variable lookup.
+
+Finished spans go to the configured exporter. `FileExporter` appends them as
+JSON lines from a background thread; `InMemoryExporter` keeps them in a list
+for tests and scripts. Any object with `export(spans)` and `shutdown()` can be
+passed to `tracer.configure`.
+"""
+
+import json
+import os
+import queue
+import re
+import secrets
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import time_ns
+
+from pymongo import monitoring
+
+from .api_logger import logger
+from .deadline import DeadlinePipeline, DeadlineRedis
+from .settings import get_settings
+
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace"""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    kind: str = "internal"
+    start_ns: int = field(default_factory=time_ns)
+    end_ns: int | None = None
+    attributes: dict = field(default_factory=dict)
+    error: str | None = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, error):
+        self.error = str(error)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+class _NoopSpan:
+    """Stands in for a span in unsampled traces"""
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def record_error(self, error):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def current_traceparent() -> str | None:
+    """Return the `traceparent` of the current span, to propagate the trace to other processes"""
+    span = _current_span.get()
+    return span.traceparent if span is not None else None
+
+
+class InMemoryExporter:
+    """Keeps finished spans in memory"""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, spans: list[Span]):
+        self.spans.extend(spans)
+
+    def shutdown(self):
+        pass
+
+
+class FileExporter:
+    """Appends finished spans to a JSON lines file from a background thread"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, spans: list[Span]):
+        self._queue.put(spans)
+
+    def shutdown(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _write(self):
+        with self.path.open("a", encoding="utf-8") as file:
+            while True:
+                spans = self._queue.get()
+                if spans is None:
+                    return
+                try:
+                    file.writelines(json.dumps(asdict(span), default=str) + "\n" for span in spans)
+                    if self._queue.empty():
+                        file.flush()
+                except (OSError, TypeError) as e:
+                    logger.error(f"Exporting spans failed: {e}")
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporter"""
+
+    def __init__(self):
+        self.exporter = None
+        self.sample_ratio = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, exporter, sample_ratio: float):
+        """Enable tracing.
+
+        Args:
+            exporter: Receives finished spans through `export(spans)`.
+            sample_ratio (float): Share of new traces that are recorded.
+        """
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.shutdown()
+            self.exporter = None
+
+    def _sampled(self, trace_id: str) -> bool:
+        # * Decided on the trace ID, so every process that sees the trace makes the same choice
+        return int(trace_id[16:], 16) < self.sample_ratio * 2 ** 64
+
+    def start_trace(self, name: str, traceparent: str | None = None, kind: str = "server") -> Span | None:
+        """Start the local root span of a trace, continuing `traceparent` if it is valid.
+
+        Returns:
+            **Span | None**: The span, or None if the trace is not sampled.
+        """
+        if not self.enabled:
+            return None
+
+        match = TRACEPARENT.match(traceparent or "")
+        if match and match[1] != "0" * 32:
+            trace_id, parent_id, flags = match.groups()
+            if not int(flags, 16) & 1:
+                return None
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+            if not self._sampled(trace_id):
+                return None
+        return Span(name, trace_id, secrets.token_hex(8), parent_id, kind)
+
+    def start_span(self, name: str, kind: str = "internal", attributes: dict | None = None) -> Span | None:
+        """Start a child of the current span, or return None outside a sampled trace"""
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        return Span(name, parent.trace_id, secrets.token_hex(8), parent.span_id, kind, attributes=attributes or {})
+
+    def end(self, span: Span):
+        span.end_ns = time_ns()
+        if self.exporter is not None:
+            self.exporter.export([span])
+
+    @contextmanager
+    def activate(self, span: Span | None):
+        """Make `span` the current span for the enclosed code"""
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", attributes: dict | None = None):
+        """Record the enclosed code as a child of the current span.
+
+        Yields the span, or a no-op stand-in outside a sampled trace.
+        """
+        span = self.start_span(name, kind, attributes)
+        if span is None:
+            yield NOOP_SPAN
+            return
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(repr(e))
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end(span)
+
+
+tracer = Tracer()
+
+
+def configure_tracing():
+    """Configure the tracer from the settings. Called once at start-up by the API and the worker."""
+    settings = get_settings()
+    if not settings.tracing_enabled:
+        return
+
+    exporter = InMemoryExporter() if settings.tracing_exporter == "memory" else FileExporter(
+        settings.tracing_file.format(pid=os.getpid())
+    )
+    tracer.configure(exporter, settings.tracing_sample_ratio)
+
+
+class MongoCommandTracer(monitoring.CommandListener):
+    """Records a span for every MongoDB command sent within a sampled trace.
+
+    Motor runs pymongo in executor threads with a copy of the caller's context,
+    so the listener sees the span of the request that issued the command.
+    """
+
+    def __init__(self):
+        self._spans: dict[tuple, Span] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        collection = event.command.get(event.command_name)
+        span = tracer.start_span(
+            f"mongo {event.command_name}",
+            kind="client",
+            attributes={
+                "db.system": "mongodb",
+                "db.name": event.database_name,
+                "db.operation": event.command_name,
+                "db.collection": collection if isinstance(collection, str) else None,
+            },
+        )
+        if span is not None:
+            self._spans[(event.request_id, event.connection_id)] = span
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        span = self._spans.pop((event.request_id, event.connection_id), None)
+        if span is not None:
+            tracer.end(span)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        span = self._spans.pop((event.request_id, event.connection_id), None)
+        if span is not None:
+            span.record_error(event.failure.get("errmsg", event.failure))
+            tracer.end(span)
+
+
+class TracedPipeline(DeadlinePipeline):
+    """Pipeline that records its `execute` as one span"""
+
+    async def execute(self, raise_on_error: bool = True):
+        attributes = {"db.system": "redis", "db.redis.commands": len(self.command_stack)}
+        with tracer.span("redis pipeline", kind="client", attributes=attributes):
+            return await super().execute(raise_on_error)
+
+
+class TracedRedis(DeadlineRedis):
+    """Redis client that records a span per command and honours the request deadline.
+
+    Create it with `TracedRedis.from_url(...)` in place of `redis.from_url(...)`.
+    """
+
+    async def execute_command(self, *args, **options):
+        with tracer.span(f"redis {args[0]}", kind="client", attributes={"db.system": "redis"}):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> TracedPipeline:
+        return TracedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
@@ -0,0 +1,198 @@
+"""
+Patient name and email typeahead.
+
+Every patient stores folded (accent-free, case-folded) `search_keys`: "first
+last", "last first" and the email. A query is folded the same way and answered
+by a range scan over the `search_keys` index (`prefix <= key < prefix + U+10FFFF`),
+which reads only the matching index entries however many patients there are.
+
+The shortest prefixes are typed on every lookup and match the most patients,
+so their pages are also kept in a worker-local trie (`patient_typeahead`).
+New patients are added to the cached pages in place, and the other workers
+drop the affected prefixes through the cache bus.
+"""
+
+from time import monotonic
+
+from models.helpers import fold_search_key
+from models.users import Patient
+
+from .cache import cache_bus
+from .settings import get_settings
+
+
+TYPEAHEAD_MAX_RESULTS = 20
+PREFIX_END = "\U0010ffff"
+PROJECTION = {"first_name": 1, "last_name": 1, "contact_info.email": 1, "search_keys": 1}
+
+
+def suggestion(patient: dict, prefix: str) -> tuple[str, str, dict]:
+    """Sortable typeahead entry of a patient document: (matched key, ID, suggestion)"""
+    key = min(key for key in patient["search_keys"] if key.startswith(prefix))
+    patient_id = str(patient["_id"])
+    return key, patient_id, {
+        "id": patient_id,
+        "first_name": patient["first_name"],
+        "last_name": patient["last_name"],
+        "email": patient["contact_info"]["email"],
+    }
+
+
+async def query_prefix(prefix: str, limit: int) -> list[tuple[str, str, dict]]:
+    """Get the first `limit` patients with a key starting with `prefix`, in key order"""
+    # * $elemMatch makes one key satisfy both bounds, so the index scan is bounded on both sides.
+    # * The hint pins that scan: documents come back in key order (each once, at its first
+    # * matching key), so the limit keeps the first matches and not any `limit` of them.
+    patients = await Patient.get_motor_collection().find(
+        {"search_keys": {"$elemMatch": {"$gte": prefix, "$lt": prefix + PREFIX_END}}},
+        PROJECTION,
+        limit=limit,
+        hint="search_keys",
+    ).to_list(None)
+    entries = {}
+    for patient in patients:
+        entry = suggestion(patient, prefix)
+        entries.setdefault(entry[1], entry)
+    return sorted(entries.values())
+
+
+class _Node:
+    __slots__ = ("children", "entries", "complete", "expires")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.entries: list[tuple[str, str, dict]] | None = None
+        self.complete = False
+        self.expires = 0.0
+
+
+class PrefixTrie:
+    """Worker-local typeahead pages of the prefixes up to `max_depth` characters.
+
+    Each node holds the first `capacity` entries of its prefix, in key order,
+    and whether that page is every match (`complete`). A new patient can then
+    be added to a page without a query: it goes in if the page is complete or
+    if it sorts before the last entry. Pages are reloaded after `ttl_seconds`,
+    which bounds the staleness of changes made outside `add` (renames, deletes).
+    """
+
+    def __init__(self, name: str, max_depth: int, capacity: int, ttl_seconds: float):
+        self.name = name
+        self.max_depth = max_depth
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self._root = _Node()
+        self.stats = {"hits": 0, "misses": 0}
+        cache_bus.register(self)
+
+    def _walk(self, prefix: str, create: bool = False) -> _Node | None:
+        node = self._root
+        for char in prefix:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[char] = _Node()
+            node = child
+        return node
+
+    def lookup(self, prefix: str) -> list[tuple[str, str, dict]] | None:
+        """Return the fresh page of `prefix`, or None if it has to be queried"""
+        node = self._walk(prefix) if len(prefix) <= self.max_depth else None
+        if node is None or node.entries is None or node.expires <= monotonic():
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return node.entries
+
+    def store(self, prefix: str, entries: list[tuple[str, str, dict]]):
+        """Cache the page of `prefix`, as returned by `query_prefix(prefix, capacity)`"""
+        if len(prefix) > self.max_depth:
+            return
+        node = self._walk(prefix, create=True)
+        node.entries = entries[:self.capacity]
+        node.complete = len(entries) < self.capacity
+        node.expires = monotonic() + self.ttl_seconds
+
+    def add(self, patient: dict) -> list[str]:
+        """Add a new patient to every cached page it belongs to.
+
+        Args:
+            patient (dict): The patient document, with `_id` and `search_keys`.
+
+        Returns:
+            **list[str]**: The prefixes whose pages the patient belongs to.
+        """
+        prefixes = sorted({key[:depth] for key in patient["search_keys"] for depth in range(1, min(len(key), self.max_depth) + 1)})
+        for prefix in prefixes:
+            node = self._walk(prefix)
+            if node is None or node.entries is None:
+                continue
+            entry = suggestion(patient, prefix)
+            if any(existing[1] == entry[1] for existing in node.entries):
+                continue
+            if node.complete or entry < node.entries[-1]:
+                node.entries = sorted([*node.entries, entry])[:self.capacity]
+                node.complete = node.complete and len(node.entries) < self.capacity
+        return prefixes
+
+    def drop(self, keys: list[str] | None = None):
+        """Drop the pages of some prefixes (or every page, if None)"""
+        if keys is None:
+            self._root = _Node()
+            return
+        for prefix in keys:
+            node = self._walk(prefix)
+            if node is not None:
+                node.entries = None
+
+    def metrics(self) -> dict:
+        lookups = sum(self.stats.values())
+        return {**self.stats, "hitRatio": round(self.stats["hits"] / lookups, 4) if lookups else None}
+
+
+patient_typeahead = PrefixTrie(
+    "patient-typeahead",
+    max_depth=get_settings().typeahead_trie_max_depth,
+    capacity=TYPEAHEAD_MAX_RESULTS,
+    ttl_seconds=get_settings().typeahead_trie_ttl_seconds,
+)
+
+
+async def suggest_patients(query: str, limit: int) -> list[dict]:
+    """Suggest patients whose name or email starts with `query`.
+
+    Args:
+        query (str): What has been typed so far; case and accents are ignored.
+        limit (int): Maximum number of suggestions, at most `TYPEAHEAD_MAX_RESULTS`.
+
+    Returns:
+        **list[dict]**: `id`, `first_name`, `last_name` and `email` of each patient, in key order.
+    """
+    prefix = fold_search_key(query)
+    if not prefix:
+        return []
+
+    if not get_settings().typeahead_trie_enabled or len(prefix) > patient_typeahead.max_depth:
+        entries = await query_prefix(prefix, limit)
+    else:
+        entries = patient_typeahead.lookup(prefix)
+        if entries is None:
+            entries = await query_prefix(prefix, patient_typeahead.capacity)
+            patient_typeahead.store(prefix, entries)
+
+    return [entry[2] for entry in entries[:limit]]
+
+
+async def patient_created(patient: Patient):
+    """Add a new patient to this worker's trie and drop its prefixes in the other workers"""
+    if not get_settings().typeahead_trie_enabled:
+        return
+    prefixes = patient_typeahead.add({
+        "_id": patient.id,
+        "first_name": patient.first_name,
+        "last_name": patient.last_name,
+        "contact_info": {"email": patient.contact_info.email},
+        "search_keys": patient.search_keys,
+    })
+    await cache_bus.publish(patient_typeahead.name, prefixes)
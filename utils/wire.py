@@ -0,0 +1,179 @@
+"""
+Negotiated wire formats for high-volume list and export endpoints.
+
+Clients that send `Accept: application/msgpack` get MessagePack instead of JSON.
+Both encodings are produced from the same Pydantic response models (by alias,
+in JSON mode), so the models stay the single source of truth for the schema.
+
+Exports are streamed as newline-delimited JSON or as a sequence of MessagePack
+objects, and compressed with zstd or gzip when the client accepts it and the
+body is larger than `COMPRESSION_MIN_BYTES`.
+"""
+
+import zlib
+from typing import Any, AsyncIterator
+
+import msgpack
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+
+from .settings import get_settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstd is optional
+    zstandard = None
+
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = {MSGPACK, "application/x-msgpack"}
+
+
+def _accepted(header: str | None) -> dict[str, float]:
+    """Parse an Accept or Accept-Encoding header into `{value: q}`"""
+    accepted = {}
+    for part in (header or "").split(","):
+        value, *params = [item.strip() for item in part.split(";")]
+        if not value:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, number = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        accepted[value.lower()] = q
+    return accepted
+
+
+def wants_msgpack(request: Request) -> bool:
+    """Return True if the client prefers MessagePack over JSON"""
+    accepted = _accepted(request.headers.get("accept"))
+    msgpack_q = max((accepted.get(media_type, 0.0) for media_type in MSGPACK_TYPES), default=0.0)
+    json_q = max(accepted.get(JSON, 0.0), accepted.get("*/*", 0.0), accepted.get("application/*", 0.0))
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def choose_encoding(request: Request) -> str | None:
+    """Pick the best supported content encoding the client accepts (zstd, then gzip)"""
+    accepted = _accepted(request.headers.get("accept-encoding"))
+    for encoding in ("zstd", "gzip"):
+        if encoding == "zstd" and zstandard is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def negotiated(request: Request, adapter: TypeAdapter, value: Any) -> Any:
+    """Return `value` as MessagePack if the client asked for it, otherwise unchanged.
+
+    Args:
+        request (Request): The incoming request.
+        adapter (TypeAdapter): Adapter for the endpoint's response model.
+        value (Any): The response value, returned as is for JSON so FastAPI serializes it.
+
+    Returns:
+        **Any**: A MessagePack `Response`, or `value`.
+    """
+    if not wants_msgpack(request):
+        return value
+    content = msgpack.packb(adapter.dump_python(value, mode="json", by_alias=True))
+    return Response(content=content, media_type=MSGPACK, headers={"Vary": "Accept"})
+
+
+def _compressor(encoding: str):
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    # * wbits 16 + MAX_WBITS writes a gzip header and trailer
+    return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def encode_records(request: Request, model, records: AsyncIterator, batch_size: int = 500) -> tuple[AsyncIterator[bytes], str]:
+    """Encode a stream of records as NDJSON or MessagePack, in batches.
+
+    Args:
+        request (Request): The incoming request, used for content negotiation.
+        model: The Pydantic model each record is serialized with.
+        records (AsyncIterator): The records, as instances of `model`.
+        batch_size (int): Number of records encoded per chunk.
+
+    Returns:
+        **tuple[AsyncIterator[bytes], str]**: The encoded chunks and their media type.
+    """
+    adapter = TypeAdapter(model)
+
+    if wants_msgpack(request):
+        packer = msgpack.Packer()
+
+        def encode(batch: list) -> bytes:
+            return b"".join(packer.pack(adapter.dump_python(record, mode="json", by_alias=True)) for record in batch)
+
+        media_type = MSGPACK
+    else:
+        def encode(batch: list) -> bytes:
+            return b"".join(adapter.dump_json(record, by_alias=True) + b"\n" for record in batch)
+
+        media_type = NDJSON
+
+    async def chunks():
+        batch = []
+        async for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield encode(batch)
+                batch = []
+        if batch:
+            yield encode(batch)
+
+    return chunks(), media_type
+
+
+async def stream_response(request: Request, chunks: AsyncIterator[bytes], media_type: str) -> StreamingResponse:
+    """Stream `chunks`, compressed if the client accepts it and the body is large enough.
+
+    The first chunks are buffered until `COMPRESSION_MIN_BYTES` is reached, so small
+    bodies are sent uncompressed and the response headers still come first.
+    """
+    threshold = get_settings().compression_min_bytes
+    encoding = choose_encoding(request)
+
+    head, size, exhausted = [], 0, False
+    if encoding:
+        while size < threshold:
+            try:
+                chunk = await anext(chunks)
+            except StopAsyncIteration:
+                exhausted = True
+                break
+            head.append(chunk)
+            size += len(chunk)
+        if size < threshold:
+            encoding = None
+
+    async def body():
+        for chunk in head:
+            yield chunk
+        if not exhausted:
+            async for chunk in chunks:
+                yield chunk
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if not encoding:
+        return StreamingResponse(body(), media_type=media_type, headers=headers)
+
+    async def compressed():
+        compressor = _compressor(encoding)
+        async for chunk in body():
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    headers["Content-Encoding"] = encoding
+    return StreamingResponse(compressed(), media_type=media_type, headers=headers)
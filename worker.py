@@ -0,0 +1,83 @@
+"""
+Background job worker.
+
+Run one or more next to the API (from the repository root):
+
+    python worker.py [--concurrency 10]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import signal
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from beanie import init_beanie
+
+from main import DOCUMENT_MODELS
+
+import utils.background_tasks  # noqa: F401  (registers the job handlers)
+from utils.api_logger import logger
+from utils.jobs import JobWorker, job_queue
+from utils.settings import get_settings
+from utils.tiering import enqueue_archiving
+from utils.tracing import MongoCommandTracer, TracedRedis, configure_tracing, tracer
+
+
+async def schedule_archiving():
+    """Queue an archiving run every interval; the job ID lets only one worker's run through"""
+    while True:
+        try:
+            await enqueue_archiving(job_queue)
+        except Exception as e:
+            logger.error(f"Queueing the archiving run failed: {e}")
+        await asyncio.sleep(get_settings().archive_interval_seconds)
+
+
+async def run(concurrency: int):
+    settings = get_settings()
+
+    configure_tracing()
+
+    client = AsyncIOMotorClient(
+        settings.database_connection_string,
+        event_listeners=[MongoCommandTracer()] if tracer.enabled else [],
+    )  # * Connect to MongoDB
+    await init_beanie(database=client[settings.database_name], document_models=DOCUMENT_MODELS)
+
+    redis_connection = TracedRedis.from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
+    job_queue.init(redis_connection)
+
+    worker = JobWorker(job_queue, concurrency)
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        # Signal handlers are not available on Windows; Ctrl+C still stops the worker there
+        with contextlib.suppress(NotImplementedError):
+            loop.add_signal_handler(signal_number, worker.stop)
+
+    logger.info(f"Worker {worker.consumer} started with concurrency {concurrency}")
+    archiving = asyncio.create_task(schedule_archiving())
+    try:
+        await worker.run()
+    finally:
+        archiving.cancel()
+        logger.info(f"Worker {worker.consumer} stopped: {worker.processed} jobs processed, {worker.failed} failed")
+        client.close()
+        await redis_connection.close()
+        tracer.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the background job worker")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=get_settings().worker_concurrency,
+        help="Maximum number of jobs handled at once",
+    )
+    asyncio.run(run(parser.parse_args().concurrency))
+
+
+if __name__ == "__main__":
+    main()